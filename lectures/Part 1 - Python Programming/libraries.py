@@ -34,6 +34,7 @@ import time
 N_posns = [10**i for i in range(2,8)]
 T_with_power_operators = []
 T_with_hypot = []
+T_with_vector_array = []
 
 for N in N_posns:
 	posns = [vector.Vector(10,10) for i in range(N)]
@@ -47,6 +48,13 @@ for N in N_posns:
 	time_stop = time.time()
 	T_with_hypot.append(time_stop - time_start)
 
+	# numpy stores all N vectors in two contiguous arrays and computes every magnitude in one call, without a python loop
+	posn_array = vector.VectorArray.full(N, 10, 10)
+	time_start = time.time()
+	mags_with_vector_array = posn_array.magnitude()
+	time_stop = time.time()
+	T_with_vector_array.append(time_stop - time_start)
+
 
 plt.figure()
 plt.title("Time Complexity of Vector Magnitude Computations")
@@ -54,6 +62,7 @@ plt.xlabel("Number of Vectors")
 plt.ylabel("Time (s)")
 plt.plot(N_posns, T_with_power_operators, label="** Operators")
 plt.plot(N_posns, T_with_hypot, label="Math.hypot()")
+plt.plot(N_posns, T_with_vector_array, label="VectorArray.magnitude()")
 plt.legend()
 plt.savefig("algorithmic_complexity.png", dpi=100)
 plt.show()
\ No newline at end of file
@@ -1,5 +1,12 @@
+# numpy stores numbers in contiguous arrays and applies operations to every element at once
+import numpy as np
+
 # a class is a pattern for defining objects with attributes which can be accessed by dot notation
 class Vector:
+	# __slots__ fixes the attribute names, so python stores x and y directly instead of in a per-instance dict
+	# this makes every Vector smaller in memory and faster to create
+	__slots__ = ("x", "y")
+
 	# constructor
 	def __init__(self, x, y):
 		self.x = x
@@ -21,12 +28,86 @@ class Vector:
 	# you can overload built-in methods, including operators!
 	# now you can add Vector(1,2) + Vector(2,3) and get another vector
 	def __add__(self, vec):
+		# returning NotImplemented lets python try VectorArray.__radd__ instead
+		if isinstance(vec, VectorArray):
+			return NotImplemented
 		return Vector(self.x + vec.x, self.y + vec.y)
 
 	# vector subtraction: Vector(1,2) - Vector(2,3)
 	def __sub__(self, vec):
+		if isinstance(vec, VectorArray):
+			return NotImplemented
 		return Vector(self.x - vec.x, self.y - vec.y)
 
 	# what shows up when a Vector instance is converted to a string, such as in the print() function
 	def __repr__(self):
-		return f"Vector({self.x},{self.y})"
\ No newline at end of file
+		return f"Vector({self.x},{self.y})"
+
+# a batch of many 2D vectors stored as two contiguous numpy arrays, one for the x-components and one for the y-components
+# instead of one python object per point, there are only two arrays, and every method acts on all points in one call
+# a scalar Vector can be combined with a VectorArray, in which case it is "broadcast" to every point in the array
+class VectorArray:
+	__slots__ = ("x", "y")
+
+	def __init__(self, x, y):
+		self.x = np.ascontiguousarray(x, dtype=float)
+		self.y = np.ascontiguousarray(y, dtype=float)
+		if self.x.shape != self.y.shape:
+			raise ValueError(f"x and y must have the same shape, got {self.x.shape} and {self.y.shape}")
+
+	# build a VectorArray from a list of Vector objects
+	@classmethod
+	def from_vectors(cls, vectors):
+		N = len(vectors)
+		x = np.fromiter((v.x for v in vectors), dtype=float, count=N)
+		y = np.fromiter((v.y for v in vectors), dtype=float, count=N)
+		return cls(x, y)
+
+	# N copies of the same vector, e.g. VectorArray.full(10**7, 10, 10)
+	@classmethod
+	def full(cls, N, x, y):
+		return cls(np.full(N, x, dtype=float), np.full(N, y, dtype=float))
+
+	def __len__(self):
+		return len(self.x)
+
+	# an integer index gives back a single Vector, a slice or mask gives back a smaller VectorArray
+	def __getitem__(self, i):
+		if isinstance(i, (int, np.integer)):
+			return Vector(float(self.x[i]), float(self.y[i]))
+		return VectorArray(self.x[i], self.y[i])
+
+	def __iter__(self):
+		for x, y in zip(self.x.tolist(), self.y.tolist()):
+			yield Vector(x, y)
+
+	# magnitudes of all vectors at once
+	# np.hypot computes sqrt(x**2 + y**2) in a single pass without creating temporary arrays
+	def magnitude(self):
+		return np.hypot(self.x, self.y)
+
+	# unit normal vectors of all vectors at once
+	def norm(self):
+		mag = self.magnitude()
+		return VectorArray(self.x/mag, self.y/mag)
+
+	# dot products with a Vector (same vector for every point) or with another VectorArray (pairwise)
+	def dot(self, vec):
+		return self.x * vec.x + self.y * vec.y
+
+	def __add__(self, vec):
+		return VectorArray(self.x + vec.x, self.y + vec.y)
+
+	# Vector + VectorArray
+	def __radd__(self, vec):
+		return VectorArray(vec.x + self.x, vec.y + self.y)
+
+	def __sub__(self, vec):
+		return VectorArray(self.x - vec.x, self.y - vec.y)
+
+	# Vector - VectorArray
+	def __rsub__(self, vec):
+		return VectorArray(vec.x - self.x, vec.y - self.y)
+
+	def __repr__(self):
+		return f"VectorArray(N={len(self)})"
@@ -1 +1,159 @@
-# brownian motion - random walks
\ No newline at end of file
+# brownian motion - random walks
+
+# a small particle in a fluid is kicked around by the molecules hitting it, and wanders off in a random walk: at every
+# time step it moves by a random, normally distributed amount in every direction, independent of all the steps before
+# one walk on its own looks like noise, but an ensemble of many walkers shows the law of diffusion: the mean squared
+# displacement (MSD) grows linearly with time, <r^2> = 2*d*D*t in d dimensions with the diffusion constant D, and the
+# displacements spread out as a Gaussian whose width grows as sqrt(t)
+
+# all walkers are stepped at once: their positions are one (walkers x dims) numpy array, and a time step is one
+# vectorized update of the whole array
+# what is measured (MSD, histograms of the displacement, first-passage times) is accumulated while the walk goes on,
+# so no trajectory is ever stored and the memory only grows with the number of walkers, never with the number of steps
+
+from rng import MCG
+import numpy as np
+
+BOUNDARIES = (None, "reflecting", "periodic")
+
+class RandomWalk:
+	# @params:
+	#   walkers: number of walkers
+	#   dims: number of dimensions, 1, 2 or 3
+	#   step: standard deviation of a step in every direction, so the diffusion constant is D = step^2/2 per time step
+	#   boundary: None (free walkers, starting at the origin), or "reflecting" or "periodic" walls of the box [0, L)^dims
+	#             (walkers starting in its middle)
+	#   L: side of the box
+	#   barrier: distance from the start at which the first-passage time of a walker is recorded (None: not recorded)
+	#   record_every: the MSD is recorded every <record_every> time steps (0: never)
+	#   histogram_at: time steps at which a histogram of the displacements is taken
+	#   bins: number of bins of the histograms
+	#   rng: generator of the steps, anything with normal(n, mean, std) like the generators of physsim.rng; by default
+	#        the MCG of rng.py
+	def __init__(self, walkers, dims=1, step=1.0, boundary=None, L=None, barrier=None, record_every=1, histogram_at=(),
+			bins=50, rng=None):
+		if boundary not in BOUNDARIES:
+			raise ValueError(f"unknown boundary {boundary!r}, choose from: {', '.join(str(b) for b in BOUNDARIES)}")
+		if boundary is not None and (L is None or L <= 0):
+			raise ValueError(f"{boundary} walls need the side L > 0 of the box")
+		self.walkers = walkers
+		self.dims = dims
+		self.step_size = step
+		self.boundary = boundary
+		self.L = L
+		self.barrier = barrier
+		self.record_every = record_every
+		self.histogram_at = set(histogram_at)
+		self.bins = bins
+		self.rng = rng if rng is not None else MCG()
+
+		self.start = np.full(dims, L/2) if boundary is not None else np.zeros(dims)
+		# free and periodic walkers: x is the displacement from the start, which periodic walls don't change, so it is
+		# never wrapped (positions() wraps it into the box); reflecting walkers: x is the position inside the box
+		if boundary == "reflecting":
+			self.x = np.tile(self.start, (walkers, 1))
+		else:
+			self.x = np.zeros((walkers, dims))
+		self.t = 0 # time steps taken
+
+		# first time step at which every walker reached the barrier, -1 while it hasn't
+		self.first_passage = np.full(walkers, -1, dtype=np.int64) if barrier is not None else None
+		self.arrived = 0 # walkers that reached the barrier
+		# the measurements: MSD at the recorded time steps, and (time step, counts, bin edges) of every histogram
+		self.times = []
+		self.msd = []
+		self.histograms = []
+
+	@property
+	def diffusion_constant(self):
+		return self.step_size**2 / 2
+
+	# displacements from the start, as a (walkers, dims) array
+	def displacements(self):
+		if self.boundary == "reflecting":
+			return self.x - self.start
+		return self.x
+
+	# positions of the walkers, as a (walkers, dims) array
+	def positions(self):
+		if self.boundary == "periodic":
+			return np.mod(self.start + self.x, self.L)
+		return self.x
+
+	# squared distance of every walker from its start
+	def squared_distances(self):
+		d = self.displacements()
+		return np.einsum("ij,ij->i", d, d)
+
+	# one time step of all walkers
+	def step(self):
+		self.x += self.rng.normal(self.walkers*self.dims, 0.0, self.step_size).reshape(self.walkers, self.dims)
+		if self.boundary == "reflecting":
+			# fold the positions back into the box: a walker at x > L is mirrored to 2L - x, and one at x < 0 to -x, which
+			# is the same as taking x mod 2L and mirroring the half above L (and also works for steps longer than the box)
+			np.mod(self.x, 2*self.L, out=self.x)
+			np.subtract(2*self.L, self.x, out=self.x, where=self.x > self.L)
+		self.t += 1
+
+		record = self.record_every and self.t % self.record_every == 0
+		barrier = self.first_passage is not None and self.arrived < self.walkers
+		if record or barrier:
+			r2 = self.squared_distances()
+			if barrier:
+				reached = r2 >= self.barrier**2
+				reached &= self.first_passage < 0
+				self.first_passage[reached] = self.t
+				self.arrived += int(np.count_nonzero(reached))
+			if record:
+				self.times.append(self.t)
+				self.msd.append(float(np.mean(r2)))
+		if self.t in self.histogram_at:
+			self.histogram()
+
+	def run(self, steps):
+		for _ in range(steps):
+			self.step()
+
+	# histogram of the displacements along every direction (all directions together, since they are alike)
+	def histogram(self):
+		counts, edges = np.histogram(self.displacements(), bins=self.bins)
+		self.histograms.append((self.t, counts, edges))
+		return counts, edges
+
+	# first-passage times of the walkers that reached the barrier
+	def first_passage_times(self):
+		if self.first_passage is None:
+			raise ValueError("first-passage times need a barrier")
+		return self.first_passage[self.first_passage >= 0]
+
+if __name__ == '__main__':
+	import matplotlib.pyplot as plt
+
+	steps = 1000
+	walk = RandomWalk(100000, dims=2, step=1.0, barrier=30, histogram_at=(10, 100, 1000))
+	walk.run(steps)
+
+	fig, (ax_msd, ax_hist, ax_fpt) = plt.subplots(1, 3, figsize=(15, 4))
+
+	ax_msd.plot(walk.times, walk.msd, label="Simulation")
+	ax_msd.plot(walk.times, [2*walk.dims*walk.diffusion_constant*t for t in walk.times], "k--", label="2dDt")
+	ax_msd.set_xlabel("Time Step")
+	ax_msd.set_ylabel("Mean Squared Displacement")
+	ax_msd.legend()
+
+	for t, counts, edges in walk.histograms:
+		centers = (edges[1:] + edges[:-1]) / 2
+		density = counts / (counts.sum() * (edges[1] - edges[0]))
+		ax_hist.plot(centers, density, label=f"t={t}")
+		sigma2 = 2*walk.diffusion_constant*t
+		ax_hist.plot(centers, np.exp(-centers**2/(2*sigma2)) / np.sqrt(2*np.pi*sigma2), "k--", lw=0.8)
+	ax_hist.set_xlabel("Displacement")
+	ax_hist.set_ylabel("Probability Density")
+	ax_hist.legend()
+
+	ax_fpt.hist(walk.first_passage_times(), bins=50)
+	ax_fpt.set_xlabel(f"First-Passage Time to r={walk.barrier}")
+	ax_fpt.set_ylabel("Walkers")
+
+	fig.suptitle("Brownian Motion of 100000 Walkers in 2D")
+	plt.show()
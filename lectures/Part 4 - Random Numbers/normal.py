@@ -2,13 +2,20 @@
 
 from rng import MCG
 import math
+import numpy as np
+# rng.py puts the physsim package on the path; its NormalSampler runs the method below on whole arrays for sampleN()
+from physsim.rng.normal import NormalSampler
 
 class Normal:
-	def __init__(self, mean=0, std=1):
+	# method: how sampleN() samples, "polar" (the Box-Muller method of sample()) or "ziggurat" (physsim/rng/normal.py)
+	def __init__(self, mean=0, std=1, method="polar"):
 		self.mean = mean
 		self.std = std
 		self.rng = MCG()
 		self.extra = None # store an unused normally-distributed variable
+		self.method = method
+		self.sampler = None # the batched sampler of sampleN(), made when it is first needed
+		self.sampler_rng = None
 
 	def sample(self):
 		# pick 2 uniform random numbers in the square extending from -1 to +1 in each direction (Numerical Recipes in C, pp217)
@@ -17,6 +24,11 @@ class Normal:
 			v = self.extra
 			self.extra = None
 			return v
+		elif self.sampler is not None and len(self.sampler.surplus):
+			# numbers left over from the last sampleN() come next
+			v = self.sampler.surplus[0]
+			self.sampler.surplus = self.sampler.surplus[1:]
+			return float(v)
 		else:
 			R = 1 # distance to origin
 			while R >= 1:
@@ -28,11 +40,18 @@ class Normal:
 			self.extra = self.mean + v1 * box_muller_factor
 			return self.mean + v2 * box_muller_factor
 
+	# N numbers as a numpy array
+	# instead of one pair at a time, a whole batch of pairs goes through the same steps as in sample(), with the pairs
+	# outside the unit circle dropped all at once; the numbers a batch has left over are kept for the next call
 	def sampleN(self, N):
-		random_numbers = []
-		for _ in range(N):
-			random_numbers.append(self.sample())
-		return random_numbers
+		if self.sampler is None or self.sampler_rng is not self.rng or self.sampler.method != self.method:
+			self.sampler = NormalSampler(self.rng.sampleN, self.method, self.mean, self.std)
+			self.sampler_rng = self.rng # the generator the sampler draws from, in case self.rng is replaced
+		if self.extra is not None:
+			# a number kept by sample() comes first
+			self.sampler.surplus = np.concatenate([[self.extra], self.sampler.surplus])
+			self.extra = None
+		return self.sampler.sample(N)
 
 if __name__ == '__main__':
 	import matplotlib.pyplot as plt
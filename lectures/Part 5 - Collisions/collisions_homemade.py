@@ -3,16 +3,16 @@
 # this will show us thermalization as the system approaches an equilibrium temperature
 # the energy loss will be sampled using the Maxwell-Boltzmann distribution
 
-import math, random
-# using the standard random package because sampling from the normal distribution is non-trivial
+import math
+# the normal numbers come from wall_rng.gauss(), a separate stream of the MCG that places the particles (see below)
 
 # sample two velocity components from the Maxwell-Boltzmann distribution at temperature T_wall
 def sample_Maxwell_Boltzmann(m, T_wall, kB=1.0):
 	# let Boltzmann constant be unity
 	# velocity components are drawn from a normal distribution with mean = zero and variance = kB*T_wall/m
 	sigma = math.sqrt(kB * T_wall / m)
-	vx = random.gauss(0, sigma)
-	vy = random.gauss(0, sigma)
+	vx = wall_rng.gauss(0, sigma)
+	vy = wall_rng.gauss(0, sigma)
 	return vx, vy
 
 class Particle:
@@ -123,7 +123,9 @@ class Particle:
 		p1.vy += dvn1*ny
 
 from rng import MCG
-rng = MCG()
+# two non-overlapping streams of one MCG: rng places the particles (the same numbers as an unsplit MCG) and wall_rng
+# samples the thermal walls
+rng, wall_rng = MCG().split(2)
 
 # side length of square box environment
 L = 20 # m
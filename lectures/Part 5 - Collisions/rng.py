@@ -7,34 +7,14 @@
 # m = modulus, a very large prime number or power of a prime number
 # a = multiplier, a number less than m that is still very large
 
-# default parameters recommended by Stephen K. Park and Keith W. Miller
-modulus = 2**31 - 1
-initial_seed = int(modulus / 2)
-multiplier = 7**5
-
-class MCG:
-	def __init__(self, seed=initial_seed, modulus=modulus, multiplier=multiplier):
-		self.seed = seed
-		self.modulus = modulus
-		self.multiplier = multiplier
-		self.last_number = (multiplier * seed) % modulus
-		self.sequence = [] # collect the random numbers for repeatability
-
-	def sample(self, low=0, high=modulus):
-		R = (self.multiplier * self.last_number) % modulus # 0 <= R < modulus
-		self.last_number = R
-		self.sequence.append(R)
-		# scale to lower and upper sampling limits
-		R = low + (high - low)*(R / self.modulus)
-		return R
-
-	def sampleN(self, N, low=0, high=modulus):
-		# sample N numbers
-		numbers = []
-		for i in range(N):
-			numbers.append(self.sample(low, high))
-		return numbers
-
+# the generator itself lives in the physsim package at the root of the repository (physsim/rng/mcg.py), so that this
+# file, its copies in the other lecture folders and the physsim simulations all run the same code
+# the import below brings the names of that module into this one, so "from rng import MCG" works as before
+import os, sys
+root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if root not in sys.path:
+	sys.path.insert(0, root)
+from physsim.rng.mcg import MCG, modulus, initial_seed, multiplier, block_size, powers, record_modes
 
 if __name__ == '__main__':
 	rng = MCG()
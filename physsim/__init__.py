@@ -0,0 +1,11 @@
+# physsim: importable, plot-free versions of the physics in the lecture scripts, plus tools for running and timing them
+#
+# the lectures are written to be read top to bottom and end in plt.show(), so they can't be imported or run unattended
+# the modules in this package carry the same physics without importing matplotlib, so they can be reused by other code
+#
+# sub-packages:
+#   physsim.sims  - headless ports of the lecture simulations
+#   physsim.bench - benchmark suite for the hot kernels of every lecture
+#   physsim.rng   - random number generators with one batched interface and switchable backends
+#
+# importing physsim on its own is cheap: nothing heavy is imported until a sub-module is used
@@ -0,0 +1,92 @@
+# command line interface for running the lecture simulations without a display
+#
+#   python -m physsim list
+#   python -m physsim run collisions --steps 100000 --seed 7 --no-plot --out run.npz
+#   python -m physsim run waves -p harmonic_modes=(1,2,3,4) --savefig waves.png --no-show
+#   python -m physsim bench run --out bench.json
+#
+# only the module of the requested simulation is imported, and matplotlib only if a plot is requested
+
+import argparse
+import ast
+import json
+import sys
+import time
+
+from physsim import sims
+
+# "key=value" -> (key, value), where value is read as a python literal if possible and as a string otherwise
+def parse_param(text):
+	key, sep, value = text.partition("=")
+	if not sep:
+		raise argparse.ArgumentTypeError(f"expected key=value, got {text!r}")
+	try:
+		value = ast.literal_eval(value)
+	except (ValueError, SyntaxError):
+		pass
+	return key, value
+
+# write the result dictionary to a .npz archive, together with the settings of the run
+def save(filename, result, settings):
+	import numpy as np
+	arrays = {key: np.asarray(value) for key, value in result.items()}
+	arrays["settings"] = np.asarray(json.dumps(settings))
+	np.savez(filename, **arrays)
+
+def main(argv=None):
+	argv = sys.argv[1:] if argv is None else argv
+	# the benchmark suite has its own command line interface
+	if argv[:1] == ["bench"]:
+		from physsim.bench.__main__ import main as bench_main
+		return bench_main(argv[1:])
+
+	parser = argparse.ArgumentParser(prog="python -m physsim", description="run the lecture simulations headless")
+	commands = parser.add_subparsers(dest="command", required=True)
+
+	commands.add_parser("list", help="list the simulations")
+	commands.add_parser("bench", help="benchmark suite, see python -m physsim bench --help")
+
+	run_parser = commands.add_parser("run", help="run a simulation")
+	run_parser.add_argument("name", choices=sorted(sims.SIMS))
+	run_parser.add_argument("--steps", type=int, help="number of timesteps, samples or histories (default: as in the lecture)")
+	run_parser.add_argument("--seed", type=int, help="random seed (default: as in the lecture)")
+	run_parser.add_argument("-p", "--param", type=parse_param, action="append", default=[], metavar="KEY=VALUE", help="simulation parameter (repeatable)")
+	run_parser.add_argument("--out", help="save the result arrays to this .npz file")
+	run_parser.add_argument("--no-plot", action="store_true", help="don't plot the result (matplotlib is never imported)")
+	run_parser.add_argument("--savefig", help="save the plot to this file")
+	run_parser.add_argument("--no-show", action="store_true", help="don't open a window for the plot")
+
+	args = parser.parse_args(argv)
+
+	if args.command == "list":
+		for name in sorted(sims.SIMS):
+			print(f"{name:16s} {sims.SIMS[name][2]}")
+		return 0
+
+	run = sims.get(args.name)
+	params = dict(args.param)
+	kwargs = dict(params)
+	if args.steps is not None:
+		kwargs["steps"] = args.steps
+
+	time_start = time.perf_counter()
+	try:
+		result = run(seed=args.seed, **kwargs)
+	except ValueError as error:
+		# unknown parameters, unstable timesteps, bad seeds...
+		parser.error(f"{args.name}: {error}")
+	time_stop = time.perf_counter()
+	print(f"{args.name}: finished in {time_stop - time_start:.3f} s")
+	for key, value in result.items():
+		if isinstance(value, (int, float, str)):
+			print(f"  {key} = {value}")
+
+	if args.out:
+		save(args.out, result, {"name": args.name, "steps": args.steps, "seed": args.seed, "params": params})
+	if not args.no_plot:
+		from physsim.render import render
+		render(args.name, result, savefig=args.savefig, show=not args.no_show)
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
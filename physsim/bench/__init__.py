@@ -0,0 +1,13 @@
+# benchmark suite for the hot kernels of the lectures
+#
+# a kernel is registered with a setup function that builds its state and returns a zero-argument callable
+# the callable is timed with time.perf_counter_ns() after a few warmup calls, and the median and IQR of the repeats are reported
+# results can be written to JSON and compared against a stored baseline to catch throughput regressions
+#
+# run from the repository root:
+#   python -m physsim.bench list
+#   python -m physsim.bench run --out bench.json
+#   python -m physsim.bench run --baseline bench.json
+#   python -m physsim.bench compare new.json bench.json
+
+from physsim.bench.core import KERNELS, register, time_kernel, run, save, load, compare
@@ -0,0 +1,67 @@
+# command line interface of the benchmark suite, see physsim/bench/__init__.py
+
+import argparse
+import sys
+
+from physsim.bench import core
+
+def print_result(name, result):
+	print(
+		f"{name:32s} {result['median_ns']/1e6:10.3f} ms  "
+		f"IQR {result['iqr_ns']/1e6:8.3f} ms  "
+		f"{result['steps_per_sec']:14.1f} {result['unit']}/s")
+
+# print a comparison table and return the number of regressed kernels
+def print_comparison(rows, tolerance):
+	print(f"{'kernel':32s} {'baseline/s':>14s} {'current/s':>14s} {'ratio':>7s}")
+	regressions = 0
+	for name, old, new, ratio, regressed in rows:
+		flag = "  REGRESSION" if regressed else ""
+		print(f"{name:32s} {old:14.1f} {new:14.1f} {ratio:7.3f}{flag}")
+		regressions += regressed
+	print(f"{regressions} regression(s) beyond {tolerance:.0%} tolerance")
+	return regressions
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog="python -m physsim.bench", description="benchmark the hot kernels of the lectures")
+	commands = parser.add_subparsers(dest="command", required=True)
+
+	commands.add_parser("list", help="list the registered kernels")
+
+	run_parser = commands.add_parser("run", help="time the kernels")
+	run_parser.add_argument("-k", "--kernel", action="append", default=[], help="only run kernels whose name contains this (repeatable)")
+	run_parser.add_argument("--repeats", type=int, default=20, help="number of timed calls per kernel")
+	run_parser.add_argument("--warmup", type=int, default=3, help="number of untimed calls before timing")
+	run_parser.add_argument("--out", help="write the results to this JSON file")
+	run_parser.add_argument("--baseline", help="compare against this JSON file and exit with status 1 on regressions")
+	run_parser.add_argument("--tolerance", type=float, default=0.1, help="allowed fractional drop in throughput (default 0.1)")
+
+	compare_parser = commands.add_parser("compare", help="compare two result files")
+	compare_parser.add_argument("current")
+	compare_parser.add_argument("baseline")
+	compare_parser.add_argument("--tolerance", type=float, default=0.1, help="allowed fractional drop in throughput (default 0.1)")
+
+	args = parser.parse_args(argv)
+
+	if args.command == "list":
+		import physsim.bench.kernels
+		for name in sorted(core.KERNELS):
+			kernel = core.KERNELS[name]
+			print(f"{name:32s} {kernel.lecture:8s} {kernel.steps} {kernel.unit} per call")
+		return 0
+
+	if args.command == "run":
+		results = core.run(args.kernel, args.repeats, args.warmup, report=print_result)
+		if args.out:
+			core.save(results, args.out)
+		if args.baseline:
+			rows = core.compare(results, core.load(args.baseline), args.tolerance)
+			return 1 if print_comparison(rows, args.tolerance) else 0
+		return 0
+
+	if args.command == "compare":
+		rows = core.compare(core.load(args.current), core.load(args.baseline), args.tolerance)
+		return 1 if print_comparison(rows, args.tolerance) else 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,114 @@
+# registry, timing harness, JSON output and baseline comparison for the benchmark suite
+
+import json
+import platform
+import statistics
+import sys
+import time
+
+# all registered kernels by name
+KERNELS = {}
+
+class Kernel:
+	def __init__(self, name, setup, steps, unit, lecture):
+		self.name = name
+		self.setup = setup # builds the state and returns a callable that runs the kernel once
+		self.steps = steps # amount of physics done in one call, used for the throughput
+		self.unit = unit # what one step is, e.g. "samples" or "particle-steps"
+		self.lecture = lecture # lecture the kernel comes from
+
+# decorator that adds a setup function to the registry
+# @params:
+#   name: unique name of the kernel, e.g. "rng.mcg_sampleN"
+#   steps: amount of physics done in one call of the kernel
+#   unit: what one step is
+#   lecture: lecture the kernel comes from
+def register(name, steps, unit="steps", lecture=""):
+	def decorator(setup):
+		if name in KERNELS:
+			raise ValueError(f"kernel {name!r} is already registered")
+		KERNELS[name] = Kernel(name, setup, steps, unit, lecture)
+		return setup
+	return decorator
+
+# summary statistics of a list of call durations in nanoseconds
+def summarize(kernel, times_ns):
+	q1, median, q3 = statistics.quantiles(times_ns, n=4, method="inclusive")
+	return {
+		"lecture": kernel.lecture,
+		"steps": kernel.steps,
+		"unit": kernel.unit,
+		"repeats": len(times_ns),
+		"median_ns": median,
+		"iqr_ns": q3 - q1,
+		"min_ns": min(times_ns),
+		"mean_ns": statistics.fmean(times_ns),
+		"steps_per_sec": kernel.steps / (median * 1e-9) if median > 0 else float("inf"),
+	}
+
+# time one kernel
+# the first <warmup> calls are not recorded, so caches, lazy imports and allocations don't skew the result
+def time_kernel(kernel, repeats=20, warmup=3):
+	if repeats < 2:
+		raise ValueError("at least 2 repeats are needed for the IQR")
+	func = kernel.setup()
+	for _ in range(warmup):
+		func()
+	times_ns = []
+	for _ in range(repeats):
+		start = time.perf_counter_ns()
+		func()
+		times_ns.append(time.perf_counter_ns() - start)
+	return summarize(kernel, times_ns)
+
+# time every registered kernel whose name contains one of the patterns (all kernels if no patterns are given)
+# report(name, result) is called after each kernel, e.g. to print progress
+def run(patterns=(), repeats=20, warmup=3, report=None):
+	# importing the kernels module fills the registry
+	import physsim.bench.kernels
+
+	results = {}
+	for name in sorted(KERNELS):
+		if patterns and not any(pattern in name for pattern in patterns):
+			continue
+		results[name] = time_kernel(KERNELS[name], repeats, warmup)
+		if report is not None:
+			report(name, results[name])
+	return {"meta": metadata(repeats, warmup), "results": results}
+
+# information about the machine and interpreter, stored with every result file
+def metadata(repeats, warmup):
+	meta = {
+		"python": platform.python_version(),
+		"implementation": platform.python_implementation(),
+		"platform": platform.platform(),
+		"machine": platform.machine(),
+		"repeats": repeats,
+		"warmup": warmup,
+		"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+	}
+	if "numpy" in sys.modules:
+		meta["numpy"] = sys.modules["numpy"].__version__
+	return meta
+
+def save(results, filename):
+	with open(filename, "w") as f:
+		json.dump(results, f, indent=2, sort_keys=True)
+
+def load(filename):
+	with open(filename, "r") as f:
+		return json.load(f)
+
+# compare the throughput of two result sets kernel by kernel
+# a kernel has regressed if its steps/sec dropped by more than <tolerance> (a fraction) relative to the baseline
+# returns a list of (name, baseline steps/sec, current steps/sec, ratio, regressed) for the kernels in both sets
+def compare(current, baseline, tolerance=0.1):
+	rows = []
+	for name in sorted(current["results"]):
+		if name not in baseline["results"]:
+			continue
+		new = current["results"][name]["steps_per_sec"]
+		old = baseline["results"][name]["steps_per_sec"]
+		ratio = new / old if old > 0 else float("inf")
+		rows.append((name, old, new, ratio, ratio < 1.0 - tolerance))
+	return rows
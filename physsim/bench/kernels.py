@@ -0,0 +1,234 @@
+# the hot kernels of the lectures, registered with the benchmark suite
+# every setup function builds the kernel's state once and returns the callable that is timed
+
+import functools
+import math
+
+from physsim import lectures
+from physsim.bench.core import register
+
+N_VECTORS = 10**5
+N_SAMPLES = 10**5
+N_HISTORIES = 1000
+N_WAVE_STEPS = 100
+
+# Part 1: the timing loop of libraries.py
+
+@register("vector.magnitude", steps=N_VECTORS, unit="vectors", lecture="Part 1")
+def vector_magnitude():
+	vector = lectures.load(1, "vector")
+	posns = [vector.Vector(10, 10) for i in range(N_VECTORS)]
+	return lambda: [p.magnitude() for p in posns]
+
+@register("vector.hypot", steps=N_VECTORS, unit="vectors", lecture="Part 1")
+def vector_hypot():
+	vector = lectures.load(1, "vector")
+	posns = [vector.Vector(10, 10) for i in range(N_VECTORS)]
+	return lambda: [math.hypot(p.x, p.y) for p in posns]
+
+@register("vector_array.magnitude", steps=N_VECTORS, unit="vectors", lecture="Part 1")
+def vector_array_magnitude():
+	vector = lectures.load(1, "vector")
+	posns = vector.VectorArray.full(N_VECTORS, 10, 10)
+	return posns.magnitude
+
+# Part 2: the dx convergence sweep of numerical_differentiation1.py
+
+@register("differentiation.fd_sweep", steps=1000*4, unit="derivatives", lecture="Part 2")
+def fd_sweep():
+	from physsim.sims.differentiation import fd_sweep
+	x = [i*0.01 for i in range(1000)]
+	dxs = [1.0, 0.5, 0.1, 0.05]
+	return lambda: fd_sweep(math.sin, x, dxs, "forward")
+
+@register("derivatives.sweep", steps=1000*4, unit="derivatives", lecture="Part 2")
+def derivatives_sweep():
+	import numpy as np
+	from physsim.derivatives import derivative
+	x = np.arange(1000)*0.01
+	dxs = np.array([1.0, 0.5, 0.1, 0.05])
+	return lambda: derivative(np.sin, x, dxs, "forward")
+
+@register("derivatives.complex_step", steps=1000, unit="derivatives", lecture="Part 2")
+def derivatives_complex_step():
+	import numpy as np
+	from physsim.derivatives import complex_step
+	x = np.arange(1000)*0.01
+	return lambda: complex_step(np.sin, x)
+
+# Part 2: an ensemble of 10**5 decay curves with different N0 and t_half, advanced together by the integrators
+
+N_ENSEMBLE = 10**5
+
+def decay_ensemble():
+	import numpy as np
+	generator = np.random.default_rng(0)
+	N0 = generator.uniform(100, 1000, N_ENSEMBLE)
+	decay_const = np.log(2) / generator.uniform(0.5, 2.0, N_ENSEMBLE)
+	return (lambda t, N: -decay_const*N), N0
+
+@register("integrators.rk4_decay_ensemble", steps=N_ENSEMBLE*50, unit="member-steps", lecture="Part 2")
+def rk4_decay_ensemble():
+	import numpy as np
+	from physsim.integrators import integrate
+	f, N0 = decay_ensemble()
+	t = np.linspace(0, 5, 51)
+	return lambda: integrate(f, t, N0, "rk4")
+
+@register("integrators.dopri45_decay_ensemble", steps=N_ENSEMBLE, unit="members", lecture="Part 2")
+def dopri45_decay_ensemble():
+	from physsim.integrators import dopri45
+	f, N0 = decay_ensemble()
+	return lambda: dopri45(f, (0, 5), N0, rtol=1e-8, atol=1e-8)
+
+# Part 3: the projectile loop of kinematics3.py, one Projectile at a time and as a ParticleBatch
+
+N_PROJECTILES = 1000
+
+@register("kinematics.projectile_loop", steps=N_PROJECTILES, unit="projectiles", lecture="Part 3")
+def projectile_loop():
+	from physsim.sims.kinematics import run_projectile
+	theta0s = [5 + 80*i/N_PROJECTILES for i in range(N_PROJECTILES)]
+	return lambda: run_projectile(theta0s=theta0s)
+
+@register("projectiles.batch", steps=N_PROJECTILES, unit="projectiles", lecture="Part 3")
+def projectiles_batch():
+	import numpy as np
+	from physsim.projectiles import ParticleBatch
+	theta0 = 5 + 80*np.arange(N_PROJECTILES)/N_PROJECTILES
+	return lambda: ParticleBatch.launch(theta0, 15.0, vt=30.0).run(g=9.8, dt=0.1)
+
+# Part 4: multiplicative congruential generator
+
+@register("rng.mcg_sampleN", steps=N_SAMPLES, unit="samples", lecture="Part 4")
+def mcg_sampleN():
+	rng = lectures.load(4, "rng")
+	# a new generator for every call, so every repeat draws the same numbers
+	return lambda: rng.MCG().sampleN(N_SAMPLES, 0, 1)
+
+# Part 4: throughput of every backend of physsim.rng, in batches and one gauss() at a time
+# the generator is built once, since seeding some backends costs more than drawing a batch
+
+RNG_BACKENDS = ("mcg", "philox", "pcg64", "xorshift")
+N_RNG = 10**6
+
+def rng_batch_setup(backend, method):
+	from physsim import rng
+	generator = rng.generator(backend)
+	draw = getattr(generator, method)
+	return lambda: draw(N_RNG)
+
+def rng_gauss_setup(backend):
+	from physsim import rng
+	gauss = rng.generator(backend).gauss
+	return lambda: [gauss(0, 1) for _ in range(N_SAMPLES)]
+
+for backend in RNG_BACKENDS:
+	for method in ("uniform", "normal", "exponential"):
+		register(f"rng.{backend}.{method}", steps=N_RNG, unit="samples", lecture="Part 4")(functools.partial(rng_batch_setup, backend, method))
+	register(f"rng.{backend}.gauss", steps=N_SAMPLES, unit="samples", lecture="Part 4")(functools.partial(rng_gauss_setup, backend))
+
+# Part 4: normal.py, one pair at a time with sample() as in the lecture, and in batches with sampleN()
+
+@register("normal.sample", steps=N_SAMPLES, unit="samples", lecture="Part 4")
+def normal_sample():
+	nrm = lectures.load(4, "normal").Normal()
+	return lambda: [nrm.sample() for _ in range(N_SAMPLES)]
+
+def normal_sampleN_setup(method):
+	nrm = lectures.load(4, "normal").Normal(method=method)
+	return lambda: nrm.sampleN(N_RNG)
+
+for method in ("polar", "ziggurat"):
+	register(f"normal.sampleN_{method}", steps=N_RNG, unit="samples", lecture="Part 4")(functools.partial(normal_sampleN_setup, method))
+
+# Part 4: sampling.py, the closed-form inverse CDF applied per element, and the tables of physsim.rng.sampling
+
+@register("sampling.exponential_inverse", steps=N_SAMPLES, unit="samples", lecture="Part 4")
+def sampling_exponential_inverse():
+	rng = lectures.load(4, "rng").MCG()
+	return lambda: [-math.log(1 - R) for R in rng.sampleN(N_SAMPLES, 0, 1)]
+
+@register("sampling.exponential_table", steps=N_RNG, unit="samples", lecture="Part 4")
+def sampling_exponential_table():
+	import numpy as np
+	from physsim import rng
+	from physsim.rng import sampling
+	table = sampling.continuous(lambda x: np.exp(-x), 0, 40, cache_dir=None)
+	generator = rng.generator("mcg")
+	return lambda: table.sample(generator, N_RNG)
+
+@register("sampling.alias", steps=N_RNG, unit="samples", lecture="Part 4")
+def sampling_alias():
+	from physsim import rng
+	from physsim.rng import sampling
+	generator = rng.generator("mcg")
+	table = sampling.discrete(generator.uniform(1000), cache_dir=None)
+	return lambda: table.sample(generator, N_RNG)
+
+# Part 4: integration.py's estimate of pi by physsim.montecarlo, with random, stratified and quasi-random points
+
+def montecarlo_setup(method):
+	from physsim import montecarlo
+	f, low, high, _ = montecarlo.pi_integrand()
+	return lambda: montecarlo.integrate(f, low, high, method=method, max_evaluations=N_RNG, seed=1)
+
+for method in ("mc", "stratified", "sobol", "halton"):
+	register(f"montecarlo.{method}", steps=N_RNG, unit="points", lecture="Part 4")(functools.partial(montecarlo_setup, method))
+
+# Part 4: one time step of an ensemble of walkers in brownian.py
+
+N_WALKERS = 10**6
+
+@register("brownian.step", steps=N_WALKERS, unit="walker-steps", lecture="Part 4")
+def brownian_step():
+	walk = lectures.load(4, "brownian").RandomWalk(N_WALKERS, dims=3, barrier=10)
+	return walk.step
+
+# Part 5: one frame of animate() in collisions1.py (periodic) and collision2.py (reflective)
+
+def collisions_setup(boundary):
+	from physsim.sims import collisions
+	rng = lectures.load(4, "rng").MCG()
+	L, dt = 10, 0.01
+	particles = collisions.place_particles(rng, 20, L, mass=0.01, radius=0.1, vmax=5)
+	return lambda: collisions.step(particles, 0, 0, dt, L, boundary)
+
+@register("collisions.animate_periodic", steps=20, unit="particle-steps", lecture="Part 5")
+def collisions_periodic():
+	return collisions_setup("periodic")
+
+@register("collisions.animate_reflective", steps=20, unit="particle-steps", lecture="Part 5")
+def collisions_reflective():
+	return collisions_setup("reflective")
+
+# Part 7: update() in waves1.py, as written (python loop) and with numpy slices
+
+def waves_setup(update):
+	from physsim.sims import waves
+	N, L, c, dt = 100, 1.0, 1.0, 0.009
+	dx = L / (N - 1)
+	x, u_curr, u_prev = waves.initial_state(N, L, (2,))
+	def kernel():
+		u, u_old = u_curr, u_prev
+		for _ in range(N_WAVE_STEPS):
+			u, u_old = update(u, u_old, c, dt, dx)
+	return kernel
+
+@register("waves.update_loop", steps=N_WAVE_STEPS, unit="timesteps", lecture="Part 7")
+def waves_update_loop():
+	from physsim.sims import waves
+	return waves_setup(waves.update_loop)
+
+@register("waves.update", steps=N_WAVE_STEPS, unit="timesteps", lecture="Part 7")
+def waves_update():
+	from physsim.sims import waves
+	return waves_setup(waves.update)
+
+# Part 8: the photon history loop of compton.py
+
+@register("compton.histories", steps=N_HISTORIES, unit="histories", lecture="Part 8")
+def compton_histories():
+	from physsim.sims import compton
+	MCG = lectures.load(8, "rng").MCG
+	return lambda: compton.run_histories(N_HISTORIES, MCG())
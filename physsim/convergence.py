@@ -0,0 +1,176 @@
+# convergence studies of discretization error
+#
+# a solver is run for a geometric ladder of step sizes (dt, dt/2, dt/4, ...) in a pool of processes, and each result
+# is compared against an analytic reference, or against the finest step when there is none (then corrected for the
+# finest step's own error, see study())
+# for a method of order p the error behaves like C*dt**p, so the observed order between two neighbouring steps is
+#   p = log(error1/error2) / log(dt1/dt2)
+# and the largest step that meets a tolerance tol can be read off the table, or estimated as dt*(tol/error)**(1/p)
+#
+#   python -m physsim.convergence decay --dt 0.5 --levels 8 --tol 1e-3
+
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+# step sizes coarsest, coarsest/ratio, coarsest/ratio**2, ... (levels values)
+def ladder(coarsest, levels=6, ratio=2.0):
+	return [coarsest / ratio**k for k in range(levels)]
+
+# solver(step) with its run time
+def timed(solver, step):
+	time_start = time.perf_counter()
+	result = solver(step)
+	return result, time.perf_counter() - time_start
+
+# largest absolute difference between two results (numbers or arrays of the same shape)
+def max_error(result, reference):
+	return float(np.max(np.abs(np.asarray(result, dtype=float) - np.asarray(reference, dtype=float))))
+
+class ConvergenceStudy:
+	def __init__(self, steps, errors, times, reference_step=None, orders=None, reference_order=None):
+		self.steps = steps # step sizes, coarsest first
+		self.errors = errors # error of each step
+		self.times = times # run time of each step in seconds
+		self.reference_step = reference_step # step of the finest-grid reference, None if the reference was exact
+		self.reference_order = reference_order # order the errors were corrected with for the reference's own error
+		# observed order between each step and the next finer one
+		if orders is None:
+			orders = [observed_order(steps[k], errors[k], steps[k+1], errors[k+1]) for k in range(len(steps) - 1)]
+		self.orders = orders
+
+	# the largest step on the ladder whose error is at most tol, or None if none is
+	def largest_step(self, tol):
+		for step, error in zip(self.steps, self.errors):
+			if error <= tol:
+				return step
+		return None
+
+	# the step at which the error is expected to reach tol, extrapolated from the finest step with the finest observed order
+	def estimated_step(self, tol):
+		order = next((p for p in reversed(self.orders) if p is not None and p > 0), None)
+		step, error = self.steps[-1], self.errors[-1]
+		if order is None or error == 0:
+			return None
+		return step * (tol / error)**(1 / order)
+
+	# text table of steps, errors, observed orders and run times
+	def table(self):
+		lines = [f"{'step':>12s} {'error':>12s} {'order':>7s} {'time (s)':>10s}"]
+		for k, (step, error, run_time) in enumerate(zip(self.steps, self.errors, self.times)):
+			order = self.orders[k-1] if k > 0 else None
+			order_text = f"{order:7.3f}" if order is not None else f"{'':7s}"
+			lines.append(f"{step:12.5g} {error:12.5g} {order_text} {run_time:10.4f}")
+		if self.reference_step is not None and self.reference_order is not None:
+			lines.append(f"(errors from the finest step {self.reference_step:.5g}, corrected for its own error with order {self.reference_order:.3f})")
+		elif self.reference_step is not None:
+			lines.append(f"(errors relative to the finest step {self.reference_step:.5g}, not corrected: no observed order)")
+		return "\n".join(lines)
+
+# observed order of accuracy between two steps, None if either error is zero
+def observed_order(step1, error1, step2, error2):
+	if error1 <= 0 or error2 <= 0:
+		return None
+	return math.log(error1 / error2) / math.log(step1 / step2)
+
+# run <solver> for every step in <steps> in a process pool and measure the discretization error
+# @params:
+#   solver: picklable function solver(step) returning a number or array at fixed points that don't depend on the step
+#           (a module-level function, or functools.partial of one)
+#   steps: step sizes, e.g. ladder(0.1, 8)
+#   reference: exact result; if None, the finest step is used as the reference and left out of the table
+#   workers: number of processes (None = number of CPUs, 0 = run in this process)
+# returns a ConvergenceStudy
+def study(solver, steps, reference=None, workers=None):
+	steps = sorted(steps, reverse=True)
+	if workers == 0:
+		runs = [timed(solver, step) for step in steps]
+	else:
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			runs = list(pool.map(partial(timed, solver), steps))
+	results = [result for result, _ in runs]
+	times = [run_time for _, run_time in runs]
+
+	if reference is not None:
+		errors = [max_error(result, reference) for result in results]
+		return ConvergenceStudy(steps, errors, times)
+
+	if len(steps) < 3:
+		raise ValueError("at least 3 steps are needed when the finest step is the reference")
+	# the finest result still has an error of its own, which makes the errors of the finer steps look too small
+	# the differences between neighbouring results don't depend on the reference, so the orders are taken from those:
+	#   r[k] - r[k+1] ~ C*dt[k]**p * (1 - (dt[k+1]/dt[k])**p)
+	differences = [max_error(results[k], results[k+1]) for k in range(len(results) - 1)]
+	orders = [observed_order(steps[k], differences[k], steps[k+1], differences[k+1]) for k in range(len(differences) - 1)]
+	# for the same reason the difference to the finest result is only part of the error:
+	#   r[k] - r[-1] ~ C*dt[k]**p * (1 - (dt[-1]/dt[k])**p)
+	# so it is divided by the bracket, with the order observed between the finest steps, to get the error of r[k] itself
+	# (uncorrected, a first-order error one step above the reference would look half as large as it is)
+	order = next((p for p in reversed(orders) if p is not None and p > 0), None)
+	errors = [max_error(result, results[-1]) for result in results[:-1]]
+	if order is not None:
+		errors = [error / (1 - (steps[-1] / step)**order) for step, error in zip(steps, errors)]
+	return ConvergenceStudy(steps[:-1], errors, times[:-1], steps[-1], orders, order)
+
+# solvers from the lectures, each returning its result at a fixed time so every step size can be compared
+
+# the time steps from 0 to t_end with step dt: whole steps, and a last shorter one where dt doesn't divide t_end, so
+# every step size ends exactly at t_end (rounding t_end/dt to whole steps would stop the rungs of a ladder at different
+# times, and the difference in end time would count as error)
+def time_steps(dt, t_end):
+	whole = math.floor(t_end / dt + 1e-9)
+	steps = [dt]*whole
+	rest = t_end - whole*dt
+	if rest > 1e-9*dt:
+		steps.append(rest)
+	return steps
+
+# numerical_differentiation3.py: N(t_end) of radioactive decay with Euler's method
+def decay_euler(dt, N0=500, t_half=1.0, t_end=5.0):
+	decay_const = math.log(2) / t_half
+	N = N0
+	for h in time_steps(dt, t_end):
+		N = N + (-decay_const*N)*h
+	return N
+
+def decay_exact(N0=500, t_half=1.0, t_end=5.0):
+	return N0*math.exp(-math.log(2) / t_half * t_end)
+
+# kinematics2.py: height and speed at t_end of a particle falling with linear drag, with Particle.euler
+def freefall_euler(dt, mass=0.01, g=9.8, vt=30.0, y0=100.0, v0=0.0, t_end=4.0):
+	from physsim.sims.kinematics import Particle
+	k = mass*g/vt
+	p = Particle(m=mass, y=y0, v=v0)
+	for h in time_steps(dt, t_end):
+		p.euler(-g*mass - k*p.v, h)
+	return [p.y, p.v]
+
+# name -> (solver, exact reference or None for the finest step, description)
+STUDIES = {
+	"decay": (decay_euler, decay_exact(), "Euler's method for radioactive decay, N(5 hr) against the exact solution"),
+	"freefall": (freefall_euler, None, "Particle.euler free fall with drag, y and v at 4 s against the finest step"),
+}
+
+if __name__ == '__main__':
+	import argparse
+	parser = argparse.ArgumentParser(prog="python -m physsim.convergence", description="convergence study of a lecture solver")
+	parser.add_argument("name", choices=sorted(STUDIES))
+	parser.add_argument("--dt", type=float, default=0.5, help="coarsest step")
+	parser.add_argument("--levels", type=int, default=8, help="number of step sizes")
+	parser.add_argument("--ratio", type=float, default=2.0, help="ratio between neighbouring steps")
+	parser.add_argument("--tol", type=float, help="recommend the largest step that meets this error")
+	parser.add_argument("--workers", type=int, help="number of processes (default: number of CPUs, 0: no pool)")
+	args = parser.parse_args()
+
+	solver, reference, description = STUDIES[args.name]
+	print(description)
+	result = study(solver, ladder(args.dt, args.levels, args.ratio), reference, args.workers)
+	print(result.table())
+	if args.tol is not None:
+		print(f"largest step on the ladder with error <= {args.tol:g}: {result.largest_step(args.tol)}")
+		estimate = result.estimated_step(args.tol)
+		if estimate is not None:
+			print(f"extrapolated step for error = {args.tol:g}: {estimate:.5g}")
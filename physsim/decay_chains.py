@@ -0,0 +1,204 @@
+# radioactive decay chains (Bateman equations)
+#
+# numerical_differentiation3.py integrates dN/dt = -lambda*N for a single species with Euler's method
+# in a chain, every member i decays with its own constant lambda_i into its daughter(s), so for the vector of amounts N
+#   dN/dt = A N,    A[i][i] = -lambda_i,    A[j][i] = lambda_i * branching fraction from i to j
+# this linear system has the exact solution N(t) = exp(A t) N0, which is computed here from the eigendecomposition
+# A = V diag(w) V^-1, so any time costs a few small matrix products however long it is, with no timesteps at all
+#
+# for small numbers of atoms the decays are random: gillespie() simulates every single decay exactly, and
+# tau_leap() draws the number of decays in each time interval tau at once, which stays fast for 10**9 atoms and more
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+class DecayChain:
+	# @params:
+	#   half_lives: half-life of every member (math.inf for a stable member), or
+	#   decay_constants: decay constant lambda = ln(2)/t_half of every member (0 for a stable member)
+	#   branching: matrix with branching[j][i] = fraction of decays of member i that produce member j
+	#              (columns may add up to less than 1: the rest leaves the chain); the default is the
+	#              linear chain 0 -> 1 -> 2 -> ..., where every decay produces the next member
+	#   names: optional names of the members
+	def __init__(self, half_lives=None, decay_constants=None, branching=None, names=None):
+		if (half_lives is None) == (decay_constants is None):
+			raise ValueError("give either half_lives or decay_constants")
+		if decay_constants is None:
+			decay_constants = [0.0 if math.isinf(t_half) else math.log(2) / t_half for t_half in half_lives]
+		self.decay_constants = np.array(decay_constants, dtype=float)
+		n = len(self.decay_constants)
+		if np.any(self.decay_constants < 0):
+			raise ValueError("decay constants must not be negative")
+
+		if branching is None:
+			branching = np.eye(n, k=-1)
+		self.branching = np.array(branching, dtype=float)
+		if self.branching.shape != (n, n):
+			raise ValueError(f"branching must be a {n}x{n} matrix")
+		if np.any(self.branching < 0) or np.any(self.branching.sum(axis=0) > 1 + 1e-12) or np.any(np.diag(self.branching) != 0):
+			raise ValueError("branching fractions must be non-negative, add up to at most 1 per member, and not feed a member into itself")
+		self.names = list(names) if names is not None else [f"N{i}" for i in range(n)]
+
+	def __len__(self):
+		return len(self.decay_constants)
+
+	# the rate matrix A of dN/dt = A N
+	@property
+	def matrix(self):
+		return self.branching*self.decay_constants - np.diag(self.decay_constants)
+
+	# hashable description of the chain, used as the key of the eigendecomposition cache
+	def key(self):
+		return (tuple(self.decay_constants.tolist()), tuple(map(tuple, self.branching.tolist())))
+
+	# exact amounts of every member at time(s) t, starting from amounts N0 at t = 0
+	# returns an array of shape t.shape + (members,); N0 may also hold many initial states, shape (..., members)
+	def solve(self, N0, t):
+		N0 = np.asarray(N0, dtype=float)
+		t = np.asarray(t, dtype=float)
+		decomposition = eigendecomposition(self.key())
+		if decomposition is None:
+			# degenerate chain (equal decay constants): no eigenbasis, so exp(A t) is computed for every time
+			A = self.matrix
+			out = np.array([N0 @ expm(A*ti).T for ti in t.ravel()])
+			return out.reshape(t.shape + N0.shape)
+		w, V, V_inv = decomposition
+		# N(t) = V exp(w t) V^-1 N0, the coefficients V^-1 N0 don't depend on t
+		c = N0 @ V_inv.T
+		growth = np.exp(np.multiply.outer(t, w)) # t.shape + (members,)
+		if N0.ndim > 1:
+			growth = growth.reshape(t.shape + (1,)*(N0.ndim - 1) + w.shape)
+		return (growth*c) @ V.T
+
+	# activity (decays per unit time) of every member for amounts N
+	def activity(self, N):
+		return np.asarray(N)*self.decay_constants
+
+# eigendecomposition (w, V, V^-1) of the rate matrix of a chain, cached by the chain's key()
+# returns None if the matrix has no well-conditioned eigenbasis, which happens when decay constants are (nearly) equal
+@lru_cache(maxsize=256)
+def eigendecomposition(key):
+	decay_constants, branching = key
+	decay_constants = np.array(decay_constants)
+	A = np.array(branching)*decay_constants - np.diag(decay_constants)
+
+	w, V = np.linalg.eig(A)
+	if np.iscomplexobj(w) or np.linalg.cond(V) > 1e10:
+		return None
+	return w, V, np.linalg.inv(V)
+
+# matrix exponential by scaling and squaring with a (6,6) Pade approximant (Golub & Van Loan, Algorithm 11.3.1)
+# used for chains whose rate matrix can't be diagonalized
+def expm(M, q=6):
+	M = np.asarray(M, dtype=float)
+	norm = np.linalg.norm(M, np.inf)
+	s = max(0, int(math.ceil(math.log2(norm / 0.5)))) if norm > 0.5 else 0
+	A = M / 2**s
+	identity = np.eye(len(M))
+	N, D, X = identity.copy(), identity.copy(), identity.copy()
+	c = 1.0
+	for k in range(1, q + 1):
+		c = c*(q - k + 1) / (k*(2*q - k + 1))
+		X = A @ X
+		N += c*X
+		D += (-1)**k*c*X
+	E = np.linalg.solve(D, N)
+	for _ in range(s):
+		E = E @ E
+	return E
+
+# probabilities of where a decay of each member goes: columns are the members, rows the daughters,
+# with an extra last row for decays that leave the chain
+def decay_outcomes(chain):
+	leave = 1.0 - chain.branching.sum(axis=0)
+	return np.vstack([chain.branching, np.clip(leave, 0, None)])
+
+# exact stochastic simulation of a single sample, one decay at a time (Gillespie's direct method)
+# @params:
+#   chain: DecayChain
+#   N0: initial number of atoms of every member (integers)
+#   t: increasing times at which to record the numbers of atoms
+#   rng: generator of physsim.rng; by default a new one from the configured backend, seeded with <seed>
+#   seed: seed of that generator
+#   max_events: stop with an error after this many decays
+# returns an integer array of shape (len(t), members)
+def gillespie(chain, N0, t, rng=None, seed=None, max_events=10**7):
+	if rng is None:
+		from physsim import rng as backends
+		rng = backends.generator(seed=seed)
+	N = np.array(N0, dtype=np.int64)
+	t = np.asarray(t, dtype=float)
+	# where a decay of each member goes, as cumulative probabilities (a column per member)
+	outcomes = np.cumsum(decay_outcomes(chain), axis=0)
+	record = np.empty((len(t), len(chain)), dtype=np.int64)
+
+	time = 0.0
+	next_record = 0
+	for event in range(max_events + 1):
+		propensities = chain.decay_constants*N
+		total = propensities.sum()
+		# time of the next decay, exponentially distributed with rate = total propensity (inverse CDF, -log(1 - R)/rate)
+		time_next = time - math.log1p(-rng.sample(0, 1))/total if total > 0 else math.inf
+		while next_record < len(t) and t[next_record] < time_next:
+			record[next_record] = N
+			next_record += 1
+		if next_record == len(t):
+			return record
+		if event == max_events:
+			break
+		# which member decays, and into what
+		i = np.searchsorted(np.cumsum(propensities), rng.sample(0, total), side="right")
+		i = min(i, len(chain) - 1)
+		j = np.searchsorted(outcomes[:, i], rng.sample(0, outcomes[-1, i]), side="right")
+		j = min(j, len(outcomes) - 1)
+		N[i] -= 1
+		if j < len(chain):
+			N[j] += 1
+		time = time_next
+	raise RuntimeError(f"more than {max_events} decays before t = {t[-1]}, use tau_leap() instead")
+
+# approximate stochastic simulation of many samples by tau-leaping
+# in every interval tau, each of the N_i atoms of member i decays with probability 1 - exp(-lambda_i*tau), so the number
+# of decays is binomially distributed (which, unlike a Poisson draw, can never take more atoms than there are)
+# atoms produced during an interval only start decaying in the next one, so tau must be small compared to the half-lives
+# @params:
+#   chain: DecayChain
+#   N0: initial number of atoms of every member (integers)
+#   t: increasing times at which to record the numbers of atoms
+#   runs: number of independent samples, simulated together
+#   tau: leap interval, by default chosen so that at most a fraction epsilon of any member decays per leap
+#   rng: generator of physsim.rng; by default a new one from the configured backend, seeded with <seed>
+#   seed: seed of that generator
+# returns an integer array of shape (len(t), runs, members)
+def tau_leap(chain, N0, t, runs=1, tau=None, epsilon=0.01, rng=None, seed=None):
+	if rng is None:
+		from physsim import rng as backends
+		rng = backends.generator(seed=seed)
+	N = np.tile(np.array(N0, dtype=np.int64), (runs, 1))
+	t = np.asarray(t, dtype=float)
+	if tau is None:
+		fastest = chain.decay_constants.max()
+		tau = epsilon/fastest if fastest > 0 else math.inf
+	outcomes = decay_outcomes(chain)
+	record = np.empty((len(t), runs, len(chain)), dtype=np.int64)
+
+	time = 0.0
+	for k, t_record in enumerate(t):
+		while time < t_record:
+			if t_record - time <= tau:
+				# land exactly on the recording time
+				dt, time_next = t_record - time, t_record
+			else:
+				dt, time_next = tau, time + tau
+			p_decay = -np.expm1(-chain.decay_constants*dt)
+			decays = rng.binomial(N, p_decay)
+			N -= decays
+			for i in range(len(chain)):
+				if chain.decay_constants[i] > 0:
+					# share the decays of member i out among its daughters (the last outcome leaves the chain)
+					N += rng.multinomial(decays[:, i], outcomes[:, i])[:, :len(chain)]
+			time = time_next
+		record[k] = N
+	return record
@@ -0,0 +1,172 @@
+# vectorized finite difference derivatives
+#
+# the lecture's forward_fd, backward_fd and central_fd compute one derivative at one point for one dx
+# here every point and every dx are computed together: func is called once per stencil point on a whole
+# (points x dx) grid of numpy arrays, so a full convergence sweep is a handful of numpy operations instead of
+# thousands of python function calls
+#
+# a finite difference "stencil" is a set of offsets o_j (in units of dx) with weights w_j, such that
+#   f'(x) ~ sum_j w_j * f(x + o_j*dx) / dx
+# with an error proportional to dx**order
+
+from functools import lru_cache
+
+import numpy as np
+
+# (method, order) -> (offsets, weights)
+STENCILS = {
+	("forward", 1): ((0, 1), (-1, 1)),
+	("forward", 2): ((0, 1, 2), (-3/2, 2, -1/2)),
+	("forward", 4): ((0, 1, 2, 3, 4), (-25/12, 4, -3, 4/3, -1/4)),
+	("backward", 1): ((-1, 0), (-1, 1)),
+	("backward", 2): ((-2, -1, 0), (1/2, -2, 3/2)),
+	("backward", 4): ((-4, -3, -2, -1, 0), (1/4, -4/3, 3, -4, 25/12)),
+	("central", 2): ((-1, 1), (-1/2, 1/2)),
+	("central", 4): ((-2, -1, 1, 2), (1/12, -2/3, 2/3, -1/12)),
+}
+
+# lowest order of each method, used when no order is given (the lecture's finite differences)
+DEFAULT_ORDER = {"forward": 1, "backward": 1, "central": 2}
+
+# offsets and weights of a stencil
+def stencil(method="central", order=None):
+	if order is None:
+		if method not in DEFAULT_ORDER:
+			raise ValueError(f"unknown method {method!r}, choose from: {', '.join(DEFAULT_ORDER)}")
+		order = DEFAULT_ORDER[method]
+	if (method, order) not in STENCILS:
+		orders = sorted(o for m, o in STENCILS if m == method)
+		raise ValueError(f"no {method!r} stencil of order {order}, available orders: {orders}")
+	return STENCILS[(method, order)]
+
+# derivative of func at every point in x, for every step size in dx
+# @params:
+#   func: a function of one variable that accepts numpy arrays, e.g. np.sin
+#   x: the points at which to compute the derivative (scalar or array)
+#   dx: the step sizes (scalar or array)
+#   method: "forward", "backward" or "central"
+#   order: order of accuracy of the stencil (1, 2 or 4, depending on method), lowest available if None
+# returns an array of shape x.shape + dx.shape, e.g. (points x dx) for 1D arrays of points and step sizes
+def derivative(func, x, dx, method="central", order=None):
+	offsets, weights = stencil(method, order)
+	x = np.asarray(x, dtype=float)
+	dx = np.asarray(dx, dtype=float)
+	if np.any(dx == 0):
+		raise ValueError("step sizes must be non-zero")
+
+	# put the points along the leading axes and the step sizes along the trailing axes
+	X = x.reshape(x.shape + (1,)*dx.ndim)
+	dydx = np.zeros(x.shape + dx.shape)
+	for offset, weight in zip(offsets, weights):
+		if offset == 0:
+			# f(x) doesn't depend on dx, so it is evaluated once per point and broadcast over the step sizes
+			dydx += weight * func(X)
+		else:
+			dydx += weight * func(X + offset*dx)
+	return dydx / dx
+
+# wrap func in a bounded memo cache of func(x) values, so evaluating it at the same x again costs nothing
+# the least recently used values are dropped once maxsize values are stored
+# a function that is already cached is returned as it is, so several derivative calls can share one cache:
+#   f = cached(expensive_simulation)
+#   adaptive_derivative(f, 1.0, "central")
+#   adaptive_derivative(f, 1.0, "forward") # re-uses f(1 + h/2**k) from the central estimate
+#   f.cache_info() # hits, misses (= actual evaluations of the simulation), maxsize, currsize
+def cached(func, maxsize=4096):
+	if hasattr(func, "cache_info"):
+		return func
+	return lru_cache(maxsize=maxsize)(func)
+
+# power of h in each successive error term of the lowest-order stencils
+# forward and backward differences have errors c1*h + c2*h**2 + ..., central differences only even powers c2*h**2 + c4*h**4 + ...
+ERROR_POWERS = {"forward": 1, "backward": 1, "central": 2}
+
+# the lecture's finite differences at a single point, evaluated through f
+def difference(f, x, h, method):
+	if method == "forward":
+		return (f(x + h) - f(x)) / h
+	if method == "backward":
+		return (f(x) - f(x - h)) / h
+	return (f(x + h) - f(x - h)) / (2*h)
+
+# derivative of func at the single point x by Richardson extrapolation (Numerical Recipes' dfridr)
+# the finite difference is computed for steps h, h/2, h/4, ... and every new estimate is combined with the previous ones
+# to cancel the leading error terms, until the estimated error falls below tol
+# @params:
+#   func: a function of one variable, e.g. the output of an expensive simulation; wrapped with cached() if it isn't already
+#   x: the point at which to compute the derivative
+#   method: "forward", "backward" or "central"
+#   h: the initial step, which need not be small: it only has to be a scale over which func changes appreciably
+#   tol: absolute error at which to stop refining
+#   max_levels: maximum number of step halvings
+# returns (derivative, estimated error)
+def adaptive_derivative(func, x, method="central", h=0.1, tol=1e-8, max_levels=12, maxsize=4096):
+	if method not in ERROR_POWERS:
+		raise ValueError(f"unknown method {method!r}, choose from: {', '.join(ERROR_POWERS)}")
+	if h == 0:
+		raise ValueError("initial step must be non-zero")
+	f = cached(func, maxsize)
+	power = ERROR_POWERS[method]
+	x = float(x)
+
+	# previous row of the extrapolation tableau
+	previous = [difference(f, x, h, method)]
+	best, error = previous[0], float("inf")
+	for k in range(1, max_levels):
+		row = [difference(f, x, h / 2**k, method)]
+		for j in range(1, k + 1):
+			# eliminate the error term proportional to h**(power*j)
+			factor = 2**(power*j)
+			row.append(row[j-1] + (row[j-1] - previous[j-1]) / (factor - 1))
+			# the error is estimated from the difference to the neighbouring estimates in the tableau
+			new_error = max(abs(row[j] - row[j-1]), abs(row[j] - previous[j-1]))
+			if new_error <= error:
+				best, error = row[j], new_error
+		if error <= tol:
+			break
+		# once round-off dominates, higher orders only get worse
+		if abs(row[k] - previous[k-1]) >= 2*error:
+			break
+		previous = row
+	return best, error
+
+# derivative of an analytic function by the complex-step method
+# for a real function that extends to complex arguments (np.sin, np.exp, polynomials...), the Taylor series
+#   f(x + ih) = f(x) + ih f'(x) - h**2 f''(x)/2 - ...
+# gives f'(x) = Im(f(x + ih))/h + O(h**2) with no subtraction, so there is no cancellation and h can be tiny:
+# one evaluation gives the derivative to machine precision
+# @params:
+#   func: a function of one variable that accepts complex numpy arrays (abs() and comparisons are not analytic, avoid them)
+#   x: the points at which to compute the derivative (scalar or array)
+#   h: the imaginary step
+# returns an array of the shape of x
+def complex_step(func, x, h=1e-20):
+	x = np.asarray(x, dtype=float)
+	return np.imag(func(x + 1j*h)) / h
+
+# derivative of periodic samples by the FFT
+# a periodic signal is a sum of modes exp(i k x), and d/dx multiplies each mode by ik, so
+#   dy/dx = ifft(ik * fft(y))
+# which is exact for band-limited signals and converges faster than any power of the spacing for smooth ones
+# @params:
+#   y: equally spaced samples over exactly one period (without repeating the first sample at the end),
+#      any number of signals along the other axes
+#   period: length of the period, i.e. the number of samples times their spacing
+#   order: order of the derivative (1 = first derivative, 2 = second...)
+#   axis: axis of y along which the samples are
+# returns an array of the shape of y
+def spectral_derivative(y, period=2*np.pi, order=1, axis=-1):
+	y = np.asarray(y)
+	n = y.shape[axis]
+	shape = [1]*y.ndim
+	shape[axis] = -1
+	if np.iscomplexobj(y):
+		k = 2*np.pi*np.fft.fftfreq(n, d=period/n)
+		return np.fft.ifft((1j*k.reshape(shape))**order * np.fft.fft(y, axis=axis), axis=axis)
+
+	k = 2*np.pi*np.fft.rfftfreq(n, d=period/n)
+	multiplier = (1j*k)**order
+	if n % 2 == 0 and order % 2 == 1:
+		# the Nyquist mode of an even number of samples has no definite sign, so its odd derivatives are dropped
+		multiplier[-1] = 0
+	return np.fft.irfft(multiplier.reshape(shape) * np.fft.rfft(y, axis=axis), n=n, axis=axis)
@@ -0,0 +1,114 @@
+# events: stop or record exactly where a condition on the state crosses zero, inside a timestep
+#
+# the loops of kinematics1.py - kinematics3.py run "while p.y > 0", so they stop one step after the particle has gone
+# below the ground, and the landing time and range are only as accurate as dt
+# an event is a function of the particle that changes sign where something happens, e.g. lambda p: p.y for the impact
+# with the ground or lambda p: p.vy for the apex; after every step its sign is checked, and when it has changed the
+# step is redone from the saved state with a shorter interval, found by root finding, that ends exactly on the event
+# the step itself stays as large as before, only the last one is cut short
+#
+#   p = Projectile(m=0.01, x=0, y=0, vx=10, vy=10)
+#   ground = Event(lambda p: p.y, direction=-1, name="impact")
+#   apex = Event(lambda p: p.vy, direction=-1, terminal=False, name="apex")
+#   t, hits = integrate(p, lambda p, dt: p.euler(-k*p.vx, gforce - k*p.vy, dt), 0.1, [ground, apex])
+
+class Event:
+	# @params:
+	#   function: function(particle) returning a number that crosses zero at the event
+	#   terminal: stop the integration at the event
+	#   direction: only count crossings from positive to negative (-1), negative to positive (+1), or both (0)
+	#   name: label used in the results
+	def __init__(self, function, terminal=True, direction=0, name=None):
+		self.function = function
+		self.terminal = terminal
+		self.direction = direction
+		self.name = name if name is not None else getattr(function, "__name__", "event")
+
+	def __call__(self, particle):
+		return self.function(particle)
+
+	# whether the value going from g0 to g1 is a crossing this event counts
+	def crossed(self, g0, g1):
+		if self.direction <= 0 and g0 > 0 and g1 <= 0:
+			return True
+		if self.direction >= 0 and g0 < 0 and g1 >= 0:
+			return True
+		return False
+
+# the particle's attributes, enough to redo a step from here
+def save(particle):
+	return dict(vars(particle))
+
+def restore(particle, state):
+	vars(particle).update(state)
+
+# length of the step from <state> after which event(particle) is zero, between 0 and dt
+# the step is repeated with trial lengths, so the event lies on the integrator's own trajectory; the trial lengths
+# come from the Illinois variant of regula falsi, which starts from linear interpolation and converges superlinearly
+# leaves the particle at the end of the returned step
+def locate(particle, step, state, dt, event, g0, g1, tol=1e-12, max_iterations=50):
+	a, b = 0.0, dt
+	ga, gb = g0, g1
+	side = 0
+	s = dt
+	for _ in range(max_iterations):
+		s = (a*gb - b*ga) / (gb - ga) if gb != ga else (a + b)/2
+		restore(particle, state)
+		step(particle, s)
+		gs = event(particle)
+		if gs == 0 or abs(b - a) <= tol*abs(dt):
+			break
+		if (gs > 0) == (gb > 0):
+			b, gb = s, gs
+			if side == -1:
+				ga /= 2
+			side = -1
+		else:
+			a, ga = s, gs
+			if side == 1:
+				gb /= 2
+			side = 1
+	return s
+
+# advance <particle> with step(particle, dt) until a terminal event or <max_steps> steps
+# @params:
+#   particle: object whose attributes hold the whole state, e.g. Particle or Projectile from physsim.sims.kinematics
+#   step: function step(particle, dt) that advances the particle by dt
+#   dt: timestep
+#   events: list of Event
+#   t0: initial time
+#   record: function record(t, particle) called at the start and after every step, including the shortened last one
+# returns the final time and a list of (event name, t, state) for every event that happened, in order
+def integrate(particle, step, dt, events, t0=0.0, max_steps=100000, record=None):
+	t = t0
+	values = [event(particle) for event in events]
+	hits = []
+	if record is not None:
+		record(t, particle)
+	for _ in range(max_steps):
+		state = save(particle)
+		step(particle, dt)
+		new_values = [event(particle) for event in events]
+		crossings = [i for i, event in enumerate(events) if event.crossed(values[i], new_values[i])]
+		if crossings:
+			# locate every crossing, then keep the ones that come before the first terminal event
+			found = []
+			for i in crossings:
+				s = locate(particle, step, state, dt, events[i], values[i], new_values[i])
+				found.append((s, i, save(particle)))
+			found.sort(key=lambda hit: hit[0])
+			for s, i, hit_state in found:
+				hits.append((events[i].name, t + s, hit_state))
+				if events[i].terminal:
+					restore(particle, hit_state)
+					if record is not None:
+						record(t + s, particle)
+					return t + s, hits
+			# no terminal event: carry on from the end of the full step
+			restore(particle, state)
+			step(particle, dt)
+		t += dt
+		values = new_values
+		if record is not None:
+			record(t, particle)
+	return t, hits
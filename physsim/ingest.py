@@ -0,0 +1,130 @@
+# bulk reading of large CSV files like freefall_data.csv, with a binary cache
+#
+# kinematics_io2.py reads a CSV file with readlines(), then split(",") and float() on every line, so every number goes
+# through the python interpreter; read_csv() instead cuts the file into large blocks of bytes, ends every block on a line
+# break, and hands each block to numpy's C parser in one call, optionally with one process per block
+# the parsed columns can be cached in a binary trajectory file (physsim.trajectory) next to the CSV file, named after
+# the size and modification time of the CSV file, so a changed CSV file never reuses a stale cache and a repeated run
+# only memory-maps the cache without parsing anything
+#
+#   data = read_csv("freefall_data.csv", cache=True)
+#   data["t"], data["y"]
+#
+#   python -m physsim.ingest freefall_data.csv --workers 4 --cache
+
+import glob
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from physsim import trajectory
+
+BLOCK_BYTES = 1 << 26 # 64 MiB of text per block
+
+# column names from the header line and the byte offset where the data starts
+def read_header(filename, delimiter=","):
+	with open(filename, "rb") as f:
+		header = f.readline()
+		return [name.strip() for name in header.decode().split(delimiter)], f.tell()
+
+# byte ranges [start, stop) of about <block_bytes> each that cover the data from <offset> to <size>
+# the ranges are cut at arbitrary bytes; parse_range() moves each cut to the next line break
+def byte_ranges(offset, size, block_bytes=BLOCK_BYTES):
+	starts = list(range(offset, size, block_bytes)) or [offset]
+	return [(start, min(start + block_bytes, size)) for start in starts]
+
+# parse the lines that start inside the byte range [start, stop) into an array with <columns> columns
+# a line that starts before <start> belongs to the previous range, a line that starts before <stop> is read to its end
+def parse_range(filename, start, stop, columns, first, delimiter=","):
+	with open(filename, "rb") as f:
+		if start > first:
+			# skip to the start of the first line that begins at or after start
+			f.seek(start - 1)
+			f.readline()
+		else:
+			f.seek(start)
+		begin = f.tell()
+		text = f.read(max(0, stop - begin))
+		if text and not text.endswith(b"\n"):
+			text += f.readline()
+	if not text.strip():
+		return np.empty((0, columns))
+	return np.loadtxt(io.StringIO(text.decode()), delimiter=delimiter, ndmin=2, usecols=range(columns))
+
+# parse the whole CSV file into a record array with one named column per header entry
+# @params:
+#   filename: CSV file with a header line of column names, e.g. "t,y"
+#   workers: number of processes parsing blocks in parallel (None or 0: parse in this process)
+#   block_bytes: size of the blocks the file is cut into
+def parse_csv(filename, workers=None, block_bytes=BLOCK_BYTES, delimiter=","):
+	names, first = read_header(filename, delimiter)
+	ranges = byte_ranges(first, os.path.getsize(filename), block_bytes)
+	if workers and len(ranges) > 1:
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			blocks = list(pool.map(parse_range, *zip(*[(filename, start, stop, len(names), first, delimiter) for start, stop in ranges])))
+	else:
+		blocks = [parse_range(filename, start, stop, len(names), first, delimiter) for start, stop in ranges]
+	values = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+
+	data = np.empty(len(values), dtype=[(name, float) for name in names])
+	for i, name in enumerate(names):
+		data[name] = values[:, i]
+	return data
+
+# name of the cache file of a CSV file, from its current size and modification time
+def cache_path(filename):
+	stat = os.stat(filename)
+	directory, base = os.path.split(os.path.abspath(filename))
+	return os.path.join(directory, f".{base}.{stat.st_size}-{stat.st_mtime_ns}.npy")
+
+# all cache files of a CSV file, current or stale
+def cache_files(filename):
+	directory, base = os.path.split(os.path.abspath(filename))
+	return glob.glob(os.path.join(glob.escape(directory), f".{glob.escape(base)}.*-*.npy"))
+
+# read a CSV file into a record array with one named column per header entry (data["t"], data["y"], ...)
+# with cache=True the result is stored in a binary file next to the CSV file, and later calls memory-map that file
+# instead of parsing, as long as the CSV file keeps its size and modification time
+def read_csv(filename, workers=None, cache=False, block_bytes=BLOCK_BYTES, delimiter=","):
+	if not cache:
+		return parse_csv(filename, workers, block_bytes, delimiter)
+
+	path = cache_path(filename)
+	if os.path.exists(path):
+		return trajectory.read(path)
+	data = parse_csv(filename, workers, block_bytes, delimiter)
+	for stale in cache_files(filename):
+		os.remove(stale)
+	# write under a temporary name first, so an interrupted run never leaves a truncated cache behind
+	temporary = path + ".tmp"
+	with open(temporary, "wb") as f:
+		np.save(f, data)
+	os.replace(temporary, path)
+	return trajectory.read(path)
+
+# remove the cache files of a CSV file, returns how many were removed
+def clear_cache(filename):
+	stale = cache_files(filename)
+	for path in stale:
+		os.remove(path)
+	return len(stale)
+
+if __name__ == '__main__':
+	import argparse
+	import time
+	parser = argparse.ArgumentParser(prog="python -m physsim.ingest", description="parse a large CSV file into numpy arrays")
+	parser.add_argument("input")
+	parser.add_argument("--workers", type=int, help="number of processes parsing blocks in parallel")
+	parser.add_argument("--block-mb", type=float, default=BLOCK_BYTES / 2**20, help="size of a block in MiB")
+	parser.add_argument("--cache", action="store_true", help="keep a binary copy next to the CSV file and reuse it")
+	parser.add_argument("--clear-cache", action="store_true", help="remove the binary copies of the CSV file")
+	args = parser.parse_args()
+
+	if args.clear_cache:
+		print(f"removed {clear_cache(args.input)} cache file(s)")
+	else:
+		time_start = time.perf_counter()
+		data = read_csv(args.input, args.workers, args.cache, int(args.block_mb*2**20))
+		print(f"{args.input}: {len(data)} rows, columns {', '.join(data.dtype.names)} in {time.perf_counter() - time_start:.3f} s")
@@ -0,0 +1,236 @@
+# ODE integrators that advance a whole ensemble of states at once
+#
+# numerical_differentiation3.py advances one number with Euler's method, y1 = y0 + dydx*dx, which is only first-order accurate
+# the integrators here take a numpy array of states y (e.g. 10**5 decay samples, each with its own N0 and t_half) and a
+# vectorized derivative function f(t, y) that returns dy/dt for every state in one call, so each step is a few numpy operations
+#
+#   euler    first order, the lecture's method
+#   rk4      classic 4th-order Runge-Kutta, fixed step
+#   dopri45  adaptive Dormand-Prince 5(4) Runge-Kutta with error control and dense output
+#   verlet   symplectic velocity Verlet for x'' = a(t, x), which conserves energy over long runs
+
+import numpy as np
+
+# one Euler step: y(t + dt) ~ y + f(t, y)*dt
+def euler_step(f, t, y, dt):
+	return y + dt*f(t, y)
+
+# one classic 4th-order Runge-Kutta step
+def rk4_step(f, t, y, dt):
+	k1 = f(t, y)
+	k2 = f(t + dt/2, y + dt/2*k1)
+	k3 = f(t + dt/2, y + dt/2*k2)
+	k4 = f(t + dt, y + dt*k3)
+	return y + dt/6*(k1 + 2*k2 + 2*k3 + k4)
+
+STEPPERS = {"euler": euler_step, "rk4": rk4_step}
+
+# integrate dy/dt = f(t, y) over the times in t with a fixed-step method
+# @params:
+#   f: derivative function f(t, y) that accepts the whole ensemble array y
+#   t: increasing times at which the solution is wanted, t[0] being the initial time
+#   y0: initial state(s), any array shape
+#   method: "euler" or "rk4"
+# returns an array of shape (len(t),) + y0.shape with the state at every time
+def integrate(f, t, y0, method="rk4"):
+	if method not in STEPPERS:
+		raise ValueError(f"unknown method {method!r}, choose from: {', '.join(STEPPERS)}")
+	step = STEPPERS[method]
+	t = np.asarray(t, dtype=float)
+	y = np.asarray(y0, dtype=float)
+	ys = np.empty((len(t),) + y.shape)
+	ys[0] = y
+	for i in range(1, len(t)):
+		y = step(f, t[i-1], y, t[i] - t[i-1])
+		ys[i] = y
+	return ys
+
+# one velocity Verlet step for x'' = accel(t, x)
+# a is the acceleration at (t, x), which the previous step already computed; pass None to compute it
+# returns the new position, velocity and acceleration
+def verlet_step(accel, t, x, v, dt, a=None):
+	if a is None:
+		a = accel(t, x)
+	v_half = v + 0.5*dt*a
+	x_new = x + dt*v_half
+	a_new = accel(t + dt, x_new)
+	v_new = v_half + 0.5*dt*a_new
+	return x_new, v_new, a_new
+
+# integrate x'' = accel(t, x) over the times in t with velocity Verlet
+# returns the arrays of positions and velocities, each of shape (len(t),) + x0.shape
+def verlet(accel, t, x0, v0):
+	t = np.asarray(t, dtype=float)
+	x = np.asarray(x0, dtype=float)
+	v = np.asarray(v0, dtype=float)
+	xs = np.empty((len(t),) + x.shape)
+	vs = np.empty((len(t),) + v.shape)
+	xs[0], vs[0] = x, v
+	a = None
+	for i in range(1, len(t)):
+		x, v, a = verlet_step(accel, t[i-1], x, v, t[i] - t[i-1], a)
+		xs[i], vs[i] = x, v
+	return xs, vs
+
+# Dormand-Prince 5(4) coefficients (Hairer, Norsett & Wanner, Solving ODEs I)
+DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+DP_A = [
+	[],
+	[1/5],
+	[3/40, 9/40],
+	[44/45, -56/15, 32/9],
+	[19372/6561, -25360/2187, 64448/6561, -212/729],
+	[9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+]
+# 5th-order weights of the six stages
+DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+# difference between the 5th- and 4th-order solutions, weights of all seven stages (the seventh is f at the new point)
+DP_E = np.array([71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40])
+# 4th-order continuous extension: y(t + theta*h) = y + h * sum_i k_i * (P[i] . [theta, theta**2, theta**3, theta**4])
+DP_P = np.array([
+	[1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+	[0, 0, 0, 0],
+	[0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+	[0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+	[0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+	[0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+	[0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+# result of dopri45()
+class Solution:
+	def __init__(self, t0, y0, dense):
+		self.t = [t0] # times at the end of every accepted step (only the start and the end with t_eval)
+		self.y = [y0] # states at those times
+		self.nfev = 0 # number of calls of f (each call evaluates the whole ensemble)
+		self.rejected = 0 # number of rejected steps
+		self.t_eval = None
+		self.y_eval = None
+		# for dense output: (t_old, h, y_old, Q) of every accepted step
+		self.segments = [] if dense else None
+
+	# state at any time(s) inside the integrated interval, from the continuous extension of the step containing it
+	def __call__(self, t):
+		if self.segments is None:
+			raise ValueError("dense output was not recorded, call dopri45(..., dense=True)")
+		t = np.asarray(t, dtype=float)
+		starts = np.array([segment[0] for segment in self.segments])
+		forward = self.t[-1] >= self.t[0]
+		out = []
+		for ti in t.ravel():
+			if forward:
+				i = np.clip(np.searchsorted(starts, ti, side="right") - 1, 0, len(starts) - 1)
+			else:
+				i = np.clip(np.searchsorted(-starts, -ti, side="right") - 1, 0, len(starts) - 1)
+			out.append(dense_output(self.segments[i], ti))
+		return np.array(out).reshape(t.shape + np.shape(self.y[0]))
+
+# evaluate the continuous extension of one step at time t
+def dense_output(segment, t):
+	t_old, h, y_old, Q = segment
+	theta = (t - t_old) / h
+	powers = np.array([theta, theta**2, theta**3, theta**4])
+	return y_old + h*(Q @ powers)
+
+# integrate dy/dt = f(t, y) from t_span[0] to t_span[1] with adaptive Dormand-Prince 5(4) steps
+# the whole ensemble shares one step size, chosen so that the worst member meets the tolerance
+# @params:
+#   f: derivative function f(t, y) that accepts the whole ensemble array y
+#   t_span: (initial time, final time)
+#   y0: initial state(s), any array shape
+#   rtol, atol: relative and absolute tolerance on the local error of every component
+#   t_eval: times at which to report the solution, sorted in the direction of integration and inside t_span, or None;
+#           with t_eval the steps aren't stored, and the Solution's t and y only hold the start and the end
+#   dense: keep the continuous extension of every step, so the Solution can be called at any time
+#   h0: initial step, estimated from f(t0, y0) if None
+#   max_steps: maximum number of accepted steps; rejected steps don't count, but a step with a NaN or infinite error, or
+#              one so small that t no longer changes, raises a RuntimeError instead of being retried forever
+# returns a Solution with t and y at every step, y_eval at t_eval, and nfev
+def dopri45(f, t_span, y0, rtol=1e-6, atol=1e-9, t_eval=None, dense=False, h0=None, max_steps=100000):
+	t0, t1 = float(t_span[0]), float(t_span[1])
+	y = np.asarray(y0, dtype=float)
+	direction = 1.0 if t1 >= t0 else -1.0
+	solution = Solution(t0, y, dense)
+
+	if t_eval is not None:
+		t_eval = np.atleast_1d(np.asarray(t_eval, dtype=float))
+		# the solution is reported at t_eval as the steps pass them, so they must come in the order the steps reach them
+		if t_eval.ndim != 1 or np.any((t_eval < min(t0, t1)) | (t_eval > max(t0, t1))):
+			raise ValueError(f"t_eval must be a list of times inside t_span [{t0}, {t1}]")
+		if np.any(direction*np.diff(t_eval) < 0):
+			raise ValueError("t_eval must be sorted in the direction of integration")
+		solution.t_eval = t_eval
+		solution.y_eval = np.empty(t_eval.shape + y.shape)
+		next_eval = 0
+		# times equal to t0 are reported straight away
+		while next_eval < len(t_eval) and t_eval[next_eval] == t0:
+			solution.y_eval[next_eval] = y
+			next_eval += 1
+
+	k1 = f(t0, y)
+	solution.nfev += 1
+	if h0 is None:
+		# step over which f would change y by about 1% of its size
+		scale = atol + rtol*np.abs(y)
+		d0 = np.sqrt(np.mean((y/scale)**2))
+		d1 = np.sqrt(np.mean((k1/scale)**2))
+		h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01*d0/d1
+	h = min(abs(h0), abs(t1 - t0))
+
+	t = t0
+	steps = 0
+	K = np.empty((7,) + y.shape)
+	while direction*(t1 - t) > 0:
+		if steps >= max_steps:
+			raise RuntimeError(f"dopri45 did not reach t = {t1} within {max_steps} steps")
+		h = min(h, abs(t1 - t))
+		dt = direction*h
+
+		# the six stages of the step
+		K[0] = k1
+		for s in range(1, 6):
+			K[s] = f(t + DP_C[s]*dt, y + dt*np.tensordot(DP_A[s], K[:s], axes=1))
+		y_new = y + dt*np.tensordot(DP_B, K[:6], axes=1)
+		t_new = t + dt
+		# the seventh stage is f at the new point, which is also the first stage of the next step ("first same as last")
+		K[6] = f(t_new, y_new)
+		solution.nfev += 6
+
+		# error of the 4th-order solution relative to the tolerance, worst component of the ensemble
+		scale = atol + rtol*np.maximum(np.abs(y), np.abs(y_new))
+		error = np.max(np.abs(dt*np.tensordot(DP_E, K, axes=1)) / scale)
+		if not np.isfinite(error):
+			# a smaller step can't repair a NaN or infinity in f, so every retry would be rejected too
+			raise RuntimeError(f"dopri45: the error estimate at t = {t} is {error}, f returned NaN or infinity")
+
+		if error <= 1.0:
+			if dense or t_eval is not None:
+				Q = np.moveaxis(np.tensordot(DP_P.T, K, axes=([1], [0])), 0, -1)
+				segment = (t, dt, y, Q)
+				if dense:
+					solution.segments.append(segment)
+				if t_eval is not None:
+					while next_eval < len(t_eval) and direction*(t_new - t_eval[next_eval]) >= 0:
+						solution.y_eval[next_eval] = dense_output(segment, t_eval[next_eval])
+						next_eval += 1
+			t, y, k1 = t_new, y_new, K[6].copy()
+			if t_eval is None:
+				solution.t.append(t)
+				solution.y.append(y)
+			steps += 1
+			# grow the step, at most by a factor of 5
+			factor = 5.0 if error == 0 else min(5.0, 0.9*error**-0.2)
+		else:
+			solution.rejected += 1
+			# shrink the step, at most by a factor of 5
+			factor = max(0.2, 0.9*error**-0.2)
+			if t + direction*h*factor == t:
+				raise RuntimeError(f"dopri45: the step size at t = {t} became too small to meet the tolerance")
+		h = h*factor
+
+	if t_eval is not None and steps:
+		solution.t.append(t)
+		solution.y.append(y)
+	solution.t = np.array(solution.t)
+	solution.y = np.array(solution.y)
+	return solution
@@ -0,0 +1,56 @@
+# access to the modules that live inside the lecture folders
+#
+# the lecture folders have spaces in their names ("Part 4 - Random Numbers"), so they can't be imported as packages
+# instead, a module is loaded straight from its file, e.g. load(4, "rng") gives the MCG module of Part 4
+# only modules that are safe to import (no plotting at module level, like rng.py and vector.py) should be loaded this way
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lectures")
+
+PARTS = {
+	1: "Part 1 - Python Programming",
+	2: "Part 2 - Numerical Differentiation",
+	3: "Part 3 - Kinematics",
+	4: "Part 4 - Random Numbers",
+	5: "Part 5 - Collisions",
+	6: "Part 6 - Thermodynamics",
+	7: "Part 7 - Oscillations",
+	8: "Part 8 - Radiation",
+}
+
+# folder of a lecture part, or a file inside it
+def path(part, filename=None):
+	folder = os.path.join(ROOT, PARTS[part])
+	if filename is None:
+		return folder
+	return os.path.join(folder, filename)
+
+# load lecture module <name>.py from lecture part <part>
+# the module is cached, so loading it twice gives back the same module object
+def load(part, name):
+	key = f"_lecture{part}_{name}"
+	if key in sys.modules:
+		return sys.modules[key]
+
+	folder = path(part)
+	filename = os.path.join(folder, name + ".py")
+	if not os.path.isfile(filename):
+		raise ImportError(f"no module {name!r} in {PARTS[part]!r}")
+
+	spec = importlib.util.spec_from_file_location(key, filename)
+	module = importlib.util.module_from_spec(spec)
+	# lecture modules import their neighbours by plain name (e.g. "from rng import MCG"),
+	# so the lecture folder has to be on the path while the module runs
+	sys.path.insert(0, folder)
+	sys.modules[key] = module
+	try:
+		spec.loader.exec_module(module)
+	except BaseException:
+		del sys.modules[key]
+		raise
+	finally:
+		sys.path.remove(folder)
+	return module
@@ -0,0 +1,395 @@
+# streaming Monte Carlo integration over d-dimensional boxes, with a stop as soon as a requested accuracy is reached
+#
+# integration.py draws all its random numbers up front into lists, loops over the points one by one and appends every
+# point to one of four lists, only to count the hits at the end; here the integrand is evaluated on one batch of points
+# at a time as a numpy array, and the running mean and variance of its values are updated batch by batch (Welford's
+# algorithm, merging each batch's mean and sum of squared deviations into the running ones), so memory stays at one
+# batch however many points are drawn, and the integral's standard error is known after every batch
+# integration stops when the standard error is below an absolute tolerance tol, or below rel_tol times the estimate
+# points for a plot are only kept if asked for, and then only the first keep_points of them
+#
+# besides plain Monte Carlo ("mc") the points can be drawn so that the error is smaller for the same number of them:
+#   antithetic: every point u of the unit cube comes with its mirror image 1 - u, and the pair's average is one
+#               observation; good for integrands that are mostly increasing or decreasing
+#   stratified: every batch splits the box into m^d equal cells with the same number of points in each, so no region
+#               is over- or undersampled; the error comes from the spread inside the cells only
+#   importance: the points come from a proposal density q(x) that has more of them where f is large, and f(x)/q(x) is
+#               the observation (a proposal is needed, e.g. GaussianProposal)
+#   sobol, halton: randomized quasi-Monte Carlo, low-discrepancy points of physsim.rng.qmc; a number of independently
+#               scrambled copies of the sequence (replicates) are run side by side, and the spread of their estimates is
+#               the error estimate, since the points within one copy aren't independent
+#
+#   estimate = integrate(lambda x: np.exp(-np.sum(x**2, axis=1)), [-3]*4, [3]*4, rel_tol=1e-3)
+#   estimate.value, estimate.error, estimate.evaluations
+#   integrate(f, [-3]*4, [3]*4, rel_tol=1e-5, method="sobol", replicates=32)
+#   integrate(f, [-3]*4, [3]*4, rel_tol=1e-3, method="importance", proposal=GaussianProposal([0]*4, 0.7))
+#
+#   python -m physsim.montecarlo pi --tol 1e-4
+#   python -m physsim.montecarlo ball --dims 5 --rel-tol 1e-3
+#   python -m physsim.montecarlo gaussian --dims 4 --rel-tol 1e-6 --method sobol
+import functools
+import math
+import time
+
+import numpy as np
+
+BATCH_SIZE = 2**16 # points per batch
+MAX_EVALUATIONS = 10**8
+REPLICATES = 16 # independently scrambled sequences of randomized quasi-Monte Carlo
+POINTS_PER_CELL = 2 # points per cell of stratified sampling, at least 2 to estimate the spread inside a cell
+
+# running count, mean and sum of squared deviations of a stream of numbers, updated a batch at a time
+class Welford:
+	def __init__(self):
+		self.count = 0
+		self.mean = 0.0
+		self.m2 = 0.0 # sum of squared deviations from the mean
+
+	def update(self, values):
+		n = len(values)
+		if n == 0:
+			return
+		batch_mean = float(np.mean(values))
+		batch_m2 = float(np.sum((values - batch_mean)**2))
+		# Chan, Golub & LeVeque: combine two sets from their counts, means and sums of squared deviations
+		total = self.count + n
+		delta = batch_mean - self.mean
+		self.mean += delta * n / total
+		self.m2 += batch_m2 + delta*delta * self.count * n / total
+		self.count = total
+
+	@property
+	def variance(self):
+		return self.m2 / (self.count - 1) if self.count > 1 else math.inf
+
+	# standard error of the mean
+	@property
+	def error(self):
+		return math.sqrt(self.variance / self.count) if self.count > 1 else math.inf
+
+# result of an integration
+class Estimate:
+	def __init__(self, value, error, evaluations, batches, converged, elapsed, method, points=None, values=None):
+		self.value = value # estimate of the integral
+		self.error = error # its standard error
+		self.evaluations = evaluations # number of points the integrand was evaluated at
+		self.batches = batches
+		self.converged = converged # whether the tolerance was reached before max_evaluations
+		self.elapsed = elapsed # wall-clock seconds
+		self.method = method
+		self.points = points # the kept points, (keep_points, d), and the integrand at them
+		self.values = values
+
+	def __repr__(self):
+		status = "converged" if self.converged else "not converged"
+		return f"{self.value:.10g} +- {self.error:.3g} ({self.method}, {self.evaluations} evaluations, {status})"
+
+# the estimators: each draws the points of a batch, evaluates f there and keeps its own statistics, so that its value
+# and error properties are the estimate of the integral and its standard error after every batch
+# update(n) evaluates f at most n times, for any n of at least min_batch
+
+# plain Monte Carlo: points uniform in the box, and one observation volume*f(x) per point, whose mean is the integral
+class PlainMC:
+	min_batch = 1
+
+	def __init__(self, f, low, high, rng):
+		self.f = f
+		self.low = low
+		self.width = high - low
+		self.d = len(low)
+		self.volume = float(np.prod(self.width))
+		self.rng = rng
+		self.stats = Welford()
+
+	# points of the box from points of the unit cube
+	def scale(self, u):
+		u *= self.width
+		u += self.low
+		return u
+
+	# n uniform points in the box, as an (n, d) array
+	def points(self, n):
+		return self.scale(self.rng.uniform(n*self.d).reshape(n, self.d))
+
+	def evaluate(self, x):
+		return np.asarray(self.f(x), dtype=float) * np.ones(len(x))
+
+	# one batch of about n evaluations; returns the points evaluated and the integrand's values there
+	def update(self, n):
+		x = self.points(n)
+		values = self.evaluate(x)
+		self.stats.update(self.volume * values)
+		return x, values
+
+	@property
+	def value(self):
+		return self.stats.mean
+
+	@property
+	def error(self):
+		return self.stats.error
+
+# antithetic variates: pairs of points u and 1 - u, and the pair's average as one observation
+class Antithetic(PlainMC):
+	min_batch = 2
+
+	def update(self, n):
+		pairs = max(n // 2, 1)
+		u = self.rng.uniform(pairs*self.d).reshape(pairs, self.d)
+		x = self.scale(np.concatenate([u, 1 - u]))
+		values = self.evaluate(x)
+		self.stats.update(self.volume * 0.5*(values[:pairs] + values[pairs:]))
+		return x, values
+
+# stratified sampling: every batch puts k points uniformly into each of the m^d equal cells of the box
+# the batch's estimate is volume times the average of the cell means, with variance volume^2 sum(s_c^2/k) / cells^2 from
+# the sample variances s_c^2 inside the cells; the batches are combined weighted by their number of points
+class Stratified(PlainMC):
+	# @params:
+	#   per_cell: points per cell (at least 2); the cells per dimension follow from the batch size
+	def __init__(self, f, low, high, rng, per_cell=POINTS_PER_CELL):
+		super().__init__(f, low, high, rng)
+		if per_cell < 2:
+			raise ValueError("stratified sampling needs at least 2 points per cell")
+		self.per_cell = per_cell
+		self.min_batch = per_cell # one cell
+		self.weighted_sum = 0.0 # sum of n*estimate over the batches
+		self.weighted_variance = 0.0 # sum of n^2*variance over the batches
+		self.count = 0
+
+	def update(self, n):
+		# the most cells per dimension that still leave per_cell points in each cell; the rounding guards against
+		# (n/k)^(1/d) landing just below a whole number
+		m = max(int((n / self.per_cell)**(1 / self.d) + 1e-9), 1)
+		cells = m**self.d
+		k = max(n // cells, self.per_cell)
+		# the lower corner of cell c has the base-m digits of c as its coordinates
+		c = np.repeat(np.arange(cells), k)
+		corner = (c[:, None] // m**np.arange(self.d)) % m
+		u = self.rng.uniform(cells*k*self.d).reshape(cells*k, self.d)
+		u += corner
+		u /= m
+		x = self.scale(u)
+		values = self.evaluate(x)
+		in_cells = values.reshape(cells, k)
+		estimate = self.volume * float(np.mean(in_cells))
+		variance = self.volume**2 * float(np.sum(np.var(in_cells, axis=1, ddof=1))) / k / cells**2
+		self.weighted_sum += len(x) * estimate
+		self.weighted_variance += len(x)**2 * variance
+		self.count += len(x)
+		return x, values
+
+	@property
+	def value(self):
+		return self.weighted_sum / self.count if self.count else 0.0
+
+	@property
+	def error(self):
+		return math.sqrt(self.weighted_variance) / self.count if self.count else math.inf
+
+# a normal distribution as the proposal of importance sampling, independent in every dimension
+class GaussianProposal:
+	# @params:
+	#   mean, std: per dimension, or one number for all of them
+	def __init__(self, mean, std):
+		self.mean = np.asarray(mean, dtype=float)
+		self.std = np.asarray(std, dtype=float)
+		if np.any(self.std <= 0):
+			raise ValueError("the standard deviation of the proposal must be positive")
+
+	# n points, as an (n, d) array
+	def sample(self, rng, n, d):
+		x = rng.normal(n*d).reshape(n, d)
+		x *= self.std
+		x += self.mean
+		return x
+
+	# probability density at the points x
+	def pdf(self, x):
+		z = (x - self.mean) / self.std
+		d = x.shape[1]
+		return np.exp(-0.5*np.sum(z*z, axis=1)) / np.prod(self.std * np.ones(d)) / (2*math.pi)**(d/2)
+
+# importance sampling: points from the proposal density q, and one observation f(x)/q(x) per point (0 outside the box)
+class Importance(PlainMC):
+	# @params:
+	#   proposal: anything with sample(rng, n, d), giving an (n, d) array of points, and pdf(x), their density
+	def __init__(self, f, low, high, rng, proposal=None):
+		super().__init__(f, low, high, rng)
+		if proposal is None:
+			raise ValueError("importance sampling needs a proposal density")
+		self.proposal = proposal
+
+	def update(self, n):
+		x = self.proposal.sample(self.rng, n, self.d)
+		inside = np.all((x >= self.low) & (x < self.low + self.width), axis=1)
+		values = np.zeros(n)
+		values[inside] = self.evaluate(x[inside])
+		q = self.proposal.pdf(x)
+		weights = np.divide(values, q, out=np.zeros(n), where=inside)
+		self.stats.update(weights)
+		return x, values
+
+# randomized quasi-Monte Carlo: <replicates> independently scrambled low-discrepancy sequences, each giving its own
+# running estimate; their mean is the estimate, and their spread over sqrt(replicates) its standard error
+class RandomizedQMC(PlainMC):
+	# @params:
+	#   sequence: a name from physsim.rng.qmc.SEQUENCES
+	#   replicates: number of scrambled sequences, at least 2
+	def __init__(self, f, low, high, rng, sequence="sobol", replicates=REPLICATES):
+		super().__init__(f, low, high, rng)
+		from physsim.rng import qmc
+		if replicates < 2:
+			raise ValueError("randomized quasi-Monte Carlo needs at least 2 replicates for an error estimate")
+		self.sequences = [qmc.SEQUENCES[sequence](self.d, rng) for _ in range(replicates)]
+		self.min_batch = replicates # one point from every sequence
+		self.sums = np.zeros(replicates)
+		self.count = 0 # points per replicate
+
+	# n/replicates points from every sequence; batch sizes that are multiples of a power of 2 per replicate keep the
+	# Sobol points balanced
+	def update(self, n):
+		per_replicate = n // len(self.sequences)
+		points = [sequence.points(per_replicate) for sequence in self.sequences]
+		if self.count == 0 and all(np.array_equal(u, points[0]) for u in points[1:]):
+			# the scrambling drew the same numbers for every replicate (e.g. a generator that only gives zeros), so their
+			# spread would be 0 and say nothing about the error
+			raise ValueError("the scrambled sequences are all the same, the random number generator isn't random")
+		x = self.scale(np.concatenate(points))
+		values = self.evaluate(x)
+		self.sums += values.reshape(len(self.sequences), per_replicate).sum(axis=1)
+		self.count += per_replicate
+		return x, values
+
+	@property
+	def value(self):
+		return self.volume * float(np.mean(self.sums)) / self.count if self.count else 0.0
+
+	@property
+	def error(self):
+		if not self.count:
+			return math.inf
+		means = self.sums / self.count
+		return self.volume * float(np.std(means, ddof=1)) / math.sqrt(len(means))
+
+METHODS = {
+	"mc": PlainMC,
+	"antithetic": Antithetic,
+	"stratified": Stratified,
+	"importance": Importance,
+	"sobol": functools.partial(RandomizedQMC, sequence="sobol"),
+	"halton": functools.partial(RandomizedQMC, sequence="halton"),
+}
+
+# integral of f over the box low <= x < high
+# @params:
+#   f: vectorized integrand, f(x) with x an (n, d) array of points returns the n values
+#   low, high: corners of the box, sequences of d numbers
+#   tol: stop when the standard error is at most tol
+#   rel_tol: stop when the standard error is at most rel_tol*|estimate|
+#   method: how the points are drawn, a name from METHODS
+#   batch_size: points per batch; memory use is a few arrays of batch_size*d numbers
+#   max_evaluations: stop after at most this many evaluations of f even if the tolerance isn't reached (fewer if what is
+#                    left is less than the smallest batch of the method, e.g. one cell of stratified sampling)
+#   min_batches: batches before the tolerance is checked, so a few lucky points can't end the integration
+#   rng: generator of physsim.rng; by default a new one from the configured backend, seeded with <seed>
+#   keep_points: number of points (and values) to keep for a plot
+#   progress: function progress(estimate) called after every batch
+#   options: passed on to the estimator, e.g. replicates (sobol, halton), per_cell (stratified), proposal (importance)
+def integrate(f, low, high, tol=None, rel_tol=None, method="mc", batch_size=BATCH_SIZE, max_evaluations=MAX_EVALUATIONS,
+		min_batches=2, rng=None, seed=None, keep_points=0, progress=None, **options):
+	low = np.atleast_1d(np.asarray(low, dtype=float))
+	high = np.atleast_1d(np.asarray(high, dtype=float))
+	if low.shape != high.shape or np.any(high <= low):
+		raise ValueError("low and high must be corners of a box, with low < high in every dimension")
+	if method not in METHODS:
+		raise ValueError(f"unknown method {method!r}, choose from: {', '.join(sorted(METHODS))}")
+	if rng is None:
+		from physsim import rng as backends
+		rng = backends.generator(seed=seed)
+	estimator = METHODS[method](f, low, high, rng, **options)
+	if min(batch_size, max_evaluations) < estimator.min_batch:
+		raise ValueError(f"batch_size and max_evaluations must be at least {estimator.min_batch}, the smallest batch of method {method!r}")
+
+	evaluations = 0
+	batches = 0
+	converged = False
+	kept_points, kept_values = [], []
+	kept = 0
+	time_start = time.perf_counter()
+	while max_evaluations - evaluations >= estimator.min_batch:
+		x, values = estimator.update(min(batch_size, max_evaluations - evaluations))
+		evaluations += len(x)
+		batches += 1
+		if kept < keep_points:
+			kept_points.append(x[:keep_points - kept].copy())
+			kept_values.append(values[:keep_points - kept].copy())
+			kept += len(kept_points[-1])
+		if progress is not None:
+			progress(Estimate(estimator.value, estimator.error, evaluations, batches, False, time.perf_counter() - time_start, method))
+		if batches >= min_batches and (tol is not None or rel_tol is not None):
+			target = max(tol or 0.0, (rel_tol or 0.0) * abs(estimator.value))
+			if estimator.error <= target:
+				converged = True
+				break
+
+	points = np.concatenate(kept_points) if kept_points else None
+	values = np.concatenate(kept_values) if kept_values else None
+	return Estimate(estimator.value, estimator.error, evaluations, batches, converged, time.perf_counter() - time_start, method, points, values)
+
+# integrands for the command line, each as (f, low, high, exact value) for d dimensions
+
+# integration.py: pi as the area of the unit circle, from points in the square [-1, 1)^2
+def pi_integrand():
+	return (lambda x: (x[:, 0]**2 + x[:, 1]**2 < 1).astype(float)), [-1, -1], [1, 1], math.pi
+
+# volume of the unit ball in d dimensions, pi^(d/2) / Gamma(d/2 + 1)
+def ball_integrand(d=3):
+	return (lambda x: (np.sum(x*x, axis=1) < 1).astype(float)), [-1]*d, [1]*d, math.pi**(d/2) / math.gamma(d/2 + 1)
+
+# Gaussian exp(-|x|^2) over [-3, 3]^d, which is (sqrt(pi) erf(3))^d
+def gaussian_integrand(d=3):
+	return (lambda x: np.exp(-np.sum(x*x, axis=1))), [-3]*d, [3]*d, (math.sqrt(math.pi)*math.erf(3))**d
+
+INTEGRANDS = {"pi": pi_integrand, "ball": ball_integrand, "gaussian": gaussian_integrand}
+
+if __name__ == '__main__':
+	import argparse
+	parser = argparse.ArgumentParser(prog="python -m physsim.montecarlo", description="streaming Monte Carlo integration with a tolerance")
+	parser.add_argument("integrand", choices=sorted(INTEGRANDS))
+	parser.add_argument("--dims", type=int, help="number of dimensions (ball and gaussian)")
+	parser.add_argument("--method", default="mc", choices=sorted(METHODS))
+	parser.add_argument("--tol", type=float, help="absolute tolerance of the standard error")
+	parser.add_argument("--rel-tol", type=float, help="relative tolerance of the standard error")
+	parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+	parser.add_argument("--max-evaluations", type=float, default=MAX_EVALUATIONS)
+	parser.add_argument("--seed", type=int, help="random seed")
+	parser.add_argument("--replicates", type=int, default=REPLICATES, help="scrambled sequences (sobol, halton)")
+	parser.add_argument("--per-cell", type=int, default=POINTS_PER_CELL, help="points per cell (stratified)")
+	parser.add_argument("--proposal-std", type=float,
+		help="standard deviation of the Gaussian proposal around the middle of the box (importance; default: a quarter of the box)")
+	args = parser.parse_args()
+
+	if args.dims is not None and args.integrand == "pi":
+		parser.error("pi is always 2-dimensional")
+	f, low, high, exact = INTEGRANDS[args.integrand](args.dims) if args.dims else INTEGRANDS[args.integrand]()
+	options = {}
+	if args.method in ("sobol", "halton"):
+		options["replicates"] = args.replicates
+	elif args.method == "stratified":
+		options["per_cell"] = args.per_cell
+	elif args.method == "importance":
+		middle = 0.5*(np.array(low, dtype=float) + np.array(high, dtype=float))
+		std = args.proposal_std if args.proposal_std is not None else 0.25*(np.array(high, dtype=float) - np.array(low, dtype=float))
+		try:
+			options["proposal"] = GaussianProposal(middle, std)
+		except ValueError as error:
+			parser.error(str(error))
+	try:
+		estimate = integrate(f, low, high, args.tol, args.rel_tol, args.method, args.batch_size, int(args.max_evaluations),
+			seed=args.seed, **options)
+	except ValueError as error:
+		parser.error(str(error))
+	print(estimate)
+	print(f"exact {exact:.10g}, actual error {estimate.value - exact:.3g}, {estimate.elapsed:.3f} s, "
+		f"{estimate.evaluations / max(estimate.elapsed, 1e-9):.3g} evaluations/s")
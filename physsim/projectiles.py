@@ -0,0 +1,112 @@
+# batches of projectiles advanced together, for sweeps over launch angle, speed and drag
+#
+# kinematics3.py moves one Particle with attributes x, y, vx, vy through a python loop until it lands, once per launch angle
+# a ParticleBatch keeps the same attributes as numpy arrays with one entry per projectile ("struct of arrays"), so a
+# timestep of a million projectiles is a handful of array operations with the same Euler update as Particle.euler
+#
+# projectiles that reach the ground are masked out: their range, apex and flight time are recorded when they land and
+# never change afterwards, and every compact_every steps the landed ones are dropped from the arrays, so the work per
+# step shrinks with the number of projectiles still in the air
+#
+#   batch = ParticleBatch.launch(theta0=np.linspace(10, 80, 1000), v0=[[5], [10], [15]], vt=30)
+#   batch.run(g=9.8, dt=0.01)
+#   batch.results()["range"]    # array of shape (3, 1000), like "apex" and "flight_time"
+
+import numpy as np
+
+class ParticleBatch:
+	# @params:
+	#   m: mass of every projectile
+	#   x, y: position of every projectile
+	#   vx, vy: velocity of every projectile
+	#   k: linear drag coefficient of every projectile (Fd = -k*v), 0 for no drag
+	# all parameters are broadcast against each other, the batch has their common shape
+	def __init__(self, m, x, y, vx, vy, k=0.0):
+		arrays = np.broadcast_arrays(*(np.asarray(a, dtype=float) for a in (m, x, y, vx, vy, k)))
+		self.shape = arrays[0].shape
+		# the state is kept flat and contiguous; index holds the original position of every projectile still in the arrays
+		self.m, self.x, self.y, self.vx, self.vy, self.k = (np.ascontiguousarray(a).ravel() for a in arrays)
+		N = self.m.size
+		self.index = np.arange(N)
+		self.top = self.y.copy() # highest y so far of every projectile in the arrays
+		self.t = 0.0
+		self.steps = 0
+		# results of every projectile, in the original order
+		self.landed = np.zeros(N, dtype=bool)
+		self.range = self.x.copy() # x where it landed, or its current x if it hasn't landed yet
+		self.apex = self.y.copy() # highest y reached, up to landing
+		self.flight_time = np.full(N, np.nan) # time when it landed
+		self.active = np.ones(N, dtype=bool) # which entries of the state arrays are still in the air
+
+	# projectiles launched from (x0, y0) at angle theta0 (degrees) with speed v0, terminal velocity vt (None for no drag)
+	# every parameter may be an array; they are broadcast, e.g. theta0 of shape (n,) and v0 of shape (m, 1) give a grid
+	@classmethod
+	def launch(cls, theta0, v0, vt=None, mass=0.01, g=9.8, x0=0.01, y0=0.01):
+		theta = np.asarray(theta0, dtype=float)*np.pi/180
+		v0 = np.asarray(v0, dtype=float)
+		if vt is None:
+			k = 0.0
+		else:
+			k = mass*g/np.asarray(vt, dtype=float) # k*vt = m*g, as in kinematics2.py
+		return cls(mass, x0, y0, v0*np.cos(theta), v0*np.sin(theta), k)
+
+	def __len__(self):
+		return self.landed.size
+
+	# number of projectiles still in the air
+	def in_flight(self):
+		return int(np.count_nonzero(self.active))
+
+	# solve equations of motion of every projectile after a time interval dt, under gravity g and linear drag
+	# the same operations as Particle.euler with fx = -k*vx and fy = -g*m - k*vy, so the numbers are identical
+	def euler(self, g, dt):
+		fx = -self.k*self.vx
+		fy = -g*self.m - self.k*self.vy
+		self.vx = self.vx + (fx/self.m)*dt
+		self.vy = self.vy + (fy/self.m)*dt
+		self.x = self.x + self.vx*dt
+		self.y = self.y + self.vy*dt
+		self.t += dt
+		self.steps += 1
+		np.maximum(self.top, self.y, out=self.top)
+
+		# record the landing of the projectiles that reached the ground in this step
+		landing = self.active & (self.y <= 0)
+		if landing.any():
+			index = self.index[landing]
+			self.landed[index] = True
+			self.range[index] = self.x[landing]
+			self.apex[index] = self.top[landing]
+			self.flight_time[index] = self.t
+			self.active &= ~landing
+
+	# drop the landed projectiles from the state arrays
+	def compact(self):
+		keep = self.active
+		self.m, self.x, self.y, self.vx, self.vy, self.k, self.top, self.index = (
+			a[keep] for a in (self.m, self.x, self.y, self.vx, self.vy, self.k, self.top, self.index))
+		self.active = np.ones(self.index.size, dtype=bool)
+
+	# advance until every projectile has landed (y <= 0) or max_steps timesteps have passed
+	# returns the number of projectiles still in the air
+	def run(self, g=9.8, dt=0.1, max_steps=100000, compact_every=16):
+		for step in range(max_steps):
+			if not self.active.any():
+				break
+			self.euler(g, dt)
+			if (step + 1) % compact_every == 0:
+				self.compact()
+		self.compact()
+		# projectiles still in the air report where they are now
+		self.range[self.index] = self.x
+		self.apex[self.index] = self.top
+		return self.index.size
+
+	# results in the shape of the batch
+	def results(self):
+		return {
+			"range": self.range.reshape(self.shape),
+			"apex": self.apex.reshape(self.shape),
+			"flight_time": self.flight_time.reshape(self.shape),
+			"landed": self.landed.reshape(self.shape),
+		}
@@ -0,0 +1,155 @@
+# fixed-step physics with several substeps per rendered frame
+#
+# the animations of kinematics4_PBC.py, collisions1.py - collision3.py and waves1.py advance the physics by exactly one
+# timestep inside every FuncAnimation frame, so the simulation runs at the redraw rate (interval=20 ms, 50 frames per
+# second) no matter how fast the physics is, and a smaller dt also makes the animation slower
+# a FixedStepLoop runs <substeps> timesteps of fixed length dt per frame and hands the renderer a snapshot of the state
+# the number of substeps is either fixed, or tuned after every frame so the physics takes about <frame_budget> seconds
+#
+#   loop = FixedStepLoop(*simulation("collisions", seed=7), frame_budget=0.015)
+#   state = loop.frame()    # advance, then draw state
+#
+#   python -m physsim.realtime collisions --budget 0.015
+#   python -m physsim.realtime waves --substeps 10 --frames 200 --headless
+
+import time
+
+import numpy as np
+
+from physsim import sims
+from physsim.sims import parameters
+
+class FixedStepLoop:
+	# @params:
+	#   step: function that advances the simulation by one timestep dt
+	#   snapshot: function that returns the state to draw, as arrays the simulation doesn't modify afterwards
+	#   dt: timestep of step(), used for the simulated time
+	#   substeps: timesteps per frame (the starting value if frame_budget is given)
+	#   frame_budget: wall-clock seconds of physics per frame; if given, substeps is tuned to fill it
+	#   max_substeps: upper limit of the tuned substeps
+	def __init__(self, step, snapshot, dt, substeps=1, frame_budget=None, max_substeps=10**6):
+		if substeps < 1:
+			raise ValueError("substeps must be at least 1")
+		self.step = step
+		self.snapshot = snapshot
+		self.dt = dt
+		self.substeps = substeps
+		self.frame_budget = frame_budget
+		self.max_substeps = max_substeps
+		self.steps = 0 # timesteps so far
+		self.frames = 0 # frames so far
+		self.step_time = None # running average of the wall-clock time of one timestep
+		self.physics_time = 0.0 # wall-clock time spent in step()
+
+	# simulated time
+	@property
+	def t(self):
+		return self.steps*self.dt
+
+	# advance by n timesteps
+	def advance(self, n):
+		for _ in range(n):
+			self.step()
+		self.steps += n
+
+	# advance by one frame's worth of timesteps and return a snapshot of the state
+	def frame(self):
+		n = self.substeps
+		time_start = time.perf_counter()
+		self.advance(n)
+		elapsed = time.perf_counter() - time_start
+		self.physics_time += elapsed
+		self.frames += 1
+
+		if self.frame_budget is not None:
+			# exponential moving average, so one slow frame (e.g. a garbage collection) doesn't swing the substeps
+			per_step = elapsed / n
+			self.step_time = per_step if self.step_time is None else 0.8*self.step_time + 0.2*per_step
+			self.substeps = int(min(self.max_substeps, max(1, self.frame_budget / self.step_time)))
+		return self.snapshot()
+
+	# timesteps per second of wall-clock time spent in the physics
+	def throughput(self):
+		return self.steps / self.physics_time if self.physics_time > 0 else 0.0
+
+# the simulations that can be animated, each as (step, snapshot, dt, info) built from the physsim.sims modules
+# the parameters are those of the simulation's run(), as listed by python -m physsim list
+
+# kinematics4_PBC.py: particles moving in a periodic window; snapshot is an (N, 2) array of positions
+def pbc(seed=None, **params):
+	from physsim.sims import kinematics
+	params = parameters(kinematics.PBC_DEFAULTS, params)
+	L, dt = params["L"], params["dt"]
+	speeds = params["speeds"]
+	particles = [kinematics.PeriodicParticle(m=params["mass"], x=L/3, y=len(speeds) - i, v=v) for i, v in enumerate(speeds)]
+	def step():
+		for p in particles:
+			p.euler(params["F0"], dt, L)
+	snapshot = lambda: np.array([[p.x, p.y] for p in particles])
+	return step, snapshot, dt, {"L": L, "rows": len(speeds)}
+
+# collisions1.py, collision2.py, collision3.py: hard sphere gas; snapshot is an (N, 2) array of positions
+def collisions(seed=None, **params):
+	from physsim.sims import collisions
+	params = parameters(collisions.DEFAULTS, params)
+	L, dt = params["L"], params["dt"]
+	# the same two streams as collisions.run()
+	placement, walls = sims.rng(seed).split(2)
+	particles = collisions.place_particles(placement, params["N_particles"], L, params["mass"], params["radius"], params["vmax"],
+		params["reject_overlaps"])
+	gauss = walls.gauss
+	step = lambda: collisions.step(particles, params["fx"], params["fy"], dt, L, params["boundary"], params["T_wall"], gauss)
+	snapshot = lambda: np.array([[p.x, p.y] for p in particles])
+	return step, snapshot, dt, {"L": L, "radius": params["radius"]}
+
+# waves1.py, waves2.py: string displacement; snapshot is the displacement array
+def waves(seed=None, **params):
+	from physsim.sims import waves
+	params = parameters(waves.DEFAULTS, params)
+	N, L, c, dt = params["N"], params["L"], params["c"], params["dt"]
+	dx = L / (N - 1)
+	if c * dt / dx > 1:
+		raise ValueError(f"unstable: c*dt/dx = {c*dt/dx:.3f} > 1")
+	x, u_curr, u_prev = waves.initial_state(N, L, params["harmonic_modes"])
+	state = [u_curr, u_prev]
+	def step():
+		state[0], state[1] = waves.update(state[0], state[1], c, dt, dx)
+	# update() returns a new array every timestep and never writes into an old one, so the current array is a snapshot
+	snapshot = lambda: state[0]
+	return step, snapshot, dt, {"x": x, "amplitude": float(np.max(np.abs(u_curr)))}
+
+SIMULATIONS = {"pbc": pbc, "collisions": collisions, "waves": waves}
+
+# (step, snapshot, dt, info) of simulation <name>
+def simulation(name, seed=None, **params):
+	if name not in SIMULATIONS:
+		raise KeyError(f"unknown simulation {name!r}, choose from: {', '.join(sorted(SIMULATIONS))}")
+	return SIMULATIONS[name](seed, **params)
+
+if __name__ == '__main__':
+	import argparse
+	from physsim.__main__ import parse_param
+	parser = argparse.ArgumentParser(prog="python -m physsim.realtime", description="animate a simulation with several physics substeps per frame")
+	parser.add_argument("name", choices=sorted(SIMULATIONS))
+	parser.add_argument("--substeps", type=int, default=1, help="timesteps per frame")
+	parser.add_argument("--budget", type=float, help="seconds of physics per frame; tunes the substeps to fill it")
+	parser.add_argument("--frames", type=int, default=100, help="number of frames")
+	parser.add_argument("--interval", type=int, default=20, help="milliseconds between frames")
+	parser.add_argument("--seed", type=int, help="random seed")
+	parser.add_argument("-p", "--param", type=parse_param, action="append", default=[], metavar="KEY=VALUE", help="simulation parameter (repeatable)")
+	parser.add_argument("--headless", action="store_true", help="don't draw, only run the frames and report the throughput")
+	args = parser.parse_args()
+
+	try:
+		step, snapshot, dt, info = simulation(args.name, args.seed, **dict(args.param))
+	except ValueError as error:
+		parser.error(f"{args.name}: {error}")
+	loop = FixedStepLoop(step, snapshot, dt, args.substeps, args.budget)
+	if args.headless:
+		for _ in range(args.frames):
+			loop.frame()
+	else:
+		from physsim import render
+		render.animate(args.name, loop, info, frames=args.frames, interval=args.interval)
+	print(f"{args.name}: {loop.steps} timesteps in {loop.frames} frames (t = {loop.t:.4g}), "
+		f"{loop.throughput():.0f} timesteps/s, {loop.substeps} substeps per frame")
@@ -0,0 +1,226 @@
+# optional plots of the results of physsim.sims, drawn the way the lecture scripts draw them
+#
+# matplotlib is only imported when a plot is actually requested, so simulations run headless never pay for it
+# animations are replaced by a plot of the final state (or of every recorded frame, where that fits on one figure)
+# live animations with several physics substeps per frame are drawn by animate(), see physsim.realtime
+
+def plot_fd(plt, result):
+	plt.plot(result["x"], result["y"], label="f(x)")
+	for dx, dydx in zip(result["dx"], result["dydx"]):
+		plt.plot(result["x"], dydx, label=f"dx = {dx}")
+	plt.title("Convergence of Finite Difference Algorithm")
+	plt.xlabel("X")
+	plt.ylabel("Y")
+	plt.legend()
+
+def plot_decay(plt, result):
+	plt.plot(result["t"], result["N"], label="Euler")
+	plt.plot(result["t"], result["N_exact"], ls="--", label="Exact")
+	plt.title("Euler's Method Approximation of Radioactive Decay")
+	plt.xlabel("Time (hr)")
+	plt.ylabel("Number of Atoms")
+	plt.legend()
+
+def plot_decay_chain(plt, result):
+	N = result["N"]
+	if N.ndim == 3:
+		# tau-leaping: plot the mean over the runs
+		N = N.mean(axis=1)
+	for i in range(N.shape[-1]):
+		plt.plot(result["t"], N[:, i], label=f"member {i}")
+		plt.plot(result["t"], result["N_exact"][:, i], color="black", ls="--", lw=0.5)
+	plt.title("Radioactive Decay Chain")
+	plt.xlabel("Time (hr)")
+	plt.ylabel("Number of Atoms")
+	plt.legend()
+
+def plot_freefall(plt, result):
+	plt.plot(result["t"], result["y"])
+	plt.title("Free Fall due to Gravity")
+	plt.xlabel("Time (s)")
+	plt.ylabel("Height (m)")
+
+def plot_projectile(plt, result):
+	start = result["start"]
+	for i, theta0 in enumerate(result["theta0"]):
+		plt.plot(result["x"][start[i]:start[i+1]], result["y"][start[i]:start[i+1]], label=f"{theta0} degrees")
+	plt.ylim(bottom=0)
+	plt.title("Parabolic Motion of a Projectile")
+	plt.xlabel("X (m)")
+	plt.ylabel("Y (m)")
+	plt.grid()
+	plt.legend()
+
+def plot_projectile_sweep(plt, result):
+	for v0, ranges in zip(result["v0"], result["range"]):
+		plt.plot(result["theta0"], ranges, label=f"{v0:g} m/s")
+	plt.title("Range of a Projectile with Drag")
+	plt.xlabel("Launch Angle (degrees)")
+	plt.ylabel("Range (m)")
+	plt.grid()
+	plt.legend()
+
+def plot_pbc(plt, result):
+	plt.scatter(result["x"][-1], result["y"], s=500)
+	plt.xlim(0, result["L"])
+	plt.ylim(0, len(result["y"]) + 1)
+	plt.title("1D Motion with Periodic Boundary Conditions")
+	plt.xlabel("X (m)")
+
+def plot_mcg(plt, result):
+	N = len(result["samples"])
+	bins = len(result["counts"])
+	plt.hist(result["samples"], bins=bins)
+	plt.hlines(N/bins, 0, 1, ls="--", color="black", zorder=10)
+	plt.title("Uniformity of Multiplicative Congruential Generator")
+	plt.xlabel("Random Number")
+	plt.ylabel("Frequency")
+
+def plot_exponential(plt, result):
+	plt.hist(result["samples"], bins=20)
+	plt.axvline(result["mean"], color="black", ls="--", label=f"Mean: {result['mean']}")
+	plt.title("Random Sampling of Exponential Probability Distribution")
+	plt.xlabel("Random Number")
+	plt.ylabel("Frequency")
+	plt.legend()
+
+def plot_normal(plt, result):
+	plt.hist(result["samples"], bins=30)
+	plt.title("Box-Muller Gaussian Random Numbers")
+	plt.xlabel("Random Number")
+	plt.ylabel("Frequency")
+
+def plot_mcpi(plt, result):
+	inside = result["inside"]
+	x_in = [x for x, hit in zip(result["x"], inside) if hit]
+	y_in = [y for y, hit in zip(result["y"], inside) if hit]
+	x_out = [x for x, hit in zip(result["x"], inside) if not hit]
+	y_out = [y for y, hit in zip(result["y"], inside) if not hit]
+	plt.scatter(x_in, y_in, color="blue", s=0.5, label=f"Pi ~ {result['pi']}")
+	plt.scatter(x_out, y_out, color="red", s=0.5)
+	plt.title("Estimation of Pi by Monte Carlo Integration")
+	plt.xlabel("X")
+	plt.ylabel("Y")
+	plt.legend()
+
+def plot_brownian(plt, result):
+	plt.plot(result["t"], result["msd"], label="Simulation")
+	plt.plot(result["t"], [2*result["dims"]*result["D"]*t for t in result["t"]], "k--", label="2dDt")
+	plt.title("Mean Squared Displacement of Brownian Walkers")
+	plt.xlabel("Time Step")
+	plt.ylabel("Mean Squared Displacement")
+	plt.legend()
+
+def plot_collisions(plt, result):
+	plt.scatter(result["x"][-1], result["y"][-1], s=result["radius"]*1000)
+	plt.xlim(0, result["L"])
+	plt.ylim(0, result["L"])
+	plt.title("Hard Sphere Gas")
+
+def plot_waves(plt, result):
+	for u in result["u"]:
+		plt.plot(result["x"], u, color="black", alpha=0.1)
+	plt.title("Waves on a String")
+	plt.xlabel("X (cm)")
+	plt.ylabel("Displacement")
+
+def plot_compton(plt, result):
+	labels = ["ABS", "BACK", "TRANS"]
+	plt.bar(labels, [result[label] / result["N_photons"] for label in labels])
+	plt.title("Fate of Photons in a Slab")
+	plt.ylabel("Fraction of Photons")
+
+def plot_bremsstrahlung(plt, result):
+	plt.semilogy(result["bin_centers"], result["spectrum"], drawstyle="steps-mid")
+	plt.xlabel("Photon Energy (keV)")
+	plt.ylabel("Intensity (Dimensionless)")
+	plt.title("Bremsstrahlung X-ray Spectrum")
+	plt.grid()
+
+RENDERERS = {
+	"fd": plot_fd,
+	"decay": plot_decay,
+	"decay_chain": plot_decay_chain,
+	"freefall": plot_freefall,
+	"projectile": plot_projectile,
+	"projectile_sweep": plot_projectile_sweep,
+	"pbc": plot_pbc,
+	"mcg": plot_mcg,
+	"exponential": plot_exponential,
+	"normal": plot_normal,
+	"mcpi": plot_mcpi,
+	"brownian": plot_brownian,
+	"collisions": plot_collisions,
+	"waves": plot_waves,
+	"compton": plot_compton,
+	"bremsstrahlung": plot_bremsstrahlung,
+}
+
+# plot the result of simulation <name>, save it to <savefig> if given, and show it if <show> is True
+def render(name, result, savefig=None, show=True):
+	if not show:
+		# a non-interactive backend doesn't need a display, so figures can be saved on batch nodes
+		import matplotlib
+		matplotlib.use("Agg")
+	import matplotlib.pyplot as plt
+
+	plt.figure()
+	RENDERERS[name](plt, result)
+	if savefig:
+		plt.savefig(savefig, dpi=100)
+	if show:
+		plt.show()
+	plt.close()
+
+# animations of a physsim.realtime.FixedStepLoop: every frame advances the loop and draws the snapshot it returns
+# each setup function draws the first snapshot and returns the function that updates the artists for a new one
+
+def animate_pbc(plt, ax, state, info):
+	ax.set_xlim(0, info["L"])
+	ax.set_ylim(0, info["rows"] + 1)
+	posns = ax.scatter(state[:, 0], state[:, 1], s=500)
+	plt.title("1D Motion with Periodic Boundary Conditions")
+	plt.xlabel("X (m)")
+	def update(state):
+		posns.set_offsets(state)
+		return [posns]
+	return update
+
+def animate_collisions(plt, ax, state, info):
+	ax.set_xlim(0, info["L"])
+	ax.set_ylim(0, info["L"])
+	posns = ax.scatter(state[:, 0], state[:, 1], s=info["radius"]*1000)
+	plt.title("Hard Sphere Gas")
+	def update(state):
+		posns.set_offsets(state)
+		return [posns]
+	return update
+
+def animate_waves(plt, ax, state, info):
+	ax.set_ylim(-1.1*info["amplitude"], 1.1*info["amplitude"])
+	line, = ax.plot(info["x"], state, color="black")
+	plt.title("Waves on a String")
+	plt.xlabel("X (cm)")
+	plt.ylabel("Displacement")
+	def update(state):
+		line.set_ydata(state)
+		return [line]
+	return update
+
+ANIMATORS = {
+	"pbc": animate_pbc,
+	"collisions": animate_collisions,
+	"waves": animate_waves,
+}
+
+# animate simulation <name>, advancing <loop> by one frame's worth of substeps before every redraw
+def animate(name, loop, info, frames=100, interval=20, show=True):
+	import matplotlib.pyplot as plt
+	import matplotlib.animation as animation
+
+	fig, ax = plt.subplots()
+	update = ANIMATORS[name](plt, ax, loop.snapshot(), info)
+	ani = animation.FuncAnimation(fig, lambda i: update(loop.frame()), frames=frames, interval=interval, blit=True, repeat=False)
+	if show:
+		plt.show()
+	return ani
@@ -0,0 +1,65 @@
+# random number generators with one batched interface and switchable backends
+#
+# every generator has
+#   fill(out)                         fill a float array with uniform numbers 0 <= R < 1, in place
+#   uniform(n, low, high)             n uniform numbers low <= R < high
+#   normal(n, mean, std)              n normally distributed numbers
+#   exponential(n, mu)                n exponentially distributed numbers with mean mu
+#   binomial(n, p)                    binomially distributed numbers, n trials of probability p (arrays or numbers)
+#   multinomial(n, probabilities)     counts of n trials spread over outcomes with the given probabilities
+#   sample(low, high), sampleN(N, low, high), modulus    the interface of the MCG in rng.py
+#   gauss(mu, sigma)                  one normally distributed number, in place of random.gauss()
+#   state(), restore(state), jump(n), split(K)           reproducible runs and parallel streams
+#   normal_method                     "polar" (Box-Muller) or "ziggurat", how normal() and gauss() sample (physsim.rng.normal)
+#
+# backends:
+#   "mcg"       the multiplicative congruential generator of the lectures (physsim.rng.mcg), the default
+#   "philox"    the counter-based Philox4x32-10 (physsim.rng.philox)
+#   "pcg64"     numpy's PCG64, all in compiled code (physsim.rng.pcg64)
+#   "xorshift"  xorshift128+ in many lanes at once (physsim.rng.xorshift)
+# generator() picks the backend from its argument, or else from the environment variable PHYSSIM_RNG, so every
+# simulation that gets its numbers from generator() (via physsim.sims.rng()) can be switched without editing it:
+#
+#   rng = generator(seed=12345)             # "mcg", unless PHYSSIM_RNG says otherwise
+#   rng = generator("pcg64", seed=12345)
+#   PHYSSIM_RNG=pcg64 python -m physsim run compton
+#
+# physsim.rng.normal holds the batched normal samplers, physsim.rng.binomial the binomial ones, and physsim.rng.sampling samples any other distribution from
+# tabulated inverse CDFs and alias tables
+#
+# python -m physsim.bench run --kernel rng. compares the throughput of the backends
+
+import importlib
+import os
+
+from physsim.rng.base import Generator
+
+# name -> (module, class)
+BACKENDS = {
+	"mcg": ("physsim.rng.mcg", "MCG"),
+	"philox": ("physsim.rng.philox", "Philox"),
+	"pcg64": ("physsim.rng.pcg64", "PCG64"),
+	"xorshift": ("physsim.rng.xorshift", "Xorshift"),
+}
+DEFAULT_BACKEND = "mcg"
+ENVIRONMENT_VARIABLE = "PHYSSIM_RNG"
+
+# name of the configured backend: <name> if given, else $PHYSSIM_RNG, else DEFAULT_BACKEND
+def backend_name(name=None):
+	name = name or os.environ.get(ENVIRONMENT_VARIABLE) or DEFAULT_BACKEND
+	if name not in BACKENDS:
+		raise KeyError(f"unknown random number generator {name!r}, choose from: {', '.join(sorted(BACKENDS))}")
+	return name
+
+# the generator class of a backend
+def backend(name=None):
+	module, cls = BACKENDS[backend_name(name)]
+	return getattr(importlib.import_module(module), cls)
+
+# a new generator of backend <name> (see backend_name()), seeded with <seed> or with the backend's default seed
+# options are passed on to the backend's class, e.g. generator("xorshift", lanes=1024)
+def generator(name=None, seed=None, **options):
+	cls = backend(name)
+	if seed is None:
+		return cls(**options)
+	return cls(seed=seed, **options)
@@ -0,0 +1,96 @@
+# the batched interface shared by every generator of physsim.rng
+#
+# a backend only has to fill a float array with uniform numbers in [0, 1) (fill()); uniform(), normal(), exponential(),
+# binomial() and multinomial() are built on top of that here (normal() with physsim.rng.normal, binomial() with
+# physsim.rng.binomial), and a backend overrides them where it has something faster (numpy's own samplers)
+# sample(), sampleN() and gauss() draw single numbers the way the lecture scripts do (rng.sample()/rng.modulus and
+# random.gauss()), so a generator from any backend can be passed to the ports in physsim.sims unchanged
+
+import numpy as np
+
+class Generator:
+	modulus = 2**53 # sample() returns numbers in [low, high) with high = modulus by default, like the MCG of rng.py
+	buffer_size = 4096 # numbers drawn at a time by sample() and gauss()
+	normal_method = "polar" # how normal() samples: "polar" (Box-Muller) or "ziggurat"
+	limit = None # position at which this generator's numbers run out (see split() of the MCG and Philox), None for never
+
+	# refuse to draw n more numbers if they would run past the limit, where the numbers of the next stream of a split()
+	# begin (or the sequence starts repeating itself); backends with a limit keep their position in self.count
+	def check_limit(self, n):
+		if self.limit is not None and self.count + n > self.limit:
+			raise ValueError(f"drawing {n} numbers at position {self.count} would run past the end of this stream at position {self.limit}")
+
+	# fill the float array <out> with uniformly distributed numbers 0 <= R < 1, in place
+	def fill(self, out):
+		raise NotImplementedError
+
+	# n uniformly distributed numbers low <= R < high
+	def uniform(self, n, low=0.0, high=1.0):
+		numbers = np.empty(n)
+		self.fill(numbers)
+		if low != 0 or high != 1:
+			numbers *= (high - low)
+			numbers += low
+		return numbers
+
+	# n normally distributed numbers, by the method in normal_method (see physsim.rng.normal); the numbers left over from
+	# the last batch are handed out first, so consecutive calls continue one sequence
+	def normal(self, n, mean=0.0, std=1.0):
+		from physsim.rng.normal import NormalSampler
+		sampler = getattr(self, "_normal_sampler", None)
+		if sampler is None or sampler.method != self.normal_method:
+			sampler = self._normal_sampler = NormalSampler(self.uniform, self.normal_method)
+		numbers = sampler.sample(n)
+		if mean != 0 or std != 1:
+			numbers *= std
+			numbers += mean
+		return numbers
+
+	# n exponentially distributed numbers with mean mu, by the inverse CDF of sampling.py: -mu*log(1 - R)
+	def exponential(self, n, mu=1.0):
+		numbers = self.uniform(n)
+		np.negative(numbers, out=numbers)
+		np.log1p(numbers, out=numbers)
+		numbers *= -mu
+		return numbers
+
+	# binomially distributed numbers with n trials of probability p (numbers or arrays, broadcast together), from
+	# uniform() numbers (see physsim.rng.binomial)
+	def binomial(self, n, p):
+		from physsim.rng.binomial import binomial
+		return binomial(self.uniform, n, p)
+
+	# multinomially distributed counts of n trials (a number or an array) over outcomes with the given probabilities, as
+	# an array of shape n.shape + (outcomes,), like numpy's multinomial()
+	def multinomial(self, n, probabilities):
+		from physsim.rng.binomial import multinomial
+		return multinomial(self.binomial, n, probabilities)
+
+	# forget the numbers buffered by sample() and gauss(), e.g. after the generator was moved with restore() or jump()
+	def clear_buffers(self):
+		self._uniforms = None
+		self._normals = None
+		self._normal_sampler = None
+
+	# one uniformly distributed number low <= R < high, taken from a buffer of uniform() numbers
+	def sample(self, low=0, high=None):
+		high = self.modulus if high is None else high
+		if getattr(self, "_uniforms", None) is None or self._uniforms_used == len(self._uniforms):
+			self._uniforms = self.uniform(self.buffer_size)
+			self._uniforms_used = 0
+		R = self._uniforms[self._uniforms_used]
+		self._uniforms_used += 1
+		return low + (high - low)*float(R)
+
+	# N uniformly distributed numbers low <= R < high, as an array
+	def sampleN(self, N, low=0, high=None):
+		return self.uniform(N, low, self.modulus if high is None else high)
+
+	# one normally distributed number, a drop-in for random.gauss(mu, sigma)
+	def gauss(self, mu=0.0, sigma=1.0):
+		if getattr(self, "_normals", None) is None or self._normals_used == len(self._normals):
+			self._normals = self.normal(self.buffer_size)
+			self._normals_used = 0
+		z = self._normals[self._normals_used]
+		self._normals_used += 1
+		return mu + sigma*float(z)
@@ -0,0 +1,141 @@
+# binomially and multinomially distributed numbers from the uniform numbers of any generator
+#
+# a binomial number is the number of successes in n trials with probability p each; counting n uniform numbers below p
+# would cost n, so two methods whose cost doesn't grow with n are used instead, each on the elements it suits:
+#   inversion: for a mean n*p below INVERSION_MEAN, walk up the CDF from k = 0 until it passes a uniform number R; the
+#              probability of k+1 follows from that of k with one multiplication, and the walk takes about mean + 1 steps
+#   BTRD:      otherwise, Hormann's transformed rejection with decomposition ("The generation of binomial random
+#              variates", 1993): a hat function around the mode turns one uniform number into a candidate k that is
+#              accepted right away 86% of the time; the others take a second uniform number and are accepted by comparing
+#              with the log of the binomial probabilities
+# (both for p <= 1/2; for p > 1/2 the number of failures is drawn instead)
+# like the Ziggurat of physsim.rng.normal, both work on whole arrays, and the elements still without a number are drawn
+# again together
+# a multinomial draw (n trials spread over several outcomes) is a binomial draw for every outcome but the last, each
+# from the trials the outcomes before it didn't take
+
+import math
+
+import numpy as np
+
+INVERSION_MEAN = 10.0
+
+# log(k!) - [(k + 1/2) log(k + 1) - (k + 1) + log(2 pi)/2], the error of Stirling's formula for log(k!): exact below 10,
+# and from its asymptotic series above
+STIRLING_TABLE = np.array([math.lgamma(k + 1) - ((k + 0.5)*math.log(k + 1) - (k + 1) + 0.5*math.log(2*math.pi)) for k in range(10)])
+
+def stirling_correction(k):
+	k1 = k + 1.0
+	correction = (1/12 - (1/360 - 1/1260/(k1*k1))/(k1*k1))/k1
+	small = k < 10
+	correction[small] = STIRLING_TABLE[k[small].astype(np.intp)]
+	return correction
+
+# inversion for arrays of n (integers) and p <= 1/2
+def inversion(uniform, n, p):
+	ratio = p / (1 - p)
+	f = np.exp(n*np.log1p(-p)) # probability of k = 0, (1 - p)^n
+	R = uniform(len(n))
+	k = np.zeros(len(n), dtype=np.int64)
+	todo = np.flatnonzero(R > f)
+	while len(todo):
+		R[todo] -= f[todo]
+		f[todo] *= ratio[todo] * (n[todo] - k[todo]) / (k[todo] + 1)
+		k[todo] += 1
+		# the rounding of the CDF can leave R just above 1, so the walk also stops at n
+		todo = todo[(R[todo] > f[todo]) & (k[todo] < n[todo])]
+	return k
+
+# BTRD for arrays of n (integers) and p <= 1/2 with n*p >= INVERSION_MEAN
+def btrd(uniform, n, p):
+	n = n.astype(float)
+	q = 1 - p
+	mode = np.floor((n + 1)*p)
+	r = p / q
+	npq = n*p*q
+	spq = np.sqrt(npq)
+	# the hat function
+	b = 1.15 + 2.53*spq
+	a = -0.0873 + 0.0248*b + 0.01*p
+	c = n*p + 0.5
+	alpha = (2.83 + 5.1/b)*spq
+	v_r = 0.92 - 4.2/b
+	# log of the probability of the mode, without the terms it shares with the probability of k
+	n_mode = n - mode + 1
+	h = (mode + 0.5)*np.log((mode + 1) / (r*n_mode)) + stirling_correction(mode) + stirling_correction(n - mode)
+
+	k = np.empty(len(n))
+	todo = np.arange(len(n))
+	while len(todo):
+		A, B, C, V_r = a[todo], b[todo], c[todo], v_r[todo]
+		v = uniform(len(todo))
+		# the center of the hat lies completely under the distribution: accepted without a test
+		fast = v <= 0.86*V_r
+		u = v/V_r - 0.43
+		candidate = np.floor((2*A/(0.5 - np.abs(u)) + B)*u + C)
+		# elsewhere a second uniform number W gives the point: u from W in the wide part of the hat, v from W in the
+		# narrow parts next to the center
+		W = uniform(len(todo))
+		wide = v >= V_r
+		u = np.where(wide, W - 0.5, np.sign(v/V_r - 0.93)*0.5 - (v/V_r - 0.93))
+		v = np.where(wide, v, W*V_r)
+		us = 0.5 - np.abs(u)
+		slow_candidate = np.floor((2*A/us + B)*u + C)
+		candidate = np.where(fast, candidate, slow_candidate)
+		N = n[todo]
+		accept = fast & (candidate >= 0) & (candidate <= N)
+		test = np.flatnonzero(~fast & (candidate >= 0) & (candidate <= N))
+		if len(test):
+			i = todo[test]
+			kt = candidate[test]
+			log_v = np.log(v[test]*alpha[i] / (A[test]/(us[test]*us[test]) + B[test]))
+			nk = N[test] - kt + 1
+			# log of the probability of k over that of the mode, from Stirling's formula with its corrections
+			log_ratio = (h[i] + (N[test] + 1)*np.log(n_mode[i] / nk) + (kt + 0.5)*np.log(nk*r[i] / (kt + 1))
+				- stirling_correction(kt) - stirling_correction(N[test] - kt))
+			accept[test] = log_v <= log_ratio
+		k[todo[accept]] = candidate[accept]
+		todo = todo[~accept]
+	return k.astype(np.int64)
+
+# binomially distributed numbers with n trials of probability p (numbers or arrays, broadcast together), from the
+# function uniform(n) giving n uniform numbers 0 <= R < 1
+def binomial(uniform, n, p):
+	n, p = np.broadcast_arrays(np.asarray(n), np.asarray(p, dtype=float))
+	shape = n.shape
+	if np.any(n < 0) or np.any(n != np.floor(n)):
+		raise ValueError("the number of trials n must be a non-negative integer")
+	if not np.all((p >= 0) & (p <= 1)):
+		raise ValueError("the probability p must be between 0 and 1")
+	n = n.astype(np.int64).ravel()
+	p = p.ravel()
+	flip = p > 0.5
+	p = np.where(flip, 1 - p, p)
+	k = np.zeros(len(n), dtype=np.int64)
+	mean = n*p
+	small = np.flatnonzero((mean > 0) & (mean < INVERSION_MEAN))
+	large = np.flatnonzero(mean >= INVERSION_MEAN)
+	if len(small):
+		k[small] = inversion(uniform, n[small], p[small])
+	if len(large):
+		k[large] = btrd(uniform, n[large], p[large])
+	k[flip] = n[flip] - k[flip]
+	return k.reshape(shape)
+
+# multinomially distributed counts: n trials (a number or an array) spread over outcomes with the given probabilities;
+# returns an array of shape n.shape + (outcomes,), the last outcome taking whatever trials are left, like numpy's
+# multinomial(); binomial(n, p) is a binomial sampler such as a generator's binomial()
+def multinomial(binomial, n, probabilities):
+	n = np.asarray(n, dtype=np.int64)
+	probabilities = np.asarray(probabilities, dtype=float)
+	counts = np.zeros(n.shape + (len(probabilities),), dtype=np.int64)
+	remaining = n.copy()
+	rest = 1.0 # probability of the outcomes not drawn yet
+	for j, probability in enumerate(probabilities[:-1]):
+		if rest <= 0:
+			break
+		counts[..., j] = binomial(remaining, min(max(probability / rest, 0.0), 1.0))
+		remaining -= counts[..., j]
+		rest -= probability
+	counts[..., -1] += remaining
+	return counts
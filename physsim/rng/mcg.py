@@ -0,0 +1,205 @@
+# the multiplicative congruential generator (MCG) of the lectures, the "mcg" backend of physsim.rng
+#
+# X_k+1 = (a * X_k) % m,  X_0 = seed,  with the parameters of Park and Miller
+# this is the code that used to be copied into rng.py of Part 4, Part 5 and Part 8; those files now import it from here,
+# so the lectures and physsim draw exactly the same numbers from the same seed
+# on top of sample() and sampleN() of the lectures it has the batched interface of physsim.rng (uniform(), normal(),
+# exponential(), fill(), gauss())
+
+# numpy is used by sampleN() to generate whole blocks of numbers at once
+import numpy as np
+
+from physsim.rng.base import Generator
+
+# default parameters recommended by Stephen K. Park and Keith W. Miller
+modulus = 2**31 - 1
+initial_seed = int(modulus / 2)
+multiplier = 7**5
+
+# sampleN() generates numbers in blocks of this many at a time
+block_size = 2**16
+
+# jump ahead: k steps of the generator are one step with multiplier a^k, because
+# X_j+k = (a^k * X_j) % m  and  a^k % m  can be computed once in advance
+# so a block of numbers X_j+1 ... X_j+k is (powers * X_j) % m with powers = [a^1, a^2, ..., a^k] % m, all in one go
+# the powers are kept as 64-bit unsigned integers: a product of two numbers below m is below m**2 < 2**64 when m < 2**32,
+# so nothing overflows and every number is exactly the one sample() would give
+_powers = {}
+def powers(multiplier, k):
+	key = (multiplier, k)
+	if key not in _powers:
+		A = np.array([multiplier % modulus], dtype=np.uint64)
+		while len(A) < k:
+			# a^(n+1) ... a^(2n) are a^1 ... a^n multiplied by a^n
+			A = np.concatenate([A, (A * A[-1]) % np.uint64(modulus)])
+		_powers[key] = A[:k]
+	return _powers[key]
+
+# what an MCG keeps of the numbers it generates (the record argument)
+#   None          nothing; the generator can still be put back to any position with state() and restore()
+#   "all"         every number in self.sequence, which grows without limit (10**9 numbers take tens of GB)
+#   "ring"        the last record_size numbers, in a fixed-size array that is overwritten in a circle
+#   "checkpoint"  (count, number) for every checkpoint_every-th number in self.checkpoints, to check a rerun against
+record_modes = (None, "all", "ring", "checkpoint")
+
+# a multiplicative generator started at 0 stays at 0 forever, so a seed that is a multiple of the modulus is refused
+def check_seed(seed, modulus=modulus):
+	if seed % modulus == 0:
+		raise ValueError(f"MCG seed must not be a multiple of the modulus {modulus}")
+
+class MCG(Generator):
+	def __init__(self, seed=initial_seed, modulus=modulus, multiplier=multiplier, record=None, record_size=1024, checkpoint_every=10**6):
+		if record not in record_modes:
+			raise ValueError(f"unknown record mode {record!r}, choose from: {', '.join(map(repr, record_modes))}")
+		check_seed(seed, modulus)
+		self.seed = seed
+		self.modulus = modulus
+		self.multiplier = multiplier
+		self.last_number = (multiplier * seed) % modulus
+		self.count = 0 # how many numbers have been generated: the position in the sequence
+		self.limit = modulus - 1 # position where the sequence starts repeating itself (or where this stream ends, see split())
+		self.record = record
+		self.record_size = record_size
+		self.checkpoint_every = checkpoint_every
+		self.clear_record()
+
+	# forget the recorded numbers
+	def clear_record(self):
+		if self.record == "ring":
+			self.sequence = np.zeros(self.record_size, dtype=np.uint64)
+		else:
+			self.sequence = [] # collect the random numbers for repeatability (record="all")
+		self.checkpoints = []
+
+	# record one number that was just generated, the one at position self.count
+	def remember(self, R):
+		if self.record == "all":
+			self.sequence.append(R)
+		elif self.record == "ring":
+			self.sequence[self.count % self.record_size] = R
+		elif self.record == "checkpoint" and self.count % self.checkpoint_every == 0:
+			self.checkpoints.append((self.count, R))
+
+	# record a block of numbers that were just generated, the last one at position self.count
+	def remember_block(self, R):
+		if self.record == "all":
+			self.sequence.append(R.copy()) # a whole block of numbers is recorded as one array
+		elif self.record == "ring":
+			R = R[-self.record_size:]
+			self.sequence[np.arange(self.count - len(R) + 1, self.count + 1) % self.record_size] = R
+		elif self.record == "checkpoint":
+			first = self.count - len(R) + 1 # position of R[0]
+			for i in range(-first % self.checkpoint_every, len(R), self.checkpoint_every):
+				self.checkpoints.append((first + i, int(R[i])))
+
+	# the recorded numbers, oldest first (record="all" or "ring")
+	def history(self):
+		if self.record == "ring":
+			n = min(self.count, self.record_size)
+			return self.sequence[np.arange(self.count - n + 1, self.count + 1) % self.record_size]
+		return np.concatenate([np.asarray(R, dtype=np.uint64).reshape(-1) for R in self.sequence]) if self.sequence else np.empty(0, dtype=np.uint64)
+
+	# compact state of the generator: the seed and the number of numbers generated since then
+	# every later number follows from these two, so a run can be reproduced from any point without keeping a history
+	def state(self):
+		return (self.seed, self.count)
+
+	# put the generator at position <count> of the sequence that starts from <seed>, as if count numbers had been drawn
+	# X_count = a^count * X_0 % m is computed with pow(), which takes only about log2(count) multiplications
+	def restore(self, state):
+		seed, count = state
+		check_seed(seed, self.modulus)
+		self.seed = seed
+		self.count = count
+		self.last_number = (pow(self.multiplier, count + 1, modulus) * seed) % modulus
+		self.clear_record()
+		self.clear_buffers()
+
+	# skip the next n numbers without generating them (a ValueError if that passes the limit, like drawing them would)
+	def jump(self, n):
+		self.check_limit(n)
+		self.restore((self.seed, self.count + n))
+
+	# split the rest of the sequence into K streams for K parallel workers, which never draw the same number
+	#   "block": stream i is the i-th of K consecutive blocks of (limit - count)//K numbers; it is an ordinary MCG that was
+	#            moved to the start of its block with jump(), and its limit is the end of its block
+	#   "leapfrog": stream i draws every K-th number, starting with the i-th; since K steps are one step with multiplier
+	#            a^K % m, it is an MCG with that multiplier
+	# either way the K streams together are exactly the numbers this generator would have drawn, so a run stays reproducible,
+	# and sample() and sampleN() raise a ValueError rather than draw past a stream's limit into the numbers of another one
+	# this generator itself is not advanced
+	def split(self, K, method="block"):
+		remaining = self.limit - self.count
+		streams = []
+		if method == "block":
+			size = remaining // K
+			for i in range(K):
+				stream = MCG(self.seed, self.modulus, self.multiplier, self.record, self.record_size, self.checkpoint_every)
+				stream.restore((self.seed, self.count + i*size))
+				stream.limit = stream.count + size
+				streams.append(stream)
+		elif method == "leapfrog":
+			multiplier_K = pow(self.multiplier, K, modulus)
+			for i in range(K):
+				# the first number of stream i is number count+i+1 of this generator, a^(count+i+2) * seed, and the first number
+				# of an MCG with multiplier a^K is (a^K)^2 * its seed, so that seed is a^(count+i+2-2K) * seed (pow() inverts a)
+				seed = (pow(self.multiplier, self.count + i + 2 - 2*K, modulus) * self.seed) % modulus
+				stream = MCG(seed, self.modulus, multiplier_K, self.record, self.record_size, self.checkpoint_every)
+				stream.limit = max(0, (remaining - i - 1) // K + 1)
+				streams.append(stream)
+		else:
+			raise ValueError(f"unknown split method {method!r}, choose from: 'block', 'leapfrog'")
+		return streams
+
+	def sample(self, low=0, high=modulus):
+		self.check_limit(1)
+		R = (self.multiplier * self.last_number) % modulus # 0 <= R < modulus
+		self.last_number = R
+		self.count += 1
+		if self.record is not None:
+			self.remember(R)
+		# scale to lower and upper sampling limits
+		R = low + (high - low)*(R / self.modulus)
+		return R
+
+	# N numbers low <= R < high as an array, written into <out> (a float array of N numbers) if it is given
+	def sampleN(self, N, low=0, high=modulus, out=None):
+		self.check_limit(N)
+		if modulus >= 2**32 or self.multiplier >= modulus:
+			# products could overflow 64 bits: sample N numbers one by one
+			numbers = []
+			for i in range(N):
+				numbers.append(self.sample(low, high))
+			if out is None:
+				return np.array(numbers)
+			out[:] = numbers
+			return out
+
+		# sample N numbers in blocks, each block following from the last number of the previous one
+		# a block is small enough to stay in the CPU cache while it is generated and scaled, and is recorded before
+		# its memory is reused for the next block
+		A = powers(self.multiplier, max(1, min(N, block_size)))
+		k = len(A)
+		R = np.empty(k, dtype=np.uint64)
+		numbers = np.empty(N) if out is None else out
+		X = self.last_number
+		for start in range(0, N, k):
+			scaled = numbers[start:start + k]
+			block = R[:len(scaled)]
+			np.multiply(A[:len(block)], X, out=block)
+			np.remainder(block, modulus, out=block) # 0 <= R < modulus
+			X = int(block[-1])
+			self.count += len(block)
+			if self.record is not None:
+				self.remember_block(block)
+			# scale to lower and upper sampling limits, with the same arithmetic as sample()
+			np.divide(block, self.modulus, out=scaled)
+			scaled *= (high - low)
+			scaled += low
+		self.last_number = X
+		return numbers
+
+	# fill the contiguous float array <out> with numbers 0 <= R < 1, exactly the numbers sampleN(out.size, 0, 1) gives
+	def fill(self, out):
+		self.sampleN(out.size, 0, 1, out=out.reshape(-1))
+		return out
@@ -0,0 +1,140 @@
+# normally distributed numbers in batches, from the uniform numbers of any generator
+#
+# normal.py draws one pair (v1, v2) at a time in a python loop until it lands inside the unit circle, and keeps the second
+# number of every pair in self.extra for the next call; here the same polar Box-Muller method runs on whole arrays:
+# a batch of pairs somewhat larger than needed is drawn, the pairs outside the circle are dropped with one mask, and the
+# numbers left over at the end of a call are kept for the next call, so no number is thrown away and every call
+# continues the same sequence
+# the Ziggurat method (Marsaglia & Tsang 2000, in the form of Doornik 2005) is the alternative: the area under the
+# normal curve is cut into 128 horizontal layers of equal area, and a number is a uniform position inside a random
+# layer, accepted right away 98.8% of the time; only the few numbers in the ragged edge of a layer, or in the tail beyond
+# the widest layer, need an exp() or log()
+#
+#   sampler = NormalSampler(generator, method="ziggurat")
+#   sampler.sample(10**6), sampler.sample(10**6, mean=4, std=2)
+
+import math
+
+import numpy as np
+
+METHODS = ("polar", "ziggurat")
+BATCH_SIZE = 2**16 # numbers per batch, so the work arrays stay in the CPU cache
+
+# polar Box-Muller on a batch of pairs of uniform numbers -1 <= v < 1, with the arithmetic of Normal.sample() in normal.py:
+# for every pair inside the unit circle, mean + v2*factor and then mean + v1*factor with factor = std*sqrt(-2 ln(R)/R)
+def polar(v1, v2, mean=0.0, std=1.0):
+	R = v1*v1 + v2*v2
+	keep = (R < 1) & (R > 0)
+	v1, v2, R = v1[keep], v2[keep], R[keep]
+	factor = np.log(R)
+	factor *= -2.0
+	factor /= R
+	np.sqrt(factor, out=factor)
+	factor *= std
+	numbers = np.empty(2*len(R))
+	np.multiply(v2, factor, out=numbers[0::2])
+	np.multiply(v1, factor, out=numbers[1::2])
+	numbers += mean
+	return numbers
+
+# the layers of the ziggurat: x[i] is the half-width of layer i (x[0] is the width the base layer would have if the tail
+# were a rectangle), and ratio[i] = x[i+1]/x[i] is the part of layer i that lies completely under the curve
+ZIGGURAT_LAYERS = 128
+ZIGGURAT_R = 3.442619855899 # start of the tail, the half-width of the widest layer
+ZIGGURAT_V = 9.91256303526217e-3 # area of every layer
+
+def ziggurat_tables(C=ZIGGURAT_LAYERS, R=ZIGGURAT_R, V=ZIGGURAT_V):
+	f = lambda x: math.exp(-0.5*x*x)
+	x = [0.0]*(C + 1)
+	x[0] = V / f(R)
+	x[1] = R
+	for i in range(2, C):
+		x[i] = math.sqrt(-2*math.log(V/x[i - 1] + f(x[i - 1])))
+	x = np.array(x)
+	ratio = x[1:] / x[:-1]
+	return x, ratio
+
+ZIGGURAT_X, ZIGGURAT_RATIO = ziggurat_tables()
+
+# numbers beyond the tail start R, with the sign of <negative>: Marsaglia's method, x = -ln(u1)/R accepted if -2 ln(u2) > x^2
+def ziggurat_tail(uniform, negative, R=ZIGGURAT_R):
+	numbers = np.empty(len(negative))
+	todo = np.arange(len(negative))
+	while len(todo):
+		x = -np.log1p(-uniform(len(todo))) / R
+		y = -np.log1p(-uniform(len(todo)))
+		accept = 2*y > x*x
+		numbers[todo[accept]] = R + x[accept]
+		todo = todo[~accept]
+	numbers[negative] *= -1
+	return numbers
+
+# Ziggurat on a batch of uniform numbers -1 <= u < 1 and layer indices 0 <= layer < 128
+# the numbers whose wedge test fails are dropped, which is the same as drawing them again
+def ziggurat(u, layer, uniform, mean=0.0, std=1.0):
+	x_layer = ZIGGURAT_X[layer]
+	numbers = u * x_layer
+	inside = np.abs(u) < ZIGGURAT_RATIO[layer]
+	edge = np.flatnonzero(~inside)
+	keep = inside
+	if len(edge):
+		layer_edge = layer[edge]
+		tail = layer_edge == 0
+		wedge = edge[~tail]
+		if len(wedge):
+			# a point at height between f(x[i]) and f(x[i+1]) is accepted if it lies under the curve
+			x, i = numbers[wedge], layer[wedge]
+			f0 = np.exp(-0.5*(ZIGGURAT_X[i]**2 - x*x))
+			f1 = np.exp(-0.5*(ZIGGURAT_X[i + 1]**2 - x*x))
+			keep[wedge] = f1 + uniform(len(wedge))*(f0 - f1) < 1.0
+		if tail.any():
+			numbers[edge[tail]] = ziggurat_tail(uniform, u[edge[tail]] < 0)
+			keep[edge[tail]] = True
+	numbers = numbers[keep]
+	if std != 1:
+		numbers *= std
+	if mean != 0:
+		numbers += mean
+	return numbers
+
+class NormalSampler:
+	# @params:
+	#   uniform: function uniform(n, low, high) giving n uniform numbers low <= R < high, e.g. a generator's sampleN
+	#   method: "polar" (Box-Muller, the method of normal.py) or "ziggurat"
+	#   mean, std: of the numbers
+	#   batch_size: numbers generated per batch
+	def __init__(self, uniform, method="polar", mean=0.0, std=1.0, batch_size=BATCH_SIZE):
+		if method not in METHODS:
+			raise ValueError(f"unknown normal sampling method {method!r}, choose from: {', '.join(METHODS)}")
+		self.uniform = uniform
+		self.method = method
+		self.mean = mean
+		self.std = std
+		self.batch_size = batch_size
+		self.surplus = np.empty(0) # numbers generated by the last batch and not handed out yet
+
+	# one batch of about <n> numbers (a few more or less, after the rejections)
+	def batch(self, n):
+		if self.method == "polar":
+			# pi/4 of the pairs land inside the circle and give 2 numbers each
+			pairs = int(n / (2*math.pi/4)) + 8
+			v = self.uniform(2*pairs, -1, 1)
+			return polar(v[0::2], v[1::2], self.mean, self.std)
+		u = self.uniform(n, -1, 1)
+		layer = self.uniform(n, 0, ZIGGURAT_LAYERS).astype(np.intp)
+		return ziggurat(u, layer, lambda k: self.uniform(k, 0, 1), self.mean, self.std)
+
+	# the next n numbers as an array, starting with the ones left over from the last call
+	def sample(self, n):
+		numbers = np.empty(n)
+		done = min(n, len(self.surplus))
+		numbers[:done] = self.surplus[:done]
+		self.surplus = self.surplus[done:]
+		while done < n:
+			batch = self.batch(min(self.batch_size, n - done))
+			take = min(len(batch), n - done)
+			numbers[done:done + take] = batch[:take]
+			done += take
+			if take < len(batch):
+				self.surplus = batch[take:]
+		return numbers
@@ -0,0 +1,59 @@
+# numpy's PCG64 (O'Neill's permuted congruential generator with a 128-bit state), the "pcg64" backend of physsim.rng
+#
+# every number is generated in numpy's compiled code, and normal(), exponential(), binomial() and multinomial() use
+# numpy's samplers instead of the ones of physsim.rng, so this is usually the fastest backend; the numbers differ from the
+# MCG's
+#
+#   rng = PCG64(seed=12345)
+#   rng.uniform(10**6), rng.normal(10**6), rng.gauss(0, 1)
+
+import numpy as np
+
+from physsim.rng.base import Generator
+
+initial_seed = 2**31 - 1
+
+class PCG64(Generator):
+	# @params:
+	#   seed: any non-negative integer, spread over the 128-bit state by numpy's SeedSequence
+	#   bit_generator: an np.random.PCG64 to draw from instead of a new one (used by split())
+	def __init__(self, seed=initial_seed, bit_generator=None):
+		self.seed = seed
+		self.bit_generator = bit_generator if bit_generator is not None else np.random.PCG64(seed)
+		self.generator = np.random.Generator(self.bit_generator)
+
+	# state of the generator, as numpy's state dictionary (numbers buffered by sample() and gauss() are already drawn)
+	def state(self):
+		return self.bit_generator.state
+
+	def restore(self, state):
+		self.bit_generator.state = state
+		self.clear_buffers()
+
+	# skip the next n uniform numbers without generating them; every uniform number takes one 64-bit output
+	def jump(self, n):
+		self.bit_generator.advance(n)
+		self.clear_buffers()
+
+	# K streams for K parallel workers: stream i is this generator jumped ahead i times by about 0.618 * 2**128 numbers,
+	# so stream 0 continues this generator and no two streams reach each other's numbers in any realistic run
+	def split(self, K, method="block"):
+		if method != "block":
+			raise ValueError(f"unknown split method {method!r}, PCG64 streams can only be split into blocks")
+		return [PCG64(self.seed, self.bit_generator.jumped(i)) for i in range(K)]
+
+	def fill(self, out):
+		self.generator.random(out=out)
+		return out
+
+	def normal(self, n, mean=0.0, std=1.0):
+		return self.generator.normal(mean, std, n)
+
+	def exponential(self, n, mu=1.0):
+		return self.generator.exponential(mu, n)
+
+	def binomial(self, n, p):
+		return self.generator.binomial(n, p)
+
+	def multinomial(self, n, probabilities):
+		return self.generator.multinomial(n, probabilities)
@@ -0,0 +1,137 @@
+# Philox4x32-10, a counter-based random number generator (Salmon, Moraes, Dror & Shaw, "Parallel random numbers:
+# as easy as 1, 2, 3", SC11), with the same interface as the MCG of rng.py; the "philox" backend of physsim.rng
+#
+# an MCG gets every number from the one before it, so reaching number n takes jump-ahead arithmetic
+# a counter-based generator instead scrambles the position itself: number n is a fixed function of (key, n), here 10 rounds
+# of multiplications and xors that turn a 128-bit counter into four 32-bit outputs; any position costs the same, the
+# state is just (seed, count, stream, limit), and streams with different counters can never produce the same block of numbers
+# a generator with stream=s uses counters whose upper 64 bits are s, so streams 0, 1, 2, ... are separate sequences of
+# 2**66 numbers each; split() cuts the rest of one sequence into K consecutive blocks, like MCG.split(K, "block")
+#
+#   rng = Philox(seed=12345)
+#   rng.sample(0, 1), rng.sampleN(10**6, 0, 1)
+#   workers = rng.split(8)
+
+import numpy as np
+
+from physsim.rng.base import Generator
+
+modulus = 2**32 # outputs are 32-bit integers, 0 <= R < modulus
+initial_seed = 2**31 - 1
+
+# round constants of Philox4x32
+M0, M1 = 0xD2511F53, 0xCD9E8D57
+W0, W1 = 0x9E3779B9, 0xBB67AE85
+MASK = 0xFFFFFFFF
+ROUNDS = 10
+
+# the four outputs of counter (c0, c1, c2, c3) with key (k0, k1), all 32-bit python integers
+def philox_block(c0, c1, c2, c3, k0, k1):
+	for _ in range(ROUNDS):
+		p0 = M0 * c0
+		p1 = M1 * c2
+		c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k0, p1 & MASK, (p0 >> 32) ^ c3 ^ k1, p0 & MASK
+		k0 = (k0 + W0) & MASK
+		k1 = (k1 + W1) & MASK
+	return c0, c1, c2, c3
+
+# the same for arrays of counters: c0 ... c3 are uint64 arrays holding 32-bit values, so every product fits in 64 bits
+# returns an array of shape (len(c0), 4)
+def philox_blocks(c0, c1, c2, c3, k0, k1):
+	m0, m1, mask, shift = np.uint64(M0), np.uint64(M1), np.uint64(MASK), np.uint64(32)
+	for _ in range(ROUNDS):
+		p0 = c0 * m0
+		p1 = c2 * m1
+		c0, c1, c2, c3 = (p1 >> shift) ^ c1 ^ np.uint64(k0), p1 & mask, (p0 >> shift) ^ c3 ^ np.uint64(k1), p0 & mask
+		k0 = (k0 + W0) & MASK
+		k1 = (k1 + W1) & MASK
+	return np.stack([c0, c1, c2, c3], axis=-1)
+
+class Philox(Generator):
+	# @params:
+	#   seed: 64-bit key of the generator
+	#   stream: 64-bit stream number, the upper half of every counter
+	def __init__(self, seed=initial_seed, stream=0):
+		self.seed = seed
+		self.stream = stream
+		self.modulus = modulus
+		self.count = 0 # how many numbers have been generated: the position in the sequence
+		self.limit = 4 * 2**64 # numbers in one stream (or in this block of it, see split())
+		self.block = None # the four outputs of the counter holding the current position, and that counter
+		self.block_index = None
+
+	def key(self):
+		return self.seed & MASK, (self.seed >> 32) & MASK
+
+	# compact state of the generator; number n of a stream is a function of (seed, stream, n) only, and the limit keeps a
+	# block of a split() from running into the next one after it was restored
+	def state(self):
+		return (self.seed, self.count, self.stream, self.limit)
+
+	# restore a state(), or move to position <count> of this stream with a state (seed, count)
+	def restore(self, state):
+		if len(state) == 2:
+			self.seed, self.count = state
+		else:
+			self.seed, self.count, self.stream, self.limit = state
+		self.block = None
+		self.block_index = None
+		self.clear_buffers()
+
+	# skip the next n numbers without generating them (a ValueError if that passes the limit, like drawing them would)
+	def jump(self, n):
+		self.check_limit(n)
+		self.count += n
+
+	# split the rest of the stream into K consecutive blocks of (limit - count)//K numbers, one generator per block
+	# the blocks never overlap: every generator's limit is the end of its block, and sample() and sampleN() raise a
+	# ValueError rather than draw past it
+	def split(self, K, method="block"):
+		if method != "block":
+			raise ValueError(f"unknown split method {method!r}, Philox streams can only be split into blocks")
+		size = (self.limit - self.count) // K
+		streams = []
+		for i in range(K):
+			stream = Philox(self.seed, self.stream)
+			stream.count = self.count + i*size
+			stream.limit = stream.count + size
+			streams.append(stream)
+		return streams
+
+	def sample(self, low=0, high=modulus):
+		self.check_limit(1)
+		index, word = divmod(self.count, 4)
+		if index != self.block_index:
+			self.block = philox_block(index & MASK, index >> 32, self.stream & MASK, (self.stream >> 32) & MASK, *self.key())
+			self.block_index = index
+		R = self.block[word] # 0 <= R < modulus
+		self.count += 1
+		# scale to lower and upper sampling limits
+		return low + (high - low)*(R / self.modulus)
+
+	# N numbers low <= R < high as an array, written into <out> (a float array of N numbers) if it is given
+	def sampleN(self, N, low=0, high=modulus, chunk=2**16, out=None):
+		self.check_limit(N)
+		numbers = np.empty(N) if out is None else out
+		first, last = self.count, self.count + N # positions first ... last-1
+		c2, c3 = np.uint64(self.stream & MASK), np.uint64((self.stream >> 32) & MASK)
+		done = 0
+		# whole counters from the one holding position <first>, a chunk of counters at a time
+		for index in range(first // 4, (last + 3) // 4, chunk):
+			indices = np.arange(index, min(index + chunk, (last + 3) // 4), dtype=np.uint64)
+			R = philox_blocks(indices & np.uint64(MASK), indices >> np.uint64(32), c2, c3, *self.key()).ravel()
+			# drop the outputs before <first> and after <last>
+			start = max(0, first - 4*index)
+			R = R[start:start + N - done]
+			scaled = numbers[done:done + len(R)]
+			np.divide(R, self.modulus, out=scaled)
+			scaled *= (high - low)
+			scaled += low
+			done += len(R)
+		self.count = last
+		return numbers
+
+	# fill the contiguous float array <out> with numbers 0 <= R < 1
+	def fill(self, out):
+		self.sampleN(out.size, 0, 1, out=out.reshape(-1))
+		return out
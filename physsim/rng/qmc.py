@@ -0,0 +1,173 @@
+# low-discrepancy ("quasi-random") point sets in the unit cube [0, 1)^d: Sobol and Halton sequences, optionally scrambled
+#
+# random points leave gaps and clumps, so a Monte Carlo estimate only improves as N^-1/2; the points of a low-discrepancy
+# sequence fill the cube evenly at every N (the first 2^m Sobol points put exactly one point in each of 2^m equal slices
+# of every axis), and for smooth integrands the error falls almost as N^-1
+# on their own these points are deterministic, so they give no error estimate; scrambling them with random numbers keeps
+# the even spread but makes every point uniformly distributed, so several independently scrambled copies give
+# independent estimates whose spread is the error estimate (randomized quasi-Monte Carlo, physsim.montecarlo)
+#
+#   sobol = Sobol(d=3, rng=generator(seed=1))    # rng=None for the plain sequence
+#   u = sobol.points(1024)                       # (1024, 3) array, the next 1024 points
+#   halton = Halton(d=3, rng=generator(seed=1))
+
+import math
+
+import numpy as np
+
+BITS = 32 # bits of a Sobol point; up to 2**32 points per sequence
+
+# primitive polynomials and initial direction numbers of dimensions 2 ... 21, from Joe & Kuo, "Constructing Sobol
+# sequences with better two-dimensional projections" (2008): (s, a, m) with s the degree of the polynomial, a its inner
+# coefficients as a binary number, and m the first s direction numbers (odd, m_i < 2^i)
+# dimension 1 is the van der Corput sequence, with every m_i = 1
+SOBOL_TABLE = [
+	(1, 0, (1,)),
+	(2, 1, (1, 3)),
+	(3, 1, (1, 3, 1)),
+	(3, 2, (1, 1, 1)),
+	(4, 1, (1, 1, 3, 3)),
+	(4, 4, (1, 3, 5, 13)),
+	(5, 2, (1, 1, 5, 5, 17)),
+	(5, 4, (1, 1, 5, 5, 5)),
+	(5, 7, (1, 1, 7, 11, 19)),
+	(5, 11, (1, 1, 5, 1, 1)),
+	(5, 13, (1, 1, 1, 3, 11)),
+	(5, 14, (1, 3, 5, 5, 31)),
+	(6, 1, (1, 3, 3, 9, 7, 49)),
+	(6, 13, (1, 1, 1, 15, 21, 21)),
+	(6, 16, (1, 3, 1, 13, 27, 49)),
+	(6, 19, (1, 1, 1, 15, 7, 5)),
+	(6, 22, (1, 3, 1, 15, 13, 25)),
+	(6, 25, (1, 1, 5, 5, 19, 61)),
+	(7, 1, (1, 3, 7, 11, 23, 15, 103)),
+	(7, 4, (1, 3, 7, 13, 13, 15, 69)),
+]
+SOBOL_MAX_DIMS = len(SOBOL_TABLE) + 1
+
+# the BITS direction numbers of one dimension, as BITS-bit integers v_i = m_i * 2^(BITS - i), by Joe & Kuo's recurrence
+def sobol_directions(s, a, m):
+	v = [0]*(BITS + 1) # 1-based
+	for i in range(1, min(s, BITS) + 1):
+		v[i] = m[i - 1] << (BITS - i)
+	for i in range(s + 1, BITS + 1):
+		v[i] = v[i - s] ^ (v[i - s] >> s)
+		for k in range(1, s):
+			v[i] ^= ((a >> (s - 1 - k)) & 1) * v[i - k]
+	return v[1:]
+
+# a random integer of <bits> bits from the uniform numbers of rng, 16 bits at a time (the MCG has only 31 random bits)
+def random_bits(rng, bits):
+	value = 0
+	for R in rng.uniform((bits + 15) // 16):
+		value = (value << 16) | int(R * 2**16)
+	return value >> (-bits % 16)
+
+def parity(x):
+	return bin(x).count("1") & 1
+
+# random linear scrambling (Matousek): every direction number, as a column of bits with the most significant bit first,
+# is multiplied by one random lower triangular bit matrix with ones on its diagonal; bit r of the result is bit r of v
+# plus (mod 2) a random selection of the more significant bits of v
+def linear_scramble(directions, rng):
+	rows = [random_bits(rng, r) << (BITS - r) if r else 0 for r in range(BITS)]
+	scrambled = []
+	for v in directions:
+		w = 0
+		for r in range(BITS):
+			position = BITS - 1 - r
+			w |= (((v >> position) & 1) ^ parity(v & rows[r])) << position
+		scrambled.append(w)
+	return scrambled
+
+class Sobol:
+	# @params:
+	#   d: dimensions, at most SOBOL_MAX_DIMS
+	#   rng: generator for the scrambling (linear scrambling and a random digital shift), None for the plain sequence
+	def __init__(self, d, rng=None):
+		if not 1 <= d <= SOBOL_MAX_DIMS:
+			raise ValueError(f"Sobol points have 1 to {SOBOL_MAX_DIMS} dimensions, not {d}")
+		directions = [[1 << (BITS - i) for i in range(1, BITS + 1)]]
+		directions += [sobol_directions(s, a, m) for s, a, m in SOBOL_TABLE[:d - 1]]
+		shift = [0]*d
+		if rng is not None:
+			directions = [linear_scramble(v, rng) for v in directions]
+			shift = [random_bits(rng, BITS) for _ in range(d)]
+		self.d = d
+		self.directions = np.array(directions, dtype=np.uint64) # (d, BITS)
+		self.shift = np.array(shift, dtype=np.uint64)
+		self.index = 0 # index of the next point
+
+	# the next n points, as an (n, d) array
+	# point i is the XOR of the direction numbers picked by the bits of its Gray code i ^ (i >> 1); the Gray codes of i - 1
+	# and i differ in one bit, the lowest set bit of i, so every point is the one before with one more direction number
+	# XORed in, and a batch is one cumulative XOR starting from the first point
+	def points(self, n):
+		if self.index + n > 2**BITS:
+			raise ValueError(f"a Sobol sequence has only 2**{BITS} points")
+		first = self.shift.copy()
+		gray = self.index ^ (self.index >> 1)
+		for bit in range(gray.bit_length()):
+			if (gray >> bit) & 1:
+				first ^= self.directions[:, bit]
+		i = np.arange(self.index + 1, self.index + n, dtype=np.int64)
+		lowest_bit = np.log2(i & -i).astype(np.intp) # exact, the argument is a power of 2
+		steps = np.concatenate([first[None, :], self.directions.T[lowest_bit]])
+		x = np.bitwise_xor.accumulate(steps, axis=0)
+		self.index += n
+		return x * 2.0**-BITS
+
+# the first d primes, the bases of the Halton sequence
+def primes(d):
+	found = []
+	candidate = 2
+	while len(found) < d:
+		if all(candidate % p for p in found if p*p <= candidate):
+			found.append(candidate)
+		candidate += 1
+	return found
+
+class Halton:
+	# @params:
+	#   d: dimensions
+	#   rng: generator for the scrambling (a random permutation of the digits at every digit position), None for the
+	#        plain sequence
+	def __init__(self, d, rng=None):
+		self.d = d
+		self.bases = primes(d)
+		# enough digits to reach the resolution of a float: base^digits >= 2^53
+		self.digits = [math.ceil(53 / math.log2(b)) for b in self.bases]
+		if rng is None:
+			self.permutations = [np.tile(np.arange(b), (k, 1)) for b, k in zip(self.bases, self.digits)]
+		else:
+			self.permutations = [np.argsort(rng.uniform(b*k).reshape(k, b), axis=1) for b, k in zip(self.bases, self.digits)]
+		# the digits of an index are 0 from some position on, and add the same permuted zeros to every coordinate:
+		# tails[k][p] is the sum of those from position p on
+		self.tails = []
+		for b, permutation in zip(self.bases, self.permutations):
+			zeros = permutation[:, 0] * float(b)**-np.arange(1, len(permutation) + 1)
+			self.tails.append(np.concatenate([np.cumsum(zeros[::-1])[::-1], [0.0]]))
+		# the unscrambled sequence starts at 1, since point 0 is the corner (0, ..., 0)
+		self.index = 0 if rng is not None else 1
+
+	# the next n points, as an (n, d) array: coordinate k of point i is i written in base b_k with its digits mirrored
+	# behind the decimal point (the radical inverse), each digit first permuted when scrambled
+	def points(self, n):
+		i = np.arange(self.index, self.index + n, dtype=np.int64)
+		x = np.zeros((n, self.d))
+		for k, (b, digits, permutation) in enumerate(zip(self.bases, self.digits, self.permutations)):
+			q = i.copy()
+			scale = 1.0 / b
+			position = 0
+			# only the digits up to the last nonzero digit of the largest index differ between the points
+			while position < digits and (b**position <= self.index + n - 1):
+				q, digit = np.divmod(q, b)
+				x[:, k] += permutation[position][digit] * scale
+				scale /= b
+				position += 1
+			x[:, k] += self.tails[k][position]
+		self.index += n
+		# the permuted digits beyond the precision of a float can add up to a number that rounds to 1
+		return np.minimum(x, 1 - 2**-53)
+
+SEQUENCES = {"sobol": Sobol, "halton": Halton}
@@ -0,0 +1,249 @@
+# sampling any distribution from tables: inverse CDF for continuous distributions, alias tables for discrete ones
+#
+# sampling.py inverts the CDF of the exponential distribution by hand, x = -mu*log(1 - R), which only works when the CDF
+# has a closed-form inverse; here the inverse is tabulated once instead, for any PDF given as a function or as a table:
+#   continuous: the CDF is integrated from the PDF with the trapezoid rule on a fine grid and inverted exactly between
+#               the grid points; a guide table over equally spaced values of the CDF takes a uniform number R straight to
+#               its grid cell with one multiplication, so almost every draw costs the same, whatever the distribution
+#   discrete:   Walker's alias method (in Vose's form): every one of the n outcomes gets a column of height 1/n holding
+#               part of its own probability and the rest borrowed from one other outcome, its alias; a draw picks a
+#               column and then one of its two outcomes, again the same cost for every draw
+# building a table costs more than sampling from it, so tables are cached by the distribution and its parameters: the
+# most recently used MAX_TABLES in memory, and tables with a key also in .physsim_cache/tables at the root of the
+# repository (whatever the working directory), so later runs load them instead of building them again
+#
+#   exponential = continuous(lambda x: np.exp(-x), 0, 20, key=("exponential", 1.0))
+#   x = exponential.sample(rng, 10**6)
+#   die = discrete([1, 1, 1, 1, 1, 1], values=[1, 2, 3, 4, 5, 6], key="die")
+#   rolls = die.sample(rng, 10**6)
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+# next to the physsim package, not in the working directory, so every run shares one cache (it is in .gitignore)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".physsim_cache", "tables")
+GRID_POINTS = 2**14 + 1 # points of the grid of a continuous PDF
+TABLE_SIZE = 2**16 # cells of the guide table of the inverse CDF
+SEARCH_STEPS = 4 # grid cells tried one by one before bisection
+
+MAX_TABLES = 64 # tables kept in memory
+
+TABLES = OrderedDict() # tables built or loaded in this process by their cache key, the least recently used first
+
+# inverse CDF table of a continuous distribution
+class InverseCDF:
+	# @params:
+	#   x: the grid, increasing
+	#   cdf: the CDF at the points of the grid, strictly increasing from 0 to 1; the CDF is linear between them
+	#   guide: for every cell of [0, 1] of width 1/M (M = len(guide) - 1), the grid cell that holds the cell's start
+	def __init__(self, x, cdf, guide):
+		self.x = np.asarray(x, dtype=float)
+		self.cdf = np.asarray(cdf, dtype=float)
+		self.guide = np.asarray(guide, dtype=np.intp)
+		self.cells = len(self.guide) - 1
+		# inverse slope of the CDF in every grid cell, so x = x[j] + (R - cdf[j])*slopes[j] inside grid cell j
+		# a cell where the CDF is flat (a gap where the PDF is zero) is never picked, and gets slope 0
+		rise = np.diff(self.cdf)
+		self.slopes = np.divide(np.diff(self.x), rise, out=np.zeros(len(rise)), where=rise > 0)
+
+	# the table of the piecewise linear CDF through (x, cdf), where cdf is non-decreasing from 0 to 1
+	@classmethod
+	def from_cdf(cls, x, cdf, table_size=TABLE_SIZE):
+		# of a flat stretch of the CDF, where the PDF is zero, only the two ends are needed
+		rises = np.diff(cdf) > 0
+		keep = np.concatenate([[False], rises]) | np.concatenate([rises, [False]])
+		x, cdf = x[keep], cdf[keep]
+		guide = np.searchsorted(cdf, np.linspace(0, 1, table_size + 1), side="right") - 1
+		return cls(x, cdf, np.clip(guide, 0, len(x) - 2))
+
+	# grid cells of the uniform numbers R
+	# R in guide cell i lies in grid cell guide[i] if the guide cell starts and ends in the same grid cell; otherwise the
+	# grid cells from guide[i] on are tried one after the other (the guide is finer than the grid, so that is rarely more
+	# than one step), and the few numbers still without a cell after SEARCH_STEPS steps are looked up by bisection
+	def grid_cells(self, R):
+		i = (R * self.cells).astype(np.intp)
+		np.minimum(i, self.cells - 1, out=i)
+		j = self.guide[i]
+		todo = np.flatnonzero(self.guide[i + 1] != j)
+		for _ in range(SEARCH_STEPS):
+			if not len(todo):
+				return j
+			step = R[todo] >= self.cdf[j[todo] + 1]
+			todo = todo[step]
+			j[todo] += 1
+		if len(todo):
+			j[todo] = np.minimum(np.searchsorted(self.cdf, R[todo], side="right") - 1, len(self.x) - 2)
+		return j
+
+	# n numbers from the distribution, from the uniform numbers of generator rng (anything with uniform(n))
+	def sample(self, rng, n):
+		R = rng.uniform(n)
+		j = self.grid_cells(R)
+		R -= self.cdf[j]
+		R *= self.slopes[j]
+		R += self.x[j]
+		return R
+
+	def arrays(self):
+		return {"x": self.x, "cdf": self.cdf, "guide": self.guide}
+
+# alias table of a discrete distribution
+class AliasTable:
+	# @params:
+	#   probability: for every column, the probability of taking the column's own outcome instead of its alias
+	#   alias: for every column, the index of its alias outcome
+	#   values: the outcomes (default: their indices 0 ... n-1)
+	def __init__(self, probability, alias, values=None):
+		self.probability = np.asarray(probability, dtype=float)
+		self.alias = np.asarray(alias, dtype=np.intp)
+		self.values = np.arange(len(self.probability)) if values is None else np.asarray(values)
+
+	# Vose's construction: columns with less than the average weight are filled up from columns with more
+	@classmethod
+	def from_weights(cls, weights, values=None):
+		weights = np.asarray(weights, dtype=float)
+		if weights.ndim != 1 or len(weights) == 0 or np.any(weights < 0) or not np.isfinite(weights).all() or weights.sum() <= 0:
+			raise ValueError("weights must be a non-empty list of non-negative numbers with a positive sum")
+		n = len(weights)
+		scaled = weights * (n / weights.sum()) # average 1
+		probability = np.ones(n)
+		alias = np.arange(n)
+		small = [i for i in range(n) if scaled[i] < 1]
+		large = [i for i in range(n) if scaled[i] >= 1]
+		while small and large:
+			s, l = small.pop(), large.pop()
+			probability[s] = scaled[s]
+			alias[s] = l
+			# column s borrowed 1 - scaled[s] of outcome l
+			scaled[l] -= 1 - scaled[s]
+			(small if scaled[l] < 1 else large).append(l)
+		# whatever is left is 1 up to rounding, and keeps its own outcome
+		return cls(probability, alias, values)
+
+	# n outcomes, from the uniform numbers of generator rng (anything with uniform(n))
+	def sample(self, rng, n):
+		columns = len(self.probability)
+		i = rng.uniform(n, 0, columns).astype(np.intp)
+		np.minimum(i, columns - 1, out=i)
+		coin = rng.uniform(n)
+		return self.values[np.where(coin < self.probability[i], i, self.alias[i])]
+
+	def arrays(self):
+		return {"probability": self.probability, "alias": self.alias, "values": self.values}
+
+# cache key of a table: a hash of a description of the distribution (its key, or the hash of its tabulated values)
+# and of the settings of the table
+def table_key(kind, description, **settings):
+	text = json.dumps({"kind": kind, "distribution": description, "settings": settings}, sort_keys=True, default=repr)
+	return hashlib.sha256(text.encode()).hexdigest()
+
+def array_hash(*arrays):
+	digest = hashlib.sha256()
+	for a in arrays:
+		digest.update(np.ascontiguousarray(a, dtype=float).tobytes())
+	return digest.hexdigest()
+
+# the table with cache key <key>: from memory, from the cache directory, or built by build() and saved
+def cached_table(key, cls, build, cache_dir):
+	if key in TABLES:
+		TABLES.move_to_end(key)
+		return TABLES[key]
+	path = os.path.join(cache_dir, key + ".npz") if cache_dir is not None else None
+	if path is not None and os.path.exists(path):
+		with np.load(path) as archive:
+			table = cls(**{name: archive[name] for name in archive.files})
+	else:
+		table = build()
+		if path is not None:
+			os.makedirs(cache_dir, exist_ok=True)
+			# save under a temporary name first, so an interrupted run never leaves a truncated table behind
+			temporary = path + ".tmp.npz"
+			np.savez(temporary, **table.arrays())
+			os.replace(temporary, path)
+	TABLES[key] = table
+	if len(TABLES) > MAX_TABLES:
+		TABLES.popitem(last=False)
+	return table
+
+# inverse CDF sampler of a continuous distribution on [low, high]
+# @params:
+#   pdf: the probability density (need not be normalized), a function of an array of x, or an array of its values at
+#        the points <x> (a tabulated PDF; then low and high default to the ends of x)
+#   low, high: the support of the distribution; a PDF with infinite support has to be cut off where it is negligible
+#   x: the points of a tabulated PDF
+#   key: anything JSON-serializable that identifies a PDF function and its parameters, e.g. ("exponential", mu); tables
+#        of a function are only cached if it has a key, tables of a tabulated PDF are cached in memory by its values, and
+#        only tables with a key are saved in cache_dir
+#   points: points of the grid where the PDF is evaluated (or interpolated from its table)
+#   table_size: cells of the guide table of the inverse CDF
+#   cache_dir: directory of the saved tables, None to only cache them in memory
+def continuous(pdf, low=None, high=None, x=None, key=None, points=GRID_POINTS, table_size=TABLE_SIZE, cache_dir=CACHE_DIR):
+	if callable(pdf):
+		if low is None or high is None:
+			raise ValueError("a PDF function needs the limits low and high of its support")
+		description = key
+	else:
+		if x is None:
+			raise ValueError("a tabulated PDF needs the points x of its values")
+		x = np.asarray(x, dtype=float)
+		values = np.asarray(pdf, dtype=float)
+		low = x[0] if low is None else low
+		high = x[-1] if high is None else high
+		description = key if key is not None else array_hash(x, values)
+	if not low < high:
+		raise ValueError(f"the support [{low}, {high}] is empty")
+
+	def build():
+		if callable(pdf):
+			grid = np.linspace(low, high, points)
+			density = np.asarray(pdf(grid), dtype=float) * np.ones(points)
+		else:
+			# the tabulated PDF is interpolated linearly onto the fine grid
+			grid = np.linspace(low, high, points)
+			density = np.interp(grid, x, values, left=0.0, right=0.0)
+		if np.any(density < 0) or not np.isfinite(density).all():
+			raise ValueError("the PDF must be finite and non-negative on the support")
+		# CDF by the trapezoid rule
+		cdf = np.concatenate([[0.0], np.cumsum(0.5*(density[1:] + density[:-1])*np.diff(grid))])
+		if cdf[-1] <= 0:
+			raise ValueError("the PDF is zero everywhere on the support")
+		return InverseCDF.from_cdf(grid, cdf / cdf[-1], table_size)
+
+	if description is None:
+		# a function without a key can't be recognized again, so its table isn't cached
+		return build()
+	saved = key is not None
+	key = table_key("continuous", description, low=low, high=high, points=points, table_size=table_size)
+	return cached_table(key, InverseCDF, build, cache_dir if saved else None)
+
+# alias sampler of a discrete distribution
+# @params:
+#   weights: relative probability of every outcome (need not be normalized)
+#   values: the outcomes (default: their indices 0 ... n-1)
+#   key: anything JSON-serializable that identifies the distribution; only a table with a key is saved in cache_dir,
+#        since every new set of weights would otherwise leave a file behind
+#   cache_dir: directory of the saved tables, None to only cache them in memory
+def discrete(weights, values=None, key=None, cache_dir=CACHE_DIR):
+	weights = np.asarray(weights, dtype=float)
+	description = array_hash(weights) if values is None else [array_hash(weights), np.asarray(values).tolist()]
+	saved = key is not None
+	if saved:
+		description = [key, description]
+	key = table_key("discrete", description)
+	return cached_table(key, AliasTable, lambda: AliasTable.from_weights(weights, values), cache_dir if saved else None)
+
+KINDS = ("continuous", "discrete")
+
+# sampler of any distribution: discrete(pdf, values) for kind="discrete" (the default if values are given),
+# continuous(pdf, low, high, x) otherwise; options are passed on
+def sampler(pdf, low=None, high=None, x=None, values=None, kind=None, **options):
+	kind = kind or ("discrete" if values is not None else "continuous")
+	if kind not in KINDS:
+		raise ValueError(f"unknown kind of distribution {kind!r}, choose from: {', '.join(KINDS)}")
+	if kind == "discrete":
+		return discrete(pdf, values, **options)
+	return continuous(pdf, low, high, x, **options)
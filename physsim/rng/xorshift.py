@@ -0,0 +1,92 @@
+# xorshift128+ (Vigna, "Further scramblings of Marsaglia's xorshift generators", 2017), the "xorshift" backend of physsim.rng
+#
+# one step of xorshift128+ is three shifts, three xors and an addition on two 64-bit words: far too little work to be
+# worth a python function call per number, so <lanes> independent generators run side by side in uint64 arrays and
+# every step gives <lanes> numbers at once, step 0 of every lane, then step 1 of every lane, and so on
+# the lanes are seeded by numpy's SeedSequence, which scatters them over the period of 2**128 - 1; they are separate
+# sequences in any realistic run, but only statistically, not by construction like the blocks of the MCG and Philox
+#
+#   rng = Xorshift(seed=12345)
+#   rng.uniform(10**6), rng.normal(10**6)
+#   workers = rng.split(8)
+
+import numpy as np
+
+from physsim.rng.base import Generator
+
+initial_seed = 2**31 - 1
+LANES = 2**14
+SCALE = 2.0**-53 # the top 53 bits of an output, times 2**-53, is a float 0 <= R < 1 with every bit random
+
+class Xorshift(Generator):
+	# @params:
+	#   seed: any non-negative integer
+	#   lanes: number of generators stepped side by side; changes the sequence, not just the speed
+	#   spawn_key: position in the tree of split() streams, () for a generator that wasn't split off another one
+	def __init__(self, seed=initial_seed, lanes=LANES, spawn_key=()):
+		self.seed = seed
+		self.lanes = lanes
+		self.spawn_key = tuple(spawn_key)
+		words = np.random.SeedSequence(seed, spawn_key=self.spawn_key).generate_state(2*lanes, dtype=np.uint64)
+		self.s0, self.s1 = words[:lanes].copy(), words[lanes:].copy()
+		# a lane with both words zero would stay zero forever
+		self.s1[(self.s0 == 0) & (self.s1 == 0)] = 1
+		self.count = 0 # how many numbers have been handed out
+		self.spare = np.empty(0, dtype=np.uint64) # outputs of the last step that weren't handed out yet
+		self.shifted = np.empty(lanes, dtype=np.uint64) # work array of step()
+
+	# one step of every lane, writing the <lanes> outputs into the uint64 array <out>
+	def step(self, out):
+		x, y = self.s0, self.s1
+		np.add(x, y, out=out)
+		# s0 <- s1,  s1 <- x ^ y ^ (x >> 18) ^ (y >> 5)  with  x ^= x << 23  first, all in place in the old s0 array
+		np.left_shift(x, np.uint64(23), out=self.shifted)
+		x ^= self.shifted
+		np.right_shift(x, np.uint64(18), out=self.shifted)
+		x ^= self.shifted
+		x ^= y
+		np.right_shift(y, np.uint64(5), out=self.shifted)
+		x ^= self.shifted
+		self.s0, self.s1 = y, x
+
+	# state of the generator: copies of its lanes, the outputs not handed out yet, and the count
+	def state(self):
+		return (self.s0.copy(), self.s1.copy(), self.spare.copy(), self.count)
+
+	def restore(self, state):
+		s0, s1, spare, self.count = state
+		self.s0, self.s1, self.spare = s0.copy(), s1.copy(), spare.copy()
+		self.clear_buffers()
+
+	# skip the next n numbers; xorshift128+ has no cheap jump ahead, so they are generated and thrown away
+	def jump(self, n):
+		block = np.empty(min(n, 2**20))
+		while n > 0:
+			self.fill(block[:min(n, len(block))])
+			n -= len(block)
+		self.clear_buffers()
+
+	# K streams for K parallel workers, seeded from this generator's seed and a spawn key of their own
+	# this generator itself is not advanced
+	def split(self, K, method="block"):
+		if method != "block":
+			raise ValueError(f"unknown split method {method!r}, xorshift streams can only be split into blocks")
+		return [Xorshift(self.seed, self.lanes, self.spawn_key + (i,)) for i in range(K)]
+
+	def fill(self, out):
+		numbers = out.reshape(-1)
+		n = len(numbers)
+		done = min(n, len(self.spare))
+		np.multiply(self.spare[:done] >> np.uint64(11), SCALE, out=numbers[:done])
+		self.spare = self.spare[done:]
+		R = np.empty(self.lanes, dtype=np.uint64)
+		while done < n:
+			self.step(R)
+			take = min(self.lanes, n - done)
+			if take < self.lanes:
+				self.spare = R[take:].copy()
+			R >>= np.uint64(11)
+			np.multiply(R[:take], SCALE, out=numbers[done:done + take])
+			done += take
+		self.count += n
+		return out
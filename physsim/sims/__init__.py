@@ -0,0 +1,60 @@
+# headless ports of the lecture simulations
+# each module keeps the physics of one lecture and leaves out the plotting
+#
+# every simulation registered in SIMS has a function run(steps, seed, **params) in its module
+# it returns a dictionary of plain python lists and numbers, which the command line interface saves with numpy
+# the matching plots are drawn by physsim.render, which is the only place matplotlib is imported
+
+import importlib
+
+# name -> (module, function in that module, short description)
+SIMS = {
+	"fd": ("physsim.sims.differentiation", "run", "Part 2: forward/backward/central finite difference dx sweep"),
+	"decay": ("physsim.sims.decay", "run", "Part 2: Euler's method for radioactive decay"),
+	"decay_chain": ("physsim.sims.decay", "run_chain", "Part 2: radioactive decay chain, exact or stochastic"),
+	"freefall": ("physsim.sims.kinematics", "run_freefall", "Part 3: free fall with optional linear drag"),
+	"projectile": ("physsim.sims.kinematics", "run_projectile", "Part 3: projectile trajectories for several launch angles"),
+	"projectile_sweep": ("physsim.sims.kinematics", "run_projectile_sweep", "Part 3: range and apex over a grid of launch angles and speeds"),
+	"pbc": ("physsim.sims.kinematics", "run_pbc", "Part 3: 1D motion with periodic boundary conditions"),
+	"mcg": ("physsim.sims.random_numbers", "run_mcg", "Part 4: uniformity of the multiplicative congruential generator"),
+	"exponential": ("physsim.sims.random_numbers", "run_exponential", "Part 4: inverse-CDF sampling of an exponential distribution"),
+	"normal": ("physsim.sims.random_numbers", "run_normal", "Part 4: Box-Muller Gaussian random numbers"),
+	"mcpi": ("physsim.sims.random_numbers", "run_mcpi", "Part 4: Monte Carlo estimate of pi"),
+	"brownian": ("physsim.sims.random_numbers", "run_brownian", "Part 4: ensemble of Brownian random walkers"),
+	"collisions": ("physsim.sims.collisions", "run", "Part 5: hard sphere gas with periodic, reflective or thermal walls"),
+	"waves": ("physsim.sims.waves", "run", "Part 7: standing waves on a string"),
+	"compton": ("physsim.sims.compton", "run", "Part 8: repeated Compton scattering in a slab"),
+	"bremsstrahlung": ("physsim.sims.bremsstrahlung", "run", "Part 8: simplified bremsstrahlung spectrum"),
+}
+
+# the run() function of a simulation, importing only that simulation's module
+def get(name):
+	if name not in SIMS:
+		raise KeyError(f"unknown simulation {name!r}, choose from: {', '.join(sorted(SIMS))}")
+	module, function, _ = SIMS[name]
+	return getattr(importlib.import_module(module), function)
+
+# merge user parameters into the defaults of a simulation, rejecting names the simulation doesn't know
+def parameters(defaults, params):
+	unknown = set(params) - set(defaults)
+	if unknown:
+		raise ValueError(f"unknown parameter(s) {', '.join(sorted(unknown))}, choose from: {', '.join(sorted(defaults))}")
+	merged = dict(defaults)
+	merged.update(params)
+	return merged
+
+# the lecture MCG, seeded with <seed> or with the lecture's default seed if seed is None
+# (a seed that is a multiple of the modulus raises a ValueError, see physsim.rng.mcg.check_seed)
+def mcg(seed=None):
+	from physsim.rng.mcg import MCG
+	if seed is None:
+		return MCG()
+	return MCG(seed=seed)
+
+# the random number generator of the simulations, from the backend configured in physsim.rng (PHYSSIM_RNG)
+# with the default backend this is the lecture MCG, so the simulations draw the same numbers as the lecture scripts
+def rng(seed=None):
+	from physsim import rng as backends
+	if backends.backend_name() == "mcg":
+		return mcg(seed)
+	return backends.generator(seed=seed)
@@ -0,0 +1,28 @@
+# simplified bremsstrahlung spectrum from bremsstrahlung.py in "Part 8 - Radiation", without the plot
+
+import numpy as np
+
+from physsim.sims import parameters, rng
+
+STEPS = 100000 # number of photons
+DEFAULTS = {"energy_keV": 100.0, "bins": 50}
+
+# photon energies sampled from a 1/E spectrum between 0 and energy_keV, and their histogram
+def run(steps=STEPS, seed=None, **params):
+	params = parameters(DEFAULTS, params)
+	energy_keV = params["energy_keV"]
+	generator = rng(seed)
+
+	photon_energies = generator.uniform(steps, 0, energy_keV) # uniform sampling
+	intensity = 1 / photon_energies # intensity inversely proportional to energy
+	# np.random.choice(photon_energies, p=intensity/sum) of the lecture, by inverting the cumulative intensity
+	cumulative = np.cumsum(intensity)
+	chosen = np.searchsorted(cumulative, generator.uniform(steps, 0, cumulative[-1]), side="right")
+	photon_energies_keV = photon_energies[np.minimum(chosen, steps - 1)]
+
+	spectrum, bins = np.histogram(photon_energies_keV, bins=params["bins"], range=(0, energy_keV))
+	return {
+		"energies": photon_energies_keV,
+		"spectrum": spectrum,
+		"bin_centers": 0.5 * (bins[:-1] + bins[1:]),
+	}
@@ -0,0 +1,231 @@
+# hard sphere molecular dynamics from "Part 5 - Collisions", without the animation
+# the box side length L is passed in explicitly instead of being a module-level global
+
+import math
+
+from physsim.sims import parameters, rng
+
+# sample two velocity components from the Maxwell-Boltzmann distribution at temperature T_wall, as in collision3.py
+# gauss(mean, sigma) draws one normally distributed number
+def sample_Maxwell_Boltzmann(m, T_wall, gauss, kB=1.0):
+	# let Boltzmann constant be unity
+	# velocity components are drawn from a normal distribution with mean = zero and variance = kB*T_wall/m
+	sigma = math.sqrt(kB * T_wall / m)
+	vx = gauss(0, sigma)
+	vy = gauss(0, sigma)
+	return vx, vy
+
+class Particle:
+	def __init__(self, particle_id, m, r, x, y, vx, vy):
+		self.id = particle_id # integer
+		self.m = m # mass
+		self.r = r # radius
+		self.x = x # x-component of position
+		self.y = y # y-component of position
+		self.vx = vx # x-component of velocity
+		self.vy = vy # y-component of velocity
+
+	# solve equations of motion after a time interval dt
+	# periodic boundary conditions, as in collisions1.py
+	def euler_periodic(self, fx, fy, dt, L):
+		self.vx = self.vx + (fx/self.m)*dt
+		self.vy = self.vy + (fy/self.m)*dt
+		self.x = (self.x + self.vx*dt) % L
+		self.y = (self.y + self.vy*dt) % L
+
+	# solve equations of motion after a time interval dt
+	# reflective boundary conditions, as in collision2.py
+	def euler_reflective(self, fx, fy, dt, L):
+		# update velocity from force
+		self.vx += (fx / self.m) * dt
+		self.vy += (fy / self.m) * dt
+
+		# predict new position
+		x_new = self.x + self.vx * dt
+		y_new = self.y + self.vy * dt
+
+		# reflect at x=0 or x=L
+		if x_new < 0:
+			x_new = -x_new
+			self.vx = -self.vx
+		elif x_new > L:
+			x_new = 2*L - x_new
+			self.vx = -self.vx
+
+		# reflect at y=0 or y=L
+		if y_new < 0:
+			y_new = -y_new
+			self.vy = -self.vy
+		elif y_new > L:
+			y_new = 2*L - y_new
+			self.vy = -self.vy
+
+		# update position
+		self.x = x_new
+		self.y = y_new
+
+	# solve equations of motion after a time interval dt
+	# thermal walls, as in collision3.py: a particle hitting a wall is pinned to it
+	# and leaves with a new velocity drawn from the Maxwell-Boltzmann distribution at T_wall, pointing back into the box
+	def euler_thermal(self, fx, fy, dt, L, T_wall, gauss):
+		# update velocity from force
+		self.vx += (fx / self.m) * dt
+		self.vy += (fy / self.m) * dt
+
+		# predict new position
+		x_new = self.x + self.vx * dt
+		y_new = self.y + self.vy * dt
+
+		# left wall collision
+		if x_new < 0:
+			# pin the particle to x=0
+			x_new = 0
+			# re-sample velocity from MB distribution until vx > 0 so it goes back inside the box
+			vx_new, vy_new = sample_Maxwell_Boltzmann(self.m, T_wall, gauss)
+			while vx_new <= 0:
+				vx_new, vy_new = sample_Maxwell_Boltzmann(self.m, T_wall, gauss)
+			self.vx, self.vy = vx_new, vy_new
+
+		# right wall collision
+		if x_new > L:
+			# pin the particle to x=L and re-sample until vx < 0
+			x_new = L
+			vx_new, vy_new = sample_Maxwell_Boltzmann(self.m, T_wall, gauss)
+			while vx_new >= 0:
+				vx_new, vy_new = sample_Maxwell_Boltzmann(self.m, T_wall, gauss)
+			self.vx, self.vy = vx_new, vy_new
+
+		# bottom wall collision
+		if y_new < 0:
+			# pin the particle to y=0 and re-sample until vy > 0
+			y_new = 0
+			vx_new, vy_new = sample_Maxwell_Boltzmann(self.m, T_wall, gauss)
+			while vy_new <= 0:
+				vx_new, vy_new = sample_Maxwell_Boltzmann(self.m, T_wall, gauss)
+			self.vx, self.vy = vx_new, vy_new
+
+		# top wall collision
+		if y_new > L:
+			# pin the particle to y=L and re-sample until vy < 0
+			y_new = L
+			vx_new, vy_new = sample_Maxwell_Boltzmann(self.m, T_wall, gauss)
+			while vy_new >= 0:
+				vx_new, vy_new = sample_Maxwell_Boltzmann(self.m, T_wall, gauss)
+			self.vx, self.vy = vx_new, vy_new
+
+		# update position
+		self.x = x_new
+		self.y = y_new
+
+	# check whether this particle overlaps with another particle p1
+	def check_overlap(self, p1):
+		return math.hypot(p1.x - self.x, p1.y - self.y) < self.r + p1.r
+
+	# change velocities of overlapping particles
+	def change_velocities(self, p1):
+		dx = p1.x - self.x
+		dy = p1.y - self.y
+		dist = math.hypot(dx, dy)
+		if dist == 0:
+			# particles in exactly the same position have no collision normal
+			return
+		# unit collision normal
+		nx = dx / dist
+		ny = dy / dist
+		# velocity components along collision normal
+		vn = self.vx*nx + self.vy*ny
+		vn1 = p1.vx*nx + p1.vy*ny
+		# apply 1D elastic collision rules to normal components
+		vn_final = ((self.m - p1.m)*vn + 2*p1.m*vn1) / (self.m + p1.m)
+		vn1_final = ((p1.m - self.m)*vn1 + 2*self.m*vn) / (self.m + p1.m)
+		# convert back into vx, vy
+		dvn = vn_final - vn
+		dvn1 = vn1_final - vn1
+		self.vx += dvn*nx
+		self.vy += dvn*ny
+		p1.vx += dvn1*nx
+		p1.vy += dvn1*ny
+
+BOUNDARIES = ("periodic", "reflective", "thermal")
+
+# place N particles at random positions in the box, with random velocities
+# rng is an MCG (or anything with sample() and modulus), used the same way as in the lecture scripts, including their
+# velocity formula vmax*(2*R - 1)/modulus: it subtracts 1 from 2*R rather than from 2*R/modulus, so every velocity
+# component lies between 0 and 2*vmax (not between -vmax and vmax) and the gas drifts towards +x and +y as a whole
+# the lecture scripts check every new particle for overlaps, but their break only leaves the inner loop, so the particle
+# is kept anyway; that is the default here too, so a run starts from the same particles as the lecture script with the
+# same seed, and reject_overlaps=True draws a particle that would overlap one already placed again instead
+def place_particles(rng, N_particles, L, mass, radius, vmax, reject_overlaps=False):
+	particles = []
+	while len(particles) < N_particles:
+		p = Particle(
+			particle_id=len(particles),
+			m=mass,
+			r=radius,
+			x=L*rng.sample()/rng.modulus,
+			y=L*rng.sample()/rng.modulus,
+			vx=vmax*(2*rng.sample() - 1)/rng.modulus,
+			vy=vmax*(2*rng.sample() - 1)/rng.modulus)
+		if reject_overlaps and any(p.check_overlap(p1) for p1 in particles):
+			continue
+		particles.append(p)
+	return particles
+
+# advance every particle by one timestep and resolve collisions: the body of animate() in the lecture scripts
+# boundary is "periodic" (collisions1.py), "reflective" (collision2.py) or "thermal" (collision3.py)
+# thermal walls also need the wall temperature T_wall and a normal sampler gauss(mean, sigma)
+def step(particles, fx, fy, dt, L, boundary="periodic", T_wall=None, gauss=None):
+	if boundary == "periodic":
+		advance = lambda p: p.euler_periodic(fx, fy, dt, L)
+	elif boundary == "reflective":
+		advance = lambda p: p.euler_reflective(fx, fy, dt, L)
+	elif boundary == "thermal":
+		advance = lambda p: p.euler_thermal(fx, fy, dt, L, T_wall, gauss)
+	else:
+		raise ValueError(f"unknown boundary {boundary!r}, choose from: {', '.join(BOUNDARIES)}")
+
+	for p in particles:
+		# advance particle
+		advance(p)
+		for p1 in particles:
+			# skip this particle itself
+			if p1.id != p.id:
+				if p.check_overlap(p1):
+					# change both particles' velocities according to conservation of linear momentum
+					p.change_velocities(p1)
+
+STEPS = 100
+DEFAULTS = {
+	"boundary": "periodic", "N_particles": 20, "L": 10.0, "mass": 0.01, "radius": 0.1, "vmax": 5.0,
+	"fx": 0.0, "fy": 0.0, "dt": 0.01, "T_wall": 300.0, "record_every": 1, "reject_overlaps": False,
+}
+
+# run the gas for <steps> timesteps, recording positions and total kinetic energy every <record_every> steps
+# seed seeds the generator (physsim.sims.rng()), which is split into two streams: the first places the particles, exactly
+# as the unsplit generator would, and the second gives the normal numbers of the thermal walls
+def run(steps=STEPS, seed=None, **params):
+	params = parameters(DEFAULTS, params)
+	L, dt = params["L"], params["dt"]
+	placement, walls = rng(seed).split(2)
+	particles = place_particles(placement, params["N_particles"], L, params["mass"], params["radius"], params["vmax"],
+		params["reject_overlaps"])
+	gauss = walls.gauss
+
+	t, x, y, energy = [], [], [], []
+	def record(i):
+		t.append(i*dt)
+		x.append([p.x for p in particles])
+		y.append([p.y for p in particles])
+		energy.append(sum(0.5*p.m*(p.vx**2 + p.vy**2) for p in particles))
+
+	record(0)
+	for i in range(1, steps + 1):
+		step(particles, params["fx"], params["fy"], dt, L, params["boundary"], params["T_wall"], gauss)
+		if i % params["record_every"] == 0:
+			record(i)
+
+	return {
+		"t": t, "x": x, "y": y, "kinetic_energy": energy,
+		"vx": [p.vx for p in particles], "vy": [p.vy for p in particles],
+		"L": L, "radius": params["radius"],
+	}
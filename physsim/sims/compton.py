@@ -0,0 +1,95 @@
+# repeated compton scattering of photons within a semi-infinite homogeneous slab medium, from "Part 8 - Radiation"
+# the random number generator is passed in explicitly instead of being a module-level global
+
+import math
+
+from physsim.sims import parameters, rng
+
+e_rest_energy = 511.0 # keV: rest mass energy of electron
+
+def sample_scatter_angle(rng):
+	# assume isotropic (equal probability of scatter in all directions)
+	# this is not physically accurate; see Klein-Nishina differential cross-sections
+	return rng.sample(-math.pi, math.pi) # 0 radians = incident angle
+
+def sample_distance(rng, mfp):
+	# distance traveled between scattering events in number of mfps
+	return -mfp * math.log(rng.sample(0, 1))
+
+def compton_energy(E_in, dtheta):
+	# energy of scattered photon emerging from a compton event
+	alpha = E_in / e_rest_energy # dimensionless ratio
+	denominator = 1.0 + alpha * (1.0 - math.cos(dtheta))
+	# avoid division by zero
+	if abs(denominator) < 1.0e-12:
+		return 0.0 # effectively a large energy loss
+	return E_in / denominator
+
+# simulate N_photons photon histories, the main loop of compton.py
+# @params:
+#   rng: random number generator with sample(low, high)
+#   E0: initial energy of photon (keV)
+#   E_min: threshold below which a photon is considered absorbed (keV)
+#   T: thickness of slab in number of mean free paths
+#   mfp: mean free path of photons in arbitrary length units
+#   num_scatters_cutoff: stop history if number of scattering events reaches this
+# returns the tally dictionary with keys BACK, TRANS, ABS and MAXSCAT
+def run_histories(N_photons, rng, E0=100, E_min=1.0, T=30.0, mfp=1.0, num_scatters_cutoff=1000):
+	results = {"BACK": 0, "TRANS": 0, "ABS": 0, "MAXSCAT": 0}
+
+	for i in range(N_photons):
+		x = 0.0 # position of photon
+		theta = 0.0 # initial incident angle of photon onto slab
+		E = E0 # photon energy
+
+		num_scatters = 0
+		while E > E_min and num_scatters < num_scatters_cutoff:
+			distance = sample_distance(rng, mfp)
+			x += distance * math.cos(theta) # may be negative if pi/2 < theta < 3pi/2
+			dtheta = sample_scatter_angle(rng)
+			theta += dtheta
+			if x < 0.0:
+				# back-scattered through anterior wall
+				results["BACK"] += 1
+				break
+			elif x > T:
+				# transmitted through posterior wall
+				results["TRANS"] += 1
+				break
+			else:
+				# scattered in medium
+				num_scatters += 1
+				if num_scatters > results["MAXSCAT"]:
+					results["MAXSCAT"] = num_scatters
+				# energy of new photon
+				E = compton_energy(E, dtheta)
+				if E <= E_min:
+					results["ABS"] += 1
+					break
+
+	return results
+
+# the histories of one worker, drawing from its own stream of the generator (one of rng(seed).split(K))
+def run_stream(stream, N_photons, params):
+	return run_histories(N_photons, stream, **params)
+
+STEPS = 10000 # number of photon histories
+DEFAULTS = {"E0": 100.0, "E_min": 1.0, "T": 30.0, "mfp": 1.0, "num_scatters_cutoff": 1000, "workers": None}
+
+# compton.py: tally of absorbed, back-scattered and transmitted photons out of <steps> histories
+# with workers=K the histories are shared out between K processes, each with its own non-overlapping stream of the
+# generator's sequence, so the tally depends on the seed and K but not on how the processes are scheduled
+def run(steps=STEPS, seed=None, **params):
+	params = parameters(DEFAULTS, params)
+	workers = params.pop("workers")
+	if workers is None:
+		results = run_histories(steps, rng(seed), **params)
+	else:
+		from concurrent.futures import ProcessPoolExecutor
+		counts = [steps // workers + (i < steps % workers) for i in range(workers)]
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			tallies = list(pool.map(run_stream, rng(seed).split(workers), counts, [params]*workers))
+		results = {key: sum(tally[key] for tally in tallies) for key in ("BACK", "TRANS", "ABS")}
+		results["MAXSCAT"] = max(tally["MAXSCAT"] for tally in tallies)
+	results["N_photons"] = steps
+	return results
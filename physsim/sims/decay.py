@@ -0,0 +1,68 @@
+# radioactive decay with Euler's method, from numerical_differentiation3.py
+# dN/dt = -lambda * N(t), where lambda is the decay constant, lambda = ln(2)/t_half
+
+import math
+
+from physsim.sims import parameters, rng
+
+# Euler's method estimates the next point in a curve from the local first derivative
+def euler(y0, dydx, dx):
+	return y0 + dydx*dx
+
+STEPS = 50
+DEFAULTS = {"N0": 500, "t_half": 1.0, "dt": 0.1, "method": "euler"}
+
+# integrate the decay of N0 atoms for <steps> timesteps of length dt
+# method is "euler" (the lecture's loop), or "rk4" or "rk45" from physsim.integrators
+# the exact solution N0*exp(-lambda*t) is returned alongside for comparison
+def run(steps=STEPS, seed=None, **params):
+	params = parameters(DEFAULTS, params)
+	N0, dt = params["N0"], params["dt"]
+	decay_const = math.log(2) / params["t_half"]
+
+	times = [i*dt for i in range(steps)]
+	if params["method"] == "euler":
+		N = []
+		N_t = N0
+		for t in times:
+			N_t = euler(N_t, -decay_const*N_t, dt)
+			N.append(N_t)
+	else:
+		from physsim import integrators
+		f = lambda t, N: -decay_const*N
+		# the solution after each step, at times dt, 2*dt, ..., steps*dt
+		t_steps = [i*dt for i in range(steps + 1)]
+		if params["method"] == "rk45":
+			N = integrators.dopri45(f, (0, t_steps[-1]), N0, t_eval=t_steps[1:]).y_eval.tolist()
+		else:
+			N = integrators.integrate(f, t_steps, N0, params["method"])[1:].tolist()
+
+	return {
+		"t": times,
+		"N": N,
+		"N_exact": [N0*math.exp(-decay_const*(t + dt)) for t in times],
+	}
+
+CHAIN_STEPS = 100 # number of recorded times
+CHAIN_DEFAULTS = {"half_lives": (1.0, 2.0, 0.5, None), "N0": 10**6, "t_end": 10.0, "method": "exact", "runs": 1}
+
+# a linear decay chain starting with N0 atoms of the first member, recorded at <steps> times up to t_end
+# half_lives lists the members, None for a stable member; method is "exact" (matrix exponential),
+# "tau" (tau-leaping, <runs> samples) or "gillespie" (one exact stochastic sample)
+def run_chain(steps=CHAIN_STEPS, seed=None, **params):
+	params = parameters(CHAIN_DEFAULTS, params)
+	import numpy as np
+	from physsim import decay_chains
+
+	chain = decay_chains.DecayChain(half_lives=[math.inf if t_half is None else t_half for t_half in params["half_lives"]])
+	t = np.linspace(0, params["t_end"], steps)
+	N0 = [params["N0"]] + [0]*(len(chain) - 1)
+	if params["method"] == "exact":
+		N = chain.solve(N0, t)
+	elif params["method"] == "tau":
+		N = decay_chains.tau_leap(chain, N0, t, runs=params["runs"], rng=rng(seed))
+	elif params["method"] == "gillespie":
+		N = decay_chains.gillespie(chain, N0, t, rng=rng(seed))
+	else:
+		raise ValueError(f"unknown method {params['method']!r}, choose from: exact, tau, gillespie")
+	return {"t": t, "N": N, "N_exact": chain.solve(N0, t)}
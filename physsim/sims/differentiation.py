@@ -0,0 +1,51 @@
+# finite difference methods from "Part 2 - Numerical Differentiation"
+
+from physsim.sims import parameters
+
+# finite difference method - forward difference
+# @params:
+#   func: a continuous function of one variable x
+#   a: the value of x at which to compute the derivative
+#   dx: the magnitude of finite difference over which the change in the function is calculated
+def forward_fd(func, a, dx):
+	dy = func(a + dx) - func(a)
+	return dy / dx
+
+# finite difference method - backward difference (same parameters as forward_fd)
+def backward_fd(func, a, dx):
+	dy = func(a) - func(a - dx)
+	return dy / dx
+
+# finite difference method - central difference (same parameters as forward_fd)
+def central_fd(func, a, dx):
+	dy = func(a + dx) - func(a - dx)
+	return dy / (2*dx)
+
+METHODS = {"forward": forward_fd, "backward": backward_fd, "central": central_fd}
+
+# the convergence sweep of numerical_differentiation1.py: the derivative at every point in x, once for every dx
+# @params:
+#   func: a continuous function of one variable x
+#   x: the points at which to compute the derivative
+#   dxs: the finite differences to sweep over
+#   method: "forward", "backward", or "central"
+# returns one list of derivatives per dx
+def fd_sweep(func, x, dxs, method="forward"):
+	fd = METHODS[method]
+	return [[fd(func, a, dx) for a in x] for dx in dxs]
+
+STEPS = 1000 # number of points
+DEFAULTS = {"func": "sin", "method": "forward", "order": None, "spacing": 0.01, "dxs": (1.0, 0.5, 0.1, 0.05)}
+
+# numerical_differentiation1.py: derivative of a numpy function at <steps> points spaced <spacing> apart, for every dx
+# the whole (points x dx) sweep is one call of physsim.derivatives.derivative()
+def run(steps=STEPS, seed=None, **params):
+	params = parameters(DEFAULTS, params)
+	import numpy as np
+	from physsim.derivatives import derivative
+
+	func = getattr(np, params["func"])
+	x = np.arange(steps)*params["spacing"]
+	dxs = np.asarray(params["dxs"], dtype=float)
+	dydx = derivative(func, x, dxs, params["method"], params["order"])
+	return {"x": x, "y": func(x), "dx": dxs, "dydx": dydx.T}
@@ -0,0 +1,174 @@
+# equations of motion from "Part 3 - Kinematics", without the plots
+#
+# linear drag Fd = -k*v opposes the velocity, with k = m*g/vt for terminal velocity vt
+# (for a falling object this is the same force as gforce + dragforce(abs(v)) in kinematics2.py)
+
+import math
+
+from physsim.sims import parameters
+
+# a particle moving vertically, as in kinematics1.py and kinematics2.py
+class Particle:
+	def __init__(self, m, y, v):
+		self.m = m # mass
+		self.y = y # position
+		self.v = v # speed
+
+	# solve equations of motion after a time interval dt
+	def euler(self, force, dt):
+		self.v = self.v + (force/self.m)*dt
+		self.y = self.y + self.v*dt
+
+# a particle moving in the x-y plane, as in kinematics3.py
+class Projectile:
+	def __init__(self, m, x, y, vx, vy):
+		self.m = m # mass
+		self.x = x # x-component of position
+		self.y = y # y-component of position
+		self.vx = vx # x-component of speed
+		self.vy = vy # y-component of speed
+
+	# solve equations of motion after a time interval dt
+	def euler(self, fx, fy, dt):
+		self.vx = self.vx + (fx/self.m)*dt
+		self.vy = self.vy + (fy/self.m)*dt
+		self.x = self.x + self.vx*dt
+		self.y = self.y + self.vy*dt
+
+# a particle moving along x in a periodic window of length L, as in kinematics4_PBC.py
+class PeriodicParticle:
+	def __init__(self, m, x, y, v):
+		self.m = m # mass
+		self.x = x # position
+		self.y = y # position
+		self.v = v # speed (only in x-direction)
+
+	# solve equations of motion after a time interval dt
+	def euler(self, force, dt, L):
+		self.v = self.v + (force/self.m)*dt
+		self.x = (self.x + self.v*dt) % L
+
+# drag coefficient k for terminal velocity vt, or 0 for no drag
+def drag_coefficient(mass, g, vt):
+	return 0.0 if vt is None else mass*g/vt
+
+FREEFALL_STEPS = 100000 # upper limit, the loop stops when the particle reaches the ground
+FREEFALL_DEFAULTS = {"mass": 0.01, "g": 9.8, "y0": 100.0, "v0": 0.0, "dt": 0.5, "vt": None, "events": False}
+
+# kinematics1.py (vt=None) and kinematics2.py (vt=30): fall from y0 until y <= 0 or <steps> timesteps have passed
+# with events=True the last step is cut short so the trajectory ends exactly at y = 0, see physsim.events
+def run_freefall(steps=FREEFALL_STEPS, seed=None, **params):
+	params = parameters(FREEFALL_DEFAULTS, params)
+	mass, dt = params["mass"], params["dt"]
+	gforce = -params["g"]*mass
+	k = drag_coefficient(mass, params["g"], params["vt"])
+
+	p = Particle(m=mass, y=params["y0"], v=params["v0"])
+	if params["events"]:
+		from physsim import events
+		t, y, v = [], [], []
+		def record(time, p):
+			t.append(time)
+			y.append(p.y)
+			v.append(p.v)
+		ground = events.Event(lambda p: p.y, direction=-1, name="impact")
+		events.integrate(p, lambda p, dt: p.euler(gforce - k*p.v, dt), dt, [ground], max_steps=steps, record=record)
+		return {"t": t, "y": y, "v": v}
+
+	t, y, v = [0.0], [p.y], [p.v]
+	while p.y > 0 and len(t) <= steps:
+		p.euler(gforce - k*p.v, dt)
+		t.append(t[-1] + dt)
+		y.append(p.y)
+		v.append(p.v)
+	return {"t": t, "y": y, "v": v}
+
+PROJECTILE_STEPS = 100000 # upper limit per launch angle
+PROJECTILE_DEFAULTS = {"mass": 0.01, "g": 9.8, "x0": 0.01, "y0": 0.01, "v0": 15.0, "dt": 0.1, "vt": 30.0, "theta0s": (43, 44, 45, 46, 47),
+	"events": False}
+
+# kinematics3.py: one trajectory per launch angle (degrees), each until y <= 0 or <steps> timesteps have passed
+# the trajectories are stored one after another; trajectory i is x[start[i]:start[i+1]]
+# with events=True every trajectory ends exactly at y = 0, and the flight time, range and apex (vy = 0) of every
+# launch angle are located inside their timesteps, see physsim.events
+def run_projectile(steps=PROJECTILE_STEPS, seed=None, **params):
+	params = parameters(PROJECTILE_DEFAULTS, params)
+	mass, dt = params["mass"], params["dt"]
+	gforce = -params["g"]*mass
+	k = drag_coefficient(mass, params["g"], params["vt"])
+	step = lambda p, dt: p.euler(-k*p.vx, gforce - k*p.vy, dt)
+
+	x, y, start = [], [], []
+	flight_time, ranges, apex = [], [], []
+	for theta0 in params["theta0s"]:
+		start.append(len(x))
+		vx0 = params["v0"] * math.cos(theta0*math.pi/180) # m/s
+		vy0 = params["v0"] * math.sin(theta0*math.pi/180) # m/s
+		p = Projectile(m=mass, x=params["x0"], y=params["y0"], vx=vx0, vy=vy0)
+		if params["events"]:
+			from physsim import events
+			def record(t, p):
+				x.append(p.x)
+				y.append(p.y)
+			ground = events.Event(lambda p: p.y, direction=-1, name="impact")
+			top = events.Event(lambda p: p.vy, direction=-1, terminal=False, name="apex")
+			t, hits = events.integrate(p, step, dt, [ground, top], max_steps=steps, record=record)
+			hits = {name: state for name, _, state in hits}
+			flight_time.append(t)
+			ranges.append(p.x)
+			apex.append(hits["apex"]["y"] if "apex" in hits else max(y[start[-1]:]))
+			continue
+		x.append(p.x)
+		y.append(p.y)
+		n = 0
+		while p.y > 0 and n < steps:
+			step(p, dt)
+			x.append(p.x)
+			y.append(p.y)
+			n += 1
+	start.append(len(x))
+	result = {"theta0": list(params["theta0s"]), "x": x, "y": y, "start": start}
+	if params["events"]:
+		result.update({"flight_time": flight_time, "range": ranges, "apex": apex})
+	return result
+
+SWEEP_STEPS = 100000 # upper limit, the batch stops when every projectile has landed
+SWEEP_DEFAULTS = {"mass": 0.01, "g": 9.8, "x0": 0.01, "y0": 0.01, "dt": 0.01, "vt": 30.0,
+	"theta_min": 5.0, "theta_max": 85.0, "n_theta": 161, "v0s": (5.0, 10.0, 15.0, 20.0, 25.0)}
+
+# kinematics3.py for a grid of launch angles and speeds, advanced together by physsim.projectiles.ParticleBatch
+# returns the range, apex and flight time of every (speed, angle) pair
+def run_projectile_sweep(steps=SWEEP_STEPS, seed=None, **params):
+	params = parameters(SWEEP_DEFAULTS, params)
+	import numpy as np
+	from physsim.projectiles import ParticleBatch
+	theta0 = np.linspace(params["theta_min"], params["theta_max"], params["n_theta"])
+	v0 = np.array(params["v0s"], dtype=float)
+	batch = ParticleBatch.launch(theta0, v0[:, None], params["vt"], params["mass"], params["g"], params["x0"], params["y0"])
+	batch.run(params["g"], params["dt"], max_steps=steps)
+	results = batch.results()
+	return {
+		"theta0": theta0.tolist(),
+		"v0": v0.tolist(),
+		"range": results["range"].tolist(),
+		"apex": results["apex"].tolist(),
+		"flight_time": results["flight_time"].tolist(),
+	}
+
+PBC_STEPS = 100
+PBC_DEFAULTS = {"L": 4.0, "mass": 0.01, "dt": 0.1, "F0": 0.0, "speeds": (0.5, -0.5, 1.5)}
+
+# kinematics4_PBC.py: particles starting at x = L/3 in rows y = N, N-1, ..., 1, each with its own speed
+def run_pbc(steps=PBC_STEPS, seed=None, **params):
+	params = parameters(PBC_DEFAULTS, params)
+	L, dt = params["L"], params["dt"]
+	speeds = params["speeds"]
+	particles = [PeriodicParticle(m=params["mass"], x=L/3, y=len(speeds) - i, v=v) for i, v in enumerate(speeds)]
+
+	t, x = [], []
+	for i in range(steps):
+		for p in particles:
+			p.euler(params["F0"], dt, L)
+		t.append((i + 1)*dt)
+		x.append([p.x for p in particles])
+	return {"t": t, "x": x, "y": [p.y for p in particles], "L": L}
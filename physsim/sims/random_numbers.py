@@ -0,0 +1,104 @@
+# random number examples from "Part 4 - Random Numbers", without the plots
+# the normal generator of normal.py is loaded from the lecture folder; the uniform numbers come from physsim.sims.rng(),
+# which is the MCG of rng.py unless another backend is configured (run_mcg always uses the MCG)
+
+import math
+
+import numpy as np
+
+from physsim import lectures
+from physsim.sims import mcg, parameters, rng
+
+# counts of samples in <bins> equal bins between low and high
+def histogram(samples, bins, low, high):
+	counts = [0]*bins
+	width = (high - low) / bins
+	for R in samples:
+		i = int((R - low) / width)
+		if 0 <= i < bins:
+			counts[i] += 1
+	return counts
+
+MCG_STEPS = 10000
+MCG_DEFAULTS = {"bins": 20}
+
+# rng.py: <steps> uniform numbers between 0 and 1 and their histogram, which should be flat
+def run_mcg(steps=MCG_STEPS, seed=None, **params):
+	params = parameters(MCG_DEFAULTS, params)
+	samples = mcg(seed).sampleN(steps, 0, 1)
+	return {"samples": samples, "counts": histogram(samples, params["bins"], 0, 1)}
+
+EXPONENTIAL_STEPS = 1000
+EXPONENTIAL_DEFAULTS = {"mu": 1.0, "method": "inverse"}
+
+# sampling.py: exponential numbers from the inverse of the CDF, x = -mu*log(1 - R) (method="inverse"), or from the
+# tabulated inverse CDF of physsim.rng.sampling (method="table"), which works the same way for any PDF
+def run_exponential(steps=EXPONENTIAL_STEPS, seed=None, **params):
+	params = parameters(EXPONENTIAL_DEFAULTS, params)
+	mu = params["mu"]
+	if params["method"] == "inverse":
+		samples = [-mu*math.log(1 - R) for R in rng(seed).sampleN(steps, 0, 1)]
+	elif params["method"] == "table":
+		from physsim.rng import sampling
+		# the PDF of x = -mu*log(1 - R), cut off where it has fallen to exp(-40)
+		table = sampling.continuous(lambda x: np.exp(-x/mu)/mu, 0, 40*mu, key=("exponential", mu))
+		samples = table.sample(rng(seed), steps)
+	else:
+		raise ValueError(f"unknown method {params['method']!r}, choose from: 'inverse', 'table'")
+	return {"samples": samples, "mean": sum(samples)/steps}
+
+NORMAL_STEPS = 100000
+NORMAL_DEFAULTS = {"mean": 0.0, "std": 1.0, "method": "polar"}
+
+# normal.py: Gaussian numbers from the polar Box-Muller method (method="polar") or the Ziggurat (method="ziggurat")
+def run_normal(steps=NORMAL_STEPS, seed=None, **params):
+	params = parameters(NORMAL_DEFAULTS, params)
+	nrm = lectures.load(4, "normal").Normal(params["mean"], params["std"], params["method"])
+	nrm.rng = rng(seed)
+	return {"samples": nrm.sampleN(steps)}
+
+MCPI_STEPS = 100000
+MCPI_DEFAULTS = {"r": 1.0, "keep_points": 10000, "tol": None, "batch_size": 2**16, "method": "mc"}
+
+# integration.py: estimate pi from the fraction of random points in a box of side 2r that land in the circle of radius r
+# the points are drawn and counted in batches by physsim.montecarlo, so <steps> can be far larger than memory; with a
+# tolerance tol on the standard error of pi, the run stops as soon as it is reached (steps is then the upper limit)
+# keep_points is the number of points kept for the plot (True: all of them, False: none); method is a method of
+# physsim.montecarlo other than importance, e.g. "sobol" for quasi-random points
+def run_mcpi(steps=MCPI_STEPS, seed=None, **params):
+	from physsim import montecarlo
+	params = parameters(MCPI_DEFAULTS, params)
+	r = params["r"]
+	keep = steps if params["keep_points"] is True else int(params["keep_points"])
+	hit = lambda p: (np.hypot(r - p[:, 0], r - p[:, 1]) < r).astype(float)
+	# area of the circle = pi*r^2, so pi is the integral of hit() over the box divided by r^2
+	tol = params["tol"]*r*r if params["tol"] is not None else None
+	estimate = montecarlo.integrate(hit, [0, 0], [2*r, 2*r], tol=tol, method=params["method"],
+		batch_size=params["batch_size"], max_evaluations=steps, rng=rng(seed), keep_points=keep)
+	points = estimate.points if estimate.points is not None else np.empty((0, 2))
+	inside = estimate.values > 0 if estimate.values is not None else np.empty(0, dtype=bool)
+	return {
+		"pi": estimate.value/(r*r), "error": estimate.error/(r*r), "evaluations": estimate.evaluations,
+		"x": points[:, 0], "y": points[:, 1], "inside": inside,
+	}
+
+BROWNIAN_STEPS = 1000
+BROWNIAN_DEFAULTS = {"walkers": 10000, "dims": 2, "step": 1.0, "boundary": None, "L": 100.0, "barrier": None,
+	"histograms": 3, "bins": 50}
+
+# brownian.py: an ensemble of random walkers; the MSD of every step, <histograms> histograms of the displacements at
+# evenly spaced times, and the first-passage times to distance <barrier> (if given) are measured during the walk
+def run_brownian(steps=BROWNIAN_STEPS, seed=None, **params):
+	params = parameters(BROWNIAN_DEFAULTS, params)
+	snapshots = params["histograms"]
+	histogram_at = [steps*(i + 1)//snapshots for i in range(snapshots)] if snapshots else []
+	walk = lectures.load(4, "brownian").RandomWalk(params["walkers"], params["dims"], params["step"], params["boundary"],
+		params["L"], params["barrier"], histogram_at=histogram_at, bins=params["bins"], rng=rng(seed))
+	walk.run(steps)
+	return {
+		"t": walk.times, "msd": walk.msd, "D": walk.diffusion_constant, "dims": walk.dims,
+		"histogram_t": [t for t, _, _ in walk.histograms],
+		"histogram_counts": [counts for _, counts, _ in walk.histograms],
+		"histogram_edges": [edges for _, _, edges in walk.histograms],
+		"first_passage": walk.first_passage_times() if params["barrier"] is not None else [],
+	}
@@ -0,0 +1,63 @@
+# waves on a string from "Part 7 - Oscillations", without the animation
+
+import numpy as np
+
+from physsim.sims import parameters
+
+# initial state of a string of length L with N points, plucked into a sum of harmonic modes
+# returns the positions x and the current and previous displacements
+def initial_state(N=100, L=1.0, harmonic_modes=(2,)):
+	x = np.linspace(0, L, N) # N elements spaced dx apart
+	u_curr = sum([np.sin(n * np.pi * x / L) for n in harmonic_modes])
+	u_prev = np.zeros(N)
+	return x, u_curr, u_prev
+
+# one timestep of the wave equation, exactly as update() in waves1.py and waves2.py: a python loop over the points
+# returns the new (u_curr, u_prev) pair
+def update_loop(u_curr, u_prev, c, dt, dx):
+	N = len(u_curr)
+	u_next = np.zeros(N)
+
+	for i in range(1, N - 1):
+		# apply wave equation to each point on string
+		u_next[i] = (
+			2.0 * u_curr[i]
+			- u_prev[i]
+			+ (c * dt / dx)**2 * (u_curr[i+1] - 2.0*u_curr[i] + u_curr[i-1]))
+
+	# enforce fixed boundary conditions
+	u_next[0] = 0.0
+	u_next[-1] = 0.0
+
+	return u_next, u_curr
+
+# the same timestep with numpy slices instead of the python loop
+# every interior point is updated in one operation, with the same arithmetic as update_loop()
+def update(u_curr, u_prev, c, dt, dx):
+	u_next = np.zeros_like(u_curr)
+	u_next[1:-1] = (
+		2.0 * u_curr[1:-1]
+		- u_prev[1:-1]
+		+ (c * dt / dx)**2 * (u_curr[2:] - 2.0*u_curr[1:-1] + u_curr[:-2]))
+	return u_next, u_curr
+
+STEPS = int(1.0 / 0.009) # tsim / dt in the lecture
+DEFAULTS = {"N": 100, "L": 1.0, "c": 1.0, "dt": 0.009, "harmonic_modes": (2,), "record_every": 1}
+
+# waves1.py (one mode) and waves2.py (harmonic_modes=(1, 2, 3, 4)): displacement of the string every <record_every> steps
+def run(steps=STEPS, seed=None, **params):
+	params = parameters(DEFAULTS, params)
+	N, L, c, dt = params["N"], params["L"], params["c"], params["dt"]
+	dx = L / (N - 1)
+	if c * dt / dx > 1:
+		# Courant-Friedrichs-Lewy condition, see waves1.py
+		raise ValueError(f"unstable: c*dt/dx = {c*dt/dx:.3f} > 1")
+	x, u_curr, u_prev = initial_state(N, L, params["harmonic_modes"])
+
+	t, u = [0.0], [u_curr]
+	for i in range(1, steps + 1):
+		u_curr, u_prev = update(u_curr, u_prev, c, dt, dx)
+		if i % params["record_every"] == 0:
+			t.append(i*dt)
+			u.append(u_curr)
+	return {"x": x, "t": np.array(t), "u": np.array(u)}
@@ -0,0 +1,116 @@
+# streaming derivatives of sampled trajectories that are too large to load at once
+#
+# recorded data like freefall_data.csv (columns t,y) is read in blocks of rows, and velocity and acceleration are
+# computed block by block with 3-point stencils that allow uneven spacing in t
+# a stencil at the first row of a block needs the last rows of the previous block, so the last rows of every block
+# are carried over ("halo") and the result is exactly the same as differentiating the whole file at once
+# only one block is in memory at any time, however long the trajectory is
+#
+#   for t, y, v, a in stream_derivatives(read_csv_blocks("freefall_data.csv")):
+#       ...
+#   write_derivatives("freefall_data.csv", "freefall_derivatives.csv")
+
+from itertools import islice
+
+import numpy as np
+
+# read a CSV file with a header line in blocks of <block_size> rows
+# yields (t, y) pairs of numpy arrays taken from the given columns; y has several columns if y_columns is a list
+def read_csv_blocks(filename, block_size=100000, t_column=0, y_columns=1, delimiter=","):
+	with open(filename, "r") as f:
+		f.readline() # header
+		while True:
+			lines = list(islice(f, block_size))
+			if not lines:
+				break
+			data = np.loadtxt(lines, delimiter=delimiter, ndmin=2)
+			yield data[:, t_column], data[:, y_columns]
+
+# coefficients broadcast against y, which may have extra columns
+def column(c, y):
+	return c.reshape(c.shape + (1,)*(y.ndim - 1))
+
+# first and second derivatives at the interior points 1..n-2, from each point's two neighbours
+# with h1 = t[i] - t[i-1] and h2 = t[i+1] - t[i], the parabola through the three points gives
+#   y'[i]  = (-h2/(h1(h1+h2))) y[i-1] + ((h2-h1)/(h1 h2)) y[i] + (h1/(h2(h1+h2))) y[i+1]
+#   y''[i] = 2 ( y[i-1]/(h1(h1+h2)) - y[i]/(h1 h2) + y[i+1]/(h2(h1+h2)) )
+# which reduce to the central differences of numerical_differentiation2.py for even spacing
+def interior(t, y):
+	h1 = column(t[1:-1] - t[:-2], y)
+	h2 = column(t[2:] - t[1:-1], y)
+	ym, y0, yp = y[:-2], y[1:-1], y[2:]
+	v = -h2/(h1*(h1 + h2))*ym + (h2 - h1)/(h1*h2)*y0 + h1/(h2*(h1 + h2))*yp
+	a = 2*(ym/(h1*(h1 + h2)) - y0/(h1*h2) + yp/(h2*(h1 + h2)))
+	return v, a
+
+# derivatives at the first of three points (one-sided, second-order accurate)
+def left_edge(t, y):
+	h1, h2 = t[1] - t[0], t[2] - t[1]
+	v = -(2*h1 + h2)/(h1*(h1 + h2))*y[0] + (h1 + h2)/(h1*h2)*y[1] - h1/(h2*(h1 + h2))*y[2]
+	a = 2*(y[0]/(h1*(h1 + h2)) - y[1]/(h1*h2) + y[2]/(h2*(h1 + h2)))
+	return v, a
+
+# derivatives at the last of three points (one-sided, second-order accurate)
+def right_edge(t, y):
+	h1, h2 = t[1] - t[0], t[2] - t[1]
+	v = h2/(h1*(h1 + h2))*y[0] - (h1 + h2)/(h1*h2)*y[1] + (h1 + 2*h2)/(h2*(h1 + h2))*y[2]
+	a = 2*(y[0]/(h1*(h1 + h2)) - y[1]/(h1*h2) + y[2]/(h2*(h1 + h2)))
+	return v, a
+
+# velocity and acceleration of a trajectory that arrives as blocks of (t, y) arrays
+# yields (t, y, v, a) blocks, which together hold every row exactly once and in order
+def stream_derivatives(blocks):
+	t_buffer = np.empty(0)
+	y_buffer = None
+	head = True # the first rows haven't been written yet
+	for t_block, y_block in blocks:
+		t_block = np.asarray(t_block, dtype=float)
+		y_block = np.asarray(y_block, dtype=float)
+		t_buffer = np.concatenate([t_buffer, t_block])
+		y_buffer = y_block if y_buffer is None else np.concatenate([y_buffer, y_block])
+		if len(t_buffer) < 3:
+			# not enough rows for a stencil yet
+			continue
+
+		v, a = interior(t_buffer, y_buffer)
+		n = len(t_buffer)
+		if head:
+			# rows 0..n-2: the first one from the one-sided stencil, the others from their neighbours
+			v0, a0 = left_edge(t_buffer[:3], y_buffer[:3])
+			yield t_buffer[:-1], y_buffer[:-1], np.concatenate([[v0], v]), np.concatenate([[a0], a])
+			head = False
+		elif n > 3:
+			# the buffer starts with the 2 halo rows that were already written, then the last row of the previous block
+			yield t_buffer[2:-1], y_buffer[2:-1], v[1:], a[1:]
+
+		# keep the last 3 rows: the last row still needs its right neighbour, and the last 3 rows are
+		# needed for the one-sided stencil if the data ends here
+		t_buffer = t_buffer[-3:]
+		y_buffer = y_buffer[-3:]
+
+	if head:
+		raise ValueError("at least 3 rows are needed to compute derivatives")
+	v, a = right_edge(t_buffer, y_buffer)
+	yield t_buffer[-1:], y_buffer[-1:], np.array([v]), np.array([a])
+
+# stream the derivatives of a CSV file into another CSV file with columns t,y,v,a
+# returns the number of rows written
+def write_derivatives(in_filename, out_filename, block_size=100000, t_column=0, y_column=1, delimiter=","):
+	rows = 0
+	with open(out_filename, "w") as f:
+		f.write("t,y,v,a\n")
+		blocks = read_csv_blocks(in_filename, block_size, t_column, y_column, delimiter)
+		for t, y, v, a in stream_derivatives(blocks):
+			np.savetxt(f, np.column_stack([t, y, v, a]), delimiter=",", fmt="%.17g")
+			rows += len(t)
+	return rows
+
+if __name__ == '__main__':
+	import argparse
+	parser = argparse.ArgumentParser(prog="python -m physsim.streaming", description="stream velocity and acceleration columns of a t,y CSV file")
+	parser.add_argument("input")
+	parser.add_argument("output")
+	parser.add_argument("--block-size", type=int, default=100000, help="rows per block")
+	args = parser.parse_args()
+	rows = write_derivatives(args.input, args.output, args.block_size)
+	print(f"wrote {rows} rows to {args.output}")
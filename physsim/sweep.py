@@ -0,0 +1,171 @@
+# parameter sweeps of the simulations in physsim.sims, with every result cached on disk
+#
+# every point of a sweep is one call of a simulation's run() with one set of parameters; the points are handed out to a
+# pool of processes, and each result is saved in the cache directory under a hash of
+#   the simulation name, its parameters, steps and seed, the random number settings of physsim.rng (backend and normal
+#   method), and the source code of the physsim package and the lectures
+# so a point that was computed before (by this sweep or any other) is loaded instead of recomputed, a change to any code
+# a simulation can run gives new hashes, and a sweep that was interrupted starts again where it stopped
+#
+#   points = grid(vt=[10, 30, 100], dt=[0.1, 0.01], mass=[0.01])
+#   for params, result in sweep("freefall", points, workers=4):
+#       print(params, result["t"][-1])
+#
+#   python -m physsim.sweep freefall -g "vt=[10, 30, 100]" -g "dt=[0.1, 0.01]" --workers 4
+
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from physsim import sims
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# at the root of the repository, like the tables of physsim.rng.sampling, so a sweep finds its results from any directory
+CACHE_DIR = os.path.join(os.path.dirname(PACKAGE_DIR), ".physsim_cache", "sweeps")
+
+# every combination of the values of the axes, e.g. grid(vt=[10, 30], dt=[0.1, 0.01]) gives 4 parameter dictionaries
+def grid(**axes):
+	names = list(axes)
+	return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+# hash of the source code every simulation can run: all python files of the physsim package and of the lecture folders
+# the module of a simulation is not enough, since the physics is spread over shared modules (physsim.projectiles,
+# physsim.events, physsim.rng, ...) and lecture modules that are only loaded when the simulation runs (normal.py)
+def source_hash():
+	from physsim import lectures
+	digest = hashlib.sha256()
+	base = os.path.dirname(PACKAGE_DIR)
+	for root in (PACKAGE_DIR, lectures.ROOT):
+		files = []
+		for folder, subfolders, names in os.walk(root):
+			subfolders[:] = [subfolder for subfolder in subfolders if subfolder != "__pycache__"]
+			files += [os.path.join(folder, filename) for filename in names if filename.endswith(".py")]
+		for path in sorted(files):
+			# the path is hashed too, so moving code between files changes the hash
+			digest.update(os.path.relpath(path, base).replace(os.sep, "/").encode() + b"\0")
+			with open(path, "rb") as f:
+				digest.update(f.read() + b"\0")
+	return digest.hexdigest()
+
+# the global random number settings the simulations draw with: the backend of physsim.rng that PHYSSIM_RNG selects, and
+# the method its generators sample normal numbers with
+def rng_settings():
+	from physsim import rng
+	return {"backend": rng.backend_name(), "normal_method": rng.backend().normal_method}
+
+# make the random number settings of a worker process those of the sweep, in case they were changed in the sweep's
+# process after the worker started
+def apply_rng_settings(settings):
+	from physsim import rng
+	os.environ[rng.ENVIRONMENT_VARIABLE] = settings["backend"]
+	cls = rng.backend(settings["backend"])
+	if cls.normal_method != settings["normal_method"]:
+		cls.normal_method = settings["normal_method"]
+
+# cache key of one point: the parameters are written as sorted JSON, so their order doesn't matter
+def point_key(name, params, steps=None, seed=None, source=None, rng=None):
+	source = source if source is not None else source_hash()
+	rng = rng if rng is not None else rng_settings()
+	description = json.dumps({"sim": name, "params": params, "steps": steps, "seed": seed, "source": source, "rng": rng},
+		sort_keys=True)
+	return hashlib.sha256(description.encode()).hexdigest()
+
+def cache_path(cache_dir, name, key):
+	return os.path.join(cache_dir, name, key + ".npz")
+
+# run one point and save its result; runs in a worker process, so it only gets picklable arguments
+def compute(name, params, steps, seed, path, rng):
+	from physsim.__main__ import save
+	apply_rng_settings(rng)
+	run = sims.get(name)
+	kwargs = dict(params)
+	if steps is not None:
+		kwargs["steps"] = steps
+	result = run(seed=seed, **kwargs)
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	# save under a temporary name first, so an interrupted point never leaves a truncated file that looks finished
+	temporary = path + ".tmp.npz"
+	save(temporary, result, {"sim": name, "params": params, "steps": steps, "seed": seed, "rng": rng})
+	os.replace(temporary, path)
+	return path
+
+# a cached result as a dictionary of arrays (the same layout as python -m physsim run --out)
+def load(path):
+	with np.load(path) as archive:
+		return {key: archive[key] for key in archive.files if key != "settings"}
+
+# run simulation <name> at every parameter point, loading the points that are already in the cache
+# @params:
+#   name: simulation name from physsim.sims.SIMS
+#   points: list of parameter dictionaries, e.g. from grid()
+#   steps, seed: passed to run() for every point
+#   workers: number of processes (None = number of CPUs, 0 = run in this process)
+#   cache_dir: directory of the cached results
+#   progress: function progress(index, params, cached) called when a point is done
+# returns a list of (params, result) in the order of <points>
+def sweep(name, points, steps=None, seed=None, workers=None, cache_dir=CACHE_DIR, progress=None):
+	source = source_hash()
+	rng = rng_settings()
+	paths = [cache_path(cache_dir, name, point_key(name, params, steps, seed, source, rng)) for params in points]
+	missing = [i for i, path in enumerate(paths) if not os.path.exists(path)]
+	if progress is not None:
+		for i in sorted(set(range(len(points))) - set(missing)):
+			progress(i, points[i], True)
+
+	# the same parameters can appear twice in <points>, but are computed once
+	todo = {}
+	for i in missing:
+		todo.setdefault(paths[i], []).append(i)
+	if workers == 0:
+		for path, indices in todo.items():
+			compute(name, points[indices[0]], steps, seed, path, rng)
+			if progress is not None:
+				for i in indices:
+					progress(i, points[i], False)
+	elif todo:
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			futures = {pool.submit(compute, name, points[indices[0]], steps, seed, path, rng): indices for path, indices in todo.items()}
+			for future in as_completed(futures):
+				future.result()
+				if progress is not None:
+					for i in futures[future]:
+						progress(i, points[i], False)
+
+	return [(params, load(path)) for params, path in zip(points, paths)]
+
+if __name__ == '__main__':
+	import argparse
+	from physsim.__main__ import parse_param
+	parser = argparse.ArgumentParser(prog="python -m physsim.sweep", description="parameter sweep of a simulation with a result cache")
+	parser.add_argument("name", choices=sorted(sims.SIMS))
+	parser.add_argument("-g", "--grid", type=parse_param, action="append", default=[], metavar="KEY=[VALUES]", help="values of one parameter (repeatable)")
+	parser.add_argument("-p", "--param", type=parse_param, action="append", default=[], metavar="KEY=VALUE", help="fixed simulation parameter (repeatable)")
+	parser.add_argument("--steps", type=int, help="number of timesteps, samples or histories")
+	parser.add_argument("--seed", type=int, help="random seed")
+	parser.add_argument("--workers", type=int, help="number of processes (default: number of CPUs, 0: no pool)")
+	parser.add_argument("--cache-dir", default=CACHE_DIR, help="directory of the cached results")
+	args = parser.parse_args()
+
+	axes = {}
+	for key, values in args.grid:
+		if not isinstance(values, (list, tuple)):
+			parser.error(f"-g {key}: expected a list of values, got {values!r}")
+		axes[key] = values
+	points = [dict(args.param, **point) for point in grid(**axes)]
+
+	counts = {True: 0, False: 0}
+	def progress(i, params, cached):
+		counts[cached] += 1
+		print(f"[{counts[True] + counts[False]}/{len(points)}] {'cached  ' if cached else 'computed'} {params}")
+	try:
+		sweep(args.name, points, args.steps, args.seed, args.workers, args.cache_dir, progress)
+	except ValueError as error:
+		parser.error(f"{args.name}: {error}")
+	except KeyError as error:
+		# an unknown backend in PHYSSIM_RNG
+		parser.error(error.args[0])
+	print(f"{counts[True]} cached, {counts[False]} computed, results in {os.path.join(args.cache_dir, args.name)}")
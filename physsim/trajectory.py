@@ -0,0 +1,169 @@
+# binary trajectory files: buffered writing, memory-mapped reading, CSV export
+#
+# kinematics_io1.py formats every timestep into a line of text with f.write(f"{t},{y}\n"), and kinematics_io2.py reads the
+# file back with readlines(), split(",") and float() on every line, which is slow and loses nothing only by luck
+# here the timesteps are collected in a preallocated numpy chunk, and every full chunk is appended to a .npy file as raw
+# binary records with one named column per quantity; the .npy header at the start of the file holds the column names and
+# the number of rows, and is rewritten when the file is closed
+# reading memory-maps the file, so a column or a time window is a view into the file, and nothing is read until used
+#
+#   with TrajectoryWriter("freefall.npy", ("t", "y", "v")) as writer:
+#       while p.y > 0:
+#           writer.append(t, p.y, p.v)
+#   data = read("freefall.npy")           # also np.load("freefall.npy", mmap_mode="r")
+#   data["y"], window(data, 1.0, 2.0)
+#   export_csv("freefall.npy", "freefall_data.csv", ("t", "y"))
+#
+#   python -m physsim.trajectory freefall freefall.npy --dt 0.001
+#   python -m physsim.trajectory export freefall.npy freefall_data.csv --columns t,y
+
+import struct
+
+import numpy as np
+
+MAGIC = b"\x93NUMPY\x01\x00"
+ROWS_WIDTH = 20 # digits reserved for the number of rows, so the header never grows when it is rewritten
+
+# .npy header (version 1.0) for <rows> records of <dtype>, padded so the data starts on a multiple of 64 bytes
+def npy_header(dtype, rows):
+	shape = f"({rows},)".ljust(ROWS_WIDTH + 3)
+	text = "{'descr': %r, 'fortran_order': False, 'shape': %s}" % (np.lib.format.dtype_to_descr(dtype), shape)
+	size = len(MAGIC) + 2 + len(text) + 1
+	text = text + " "*(-size % 64) + "\n"
+	return MAGIC + struct.pack("<H", len(text)) + text.encode("latin1")
+
+# appends timesteps to a .npy file of records with the given columns
+# @params:
+#   filename: the .npy file, which is overwritten
+#   columns: names of the quantities stored at every timestep, e.g. ("t", "x", "y", "vx", "vy")
+#   chunk_size: number of timesteps collected in memory before they are written
+#   dtype: numpy type of every column
+class TrajectoryWriter:
+	def __init__(self, filename, columns, chunk_size=65536, dtype=float):
+		self.filename = filename
+		self.columns = tuple(columns)
+		self.dtype = np.dtype([(name, dtype) for name in self.columns])
+		self.chunk = np.empty(chunk_size, dtype=self.dtype)
+		# the same chunk viewed as a 2D array with one column per quantity, so a timestep is a single row assignment
+		self.rows = self.chunk.view(dtype).reshape(chunk_size, len(self.columns))
+		self.n = 0 # timesteps in the chunk
+		self.written = 0 # timesteps in the file
+		self.file = open(filename, "wb")
+		self.file.write(npy_header(self.dtype, 0))
+
+	# one timestep, with a value for every column in order
+	def append(self, *values):
+		self.rows[self.n] = values
+		self.n += 1
+		if self.n == len(self.chunk):
+			self.flush()
+
+	# many timesteps at once, as one array per column (columns=arrays in order, or by name)
+	def extend(self, *arrays, **named):
+		if named:
+			arrays = [named[name] for name in self.columns]
+		arrays = np.broadcast_arrays(*(np.asarray(a) for a in arrays))
+		total = arrays[0].size
+		start = 0
+		while start < total:
+			count = min(len(self.chunk) - self.n, total - start)
+			for name, a in zip(self.columns, arrays):
+				self.chunk[name][self.n:self.n + count] = a.ravel()[start:start + count]
+			self.n += count
+			start += count
+			if self.n == len(self.chunk):
+				self.flush()
+
+	# write the collected timesteps to the file
+	def flush(self):
+		if self.n:
+			self.file.write(self.chunk[:self.n].tobytes())
+			self.written += self.n
+			self.n = 0
+
+	# write the remaining timesteps and the final number of rows
+	def close(self):
+		if self.file.closed:
+			return
+		self.flush()
+		self.file.seek(0)
+		self.file.write(npy_header(self.dtype, self.written))
+		self.file.close()
+
+	def __len__(self):
+		return self.written + self.n
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info):
+		self.close()
+
+# memory-map a trajectory file; columns are data["t"], data["y"], ... and slices are views into the file
+def read(filename):
+	return np.load(filename, mmap_mode="r")
+
+# the rows with t_start <= t < t_stop, as a view; the time column must be increasing
+def window(data, t_start, t_stop, time_column="t"):
+	t = data[time_column]
+	start = np.searchsorted(t, t_start, side="left")
+	stop = np.searchsorted(t, t_stop, side="left")
+	return data[start:stop]
+
+# write (some of the) columns of a trajectory file to a CSV file with a header, like freefall_data.csv
+# the rows are converted block by block, so the CSV file can be much larger than memory
+# returns the number of rows written
+def export_csv(filename, csv_filename, columns=None, block_size=100000):
+	data = read(filename)
+	columns = list(columns) if columns is not None else list(data.dtype.names)
+	with open(csv_filename, "w") as f:
+		f.write(",".join(columns) + "\n")
+		for start in range(0, len(data), block_size):
+			block = data[start:start + block_size]
+			# repr() of a python float is the shortest text that reads back as the same number, as f"{t},{y}" writes in kinematics_io1.py
+			rows = np.column_stack([block[name] for name in columns]).tolist()
+			f.write("".join([",".join(map(repr, row)) + "\n" for row in rows]))
+	return len(data)
+
+# kinematics_io1.py: free fall under gravity, written to a trajectory file instead of a CSV file
+def write_freefall(filename, mass=0.01, g=9.8, y0=100.0, v0=0.0, dt=0.5, chunk_size=65536):
+	from physsim.sims.kinematics import Particle
+	gforce = -g*mass
+	p = Particle(m=mass, y=y0, v=v0)
+	t = 0.0
+	with TrajectoryWriter(filename, ("t", "y", "v"), chunk_size) as writer:
+		while p.y > 0:
+			writer.append(t, p.y, p.v) # write current time, position and speed
+			p.euler(gforce, dt)
+			t = t + dt
+	return len(writer)
+
+if __name__ == '__main__':
+	import argparse
+	parser = argparse.ArgumentParser(prog="python -m physsim.trajectory", description="binary trajectory files")
+	commands = parser.add_subparsers(dest="command", required=True)
+
+	freefall_parser = commands.add_parser("freefall", help="write the free fall of kinematics_io1.py to a trajectory file")
+	freefall_parser.add_argument("output")
+	freefall_parser.add_argument("--dt", type=float, default=0.5)
+	freefall_parser.add_argument("--y0", type=float, default=100.0)
+
+	export_parser = commands.add_parser("export", help="convert a trajectory file to CSV")
+	export_parser.add_argument("input")
+	export_parser.add_argument("output")
+	export_parser.add_argument("--columns", help="comma-separated column names (default: all)")
+
+	info_parser = commands.add_parser("info", help="show the columns and length of a trajectory file")
+	info_parser.add_argument("input")
+
+	args = parser.parse_args()
+	if args.command == "freefall":
+		rows = write_freefall(args.output, y0=args.y0, dt=args.dt)
+		print(f"wrote {rows} rows to {args.output}")
+	elif args.command == "export":
+		columns = args.columns.split(",") if args.columns else None
+		rows = export_csv(args.input, args.output, columns)
+		print(f"wrote {rows} rows to {args.output}")
+	else:
+		data = read(args.input)
+		print(f"{args.input}: {len(data)} rows, columns {', '.join(data.dtype.names)}")
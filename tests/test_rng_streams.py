@@ -0,0 +1,72 @@
+# the streams of MCG.split() and Philox.split() must never draw each other's numbers
+#
+#   python -m pytest tests
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from physsim.rng.mcg import MCG
+from physsim.rng.philox import Philox
+
+# a generator moved close to its end, so the blocks of a split are small enough to draw completely
+def near_end(generator, remaining=1000):
+	generator.restore((generator.seed, generator.limit - remaining))
+	return generator
+
+SPLITS = [
+	("mcg block", lambda: near_end(MCG()).split(4)),
+	("mcg leapfrog", lambda: near_end(MCG()).split(4, "leapfrog")),
+	("philox", lambda: near_end(Philox()).split(4)),
+]
+
+@pytest.mark.parametrize("name, split", SPLITS, ids=[name for name, _ in SPLITS])
+def test_sampleN_stops_at_the_end_of_a_stream(name, split):
+	for stream in split():
+		size = stream.limit - stream.count
+		stream.sampleN(size - 1, 0, 1)
+		stream.sampleN(1, 0, 1) # the last number of the block is still the stream's own
+		with pytest.raises(ValueError):
+			stream.sampleN(1, 0, 1)
+
+@pytest.mark.parametrize("name, split", SPLITS, ids=[name for name, _ in SPLITS])
+def test_sample_stops_at_the_end_of_a_stream(name, split):
+	stream = split()[0]
+	for _ in range(stream.limit - stream.count):
+		stream.sample(0, 1)
+	with pytest.raises(ValueError):
+		stream.sample(0, 1)
+
+# a request that doesn't fit is refused as a whole, before any number is drawn
+def test_refused_draw_leaves_the_stream_unchanged():
+	stream = near_end(MCG()).split(4)[0]
+	position = stream.state()
+	with pytest.raises(ValueError):
+		stream.uniform(stream.limit - stream.count + 1)
+	assert stream.state() == position
+
+# the blocks of a split are exactly the numbers the generator would have drawn
+@pytest.mark.parametrize("cls", [MCG, Philox])
+def test_blocks_cover_the_parent_sequence(cls):
+	parent = near_end(cls(), 1000)
+	blocks = [stream.sampleN(stream.limit - stream.count, 0, 1) for stream in parent.split(4)]
+	assert np.array_equal(np.concatenate(blocks), parent.sampleN(1000, 0, 1))
+
+# a restored stream continues the same numbers, and keeps the end of its block
+def test_restored_philox_stream_keeps_its_stream_and_limit():
+	stream = Philox(seed=5, stream=3).split(4)[1]
+	stream.sampleN(10, 0, 1)
+	copy = Philox()
+	copy.restore(stream.state())
+	assert np.array_equal(copy.sampleN(10, 0, 1), stream.sampleN(10, 0, 1))
+	assert copy.limit == stream.limit
+
+@pytest.mark.parametrize("name, split", SPLITS, ids=[name for name, _ in SPLITS])
+def test_jump_stops_at_the_end_of_a_stream(name, split):
+	stream = split()[0]
+	with pytest.raises(ValueError):
+		stream.jump(stream.limit - stream.count + 1)
+	stream.jump(stream.limit - stream.count)